@@ -3,10 +3,25 @@
 
 from typing import Callable, Optional, Tuple
 import itertools
-import json
 import os
+import numpy as np
 import pandas as pd
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+
+from bot_analisa.backtest.engine import run_event_backtest
+from bot_analisa.backtest.intrabar import bar_end
+from bot_analisa.backtest.kernels import first_hit
+from bot_analisa.backtest.parallel import SharedPool, shareable
+from bot_analisa.backtest.portfolio import run_portfolio_backtest
+from bot_analisa.backtest.report import save_report, trade_log, trade_records
+from bot_analisa.backtest.robustness import robustness
+from bot_analisa.backtest.streaming import DEFAULT_CHUNK_SIZE, stream_trades
+from bot_analisa.backtest.search import Deadline, run_search, score
+from bot_analisa.backtest.walkforward import fold_ranges, summarize_folds, walk_forward_folds
+from bot_analisa.data.fingerprint import data_fingerprint, file_fingerprint, params_hash
+from bot_analisa.indicators.indicators import atr, ema, sma
+from bot_analisa.indicators.streaming import StreamingATR
+from bot_analisa.risk.exits import ExitPolicy, resolve_exit, stop_status
 
 # import existing generate_signals default
 try:
@@ -16,6 +31,11 @@ except Exception:
     def default_generate_signals(df, params=None):
         return []
 
+# bump when trade simulation or metric semantics change; part of code_version(), so
+# cached results and tuning-store rows from older code stop matching
+ENGINE_VERSION = "4"
+
+
 @dataclass
 class TradeResult:
     ticker: str
@@ -28,9 +48,64 @@ class TradeResult:
     tp: float
     sl: float
 
+def indicator_signature(params: dict) -> Tuple[int, int, int, int]:
+    """(ema_fast, ema_slow, sma_trend, atr_period) with the strategy defaults."""
+    return (int(params.get("ema_fast", 9)), int(params.get("ema_slow", 21)),
+            int(params.get("sma_trend", 50)), int(params.get("atr_period", 14)))
+
+
+def with_strategy_indicators(df: pd.DataFrame, params: dict, cache: dict) -> pd.DataFrame:
+    """
+    Attach the indicator columns generate_signals would compute for params.
+
+    Mirrors the strategy: nothing is added when the EMA/ATR columns already exist,
+    and existing columns are never overwritten. Series are memoized in cache by
+    column name, so combos sharing e.g. ATR_14 compute it once.
+    """
+    ema_fast_p, ema_slow_p, sma_p, atr_p = indicator_signature(params)
+    need = (f"EMA_{ema_fast_p}", f"EMA_{ema_slow_p}", f"ATR_{atr_p}")
+    if all(c in df.columns for c in need):
+        return df
+
+    builders = {
+        f"SMA_{sma_p}": lambda: sma(df["Close"], sma_p),
+        f"EMA_{ema_fast_p}": lambda: ema(df["Close"], ema_fast_p),
+        f"EMA_{ema_slow_p}": lambda: ema(df["Close"], ema_slow_p),
+        f"ATR_{atr_p}": lambda: atr(df, period=atr_p),
+    }
+    cols = {}
+    for name, build in builders.items():
+        if name in df.columns:
+            continue
+        if name not in cache:
+            cache[name] = build()
+        cols[name] = cache[name]
+    return df.assign(**cols)
+
+
 class Backtester:
-    def __init__(self, strategy_version="v1"):
+    def __init__(self, strategy_version="v1", cache=None):
+        """cache: optional ResultCache (backtest/result_cache.py) used by run_backtest / run_backtest_csv."""
         self.strategy_version = strategy_version
+        self.cache = cache
+
+    def code_version(self, signal_generator: Callable = None) -> str:
+        """Version stamp of the code producing results (package, engine, strategy version, generator)."""
+        from bot_analisa import __version__
+        gen = signal_generator or default_generate_signals
+        name = f"{getattr(gen, '__module__', '')}.{getattr(gen, '__qualname__', repr(gen))}"
+        return f"{__version__}/engine-{ENGINE_VERSION}/{self.strategy_version}/{name}"
+
+    def _cache_key(self, kind: str, ticker: str, data_hash: str, signal_generator: Callable,
+                   signal_params: Optional[dict]) -> Optional[str]:
+        if self.cache is None:
+            return None
+        gen = signal_generator or default_generate_signals
+        # lambdas / nested functions have no stable name to version them by
+        if "<" in getattr(gen, "__qualname__", "<"):
+            return None
+        return self.cache.key(kind, ticker, data_hash, params_hash(signal_params),
+                              self.code_version(signal_generator))
 
     def load_csv(self, path: str) -> pd.DataFrame:
         df = pd.read_csv(path, parse_dates=["Datetime"])
@@ -39,37 +114,182 @@ class Backtester:
 
     def run_backtest(self, ticker: str, df: pd.DataFrame,
                      signal_generator: Callable = None,
-                     signal_params: Optional[dict] = None) -> dict:
-        """Run backtest with optionally custom signal_generator(df, params) -> signals list."""
+                     signal_params: Optional[dict] = None,
+                     intrabar=None,
+                     use_cache: bool = True,
+                     exit_policy: Optional[ExitPolicy] = None) -> dict:
+        """
+        Run backtest with optionally custom signal_generator(df, params) -> signals list.
+
+        intrabar: optional IntrabarResolver (backtest/intrabar.py); bars that touch both
+        TP and SL are then resolved on finer bars instead of assuming TP, and the
+        result gets "ambiguous_bars" and "intrabar_resolved" counts.
+        exit_policy: optional ExitPolicy (risk/exits.py) adding trailing stop, break-even,
+        time stop and partial TP on top of the signal's TP/SL. Defaults to
+        ExitPolicy.from_params(signal_params), so exit keys can sit in the param grid.
+        With a cache on the Backtester (and no intrabar resolver) results are memoized by
+        data hash, params and code_version(); use_cache=False bypasses it.
+        """
+        if exit_policy is None:
+            exit_policy = ExitPolicy.from_params(signal_params)
+        key = None
+        if use_cache and intrabar is None and self.cache is not None:
+            key_params = dict(signal_params or {})
+            if exit_policy is not None:
+                key_params["__exit_policy__"] = exit_policy.as_params()
+            key = self._cache_key("run_backtest", ticker, data_fingerprint(df), signal_generator, key_params)
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                return cached
+        result = self._run_backtest(ticker, df, signal_generator, signal_params, intrabar, exit_policy)
+        if key:
+            self.cache.put(key, result)
+        return result
+
+    def _run_backtest(self, ticker: str, df: pd.DataFrame, signal_generator: Callable,
+                      signal_params: Optional[dict], intrabar, exit_policy: Optional[ExitPolicy] = None) -> dict:
+        signals = self._generate_signals(df, signal_generator, signal_params)
+
+        if not signals:
+            return {"ticker": ticker, "total_trades": 0, "winrate": 0, "pf": 0,
+                    "max_dd": 0, "equity_curve": [], "trades": [], "trade_log": trade_log({})}
+
+        cols = self._simulate_trades(df, signals, intrabar=intrabar, exit_policy=exit_policy)
+        result = self._backtest_result(ticker, trade_log(cols))
+        if intrabar is not None:
+            flags = cols.get("intrabar", [])
+            result["ambiguous_bars"] = int(sum(a is not None for a in flags))
+            result["intrabar_resolved"] = int(sum(bool(a) for a in flags))
+        return result
+
+    def run_backtest_csv(self, ticker: str, path: str, signal_params: Optional[dict] = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE, use_cache: bool = True) -> dict:
+        """
+        run_backtest(ticker, load_csv(path)) with the default strategy, streamed in blocks
+        of chunk_size rows so the bars and indicators of a long intraday history are never
+        all in memory; the trade log itself grows with the trade count, as in run_backtest
+        (see backtest/streaming.py). Same result as the in-memory run; cached by file hash.
+        Only fixed TP/SL exits are streamed; exit policy keys in signal_params raise ValueError.
+        """
+        if ExitPolicy.from_params(signal_params) is not None:
+            raise ValueError("run_backtest_csv supports fixed TP/SL exits only; use run_backtest for exit policies")
+        key = None
+        if use_cache and self.cache is not None:
+            key = self._cache_key("run_backtest_csv", ticker, file_fingerprint(path), None, signal_params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        cols = stream_trades(path, signal_params, chunk_size=chunk_size)
+        if not cols["status"]:
+            result = {"ticker": ticker, "total_trades": 0, "winrate": 0, "pf": 0,
+                      "max_dd": 0, "equity_curve": [], "trades": [], "trade_log": trade_log({})}
+        else:
+            result = self._backtest_result(ticker, trade_log(cols))
+        if key:
+            self.cache.put(key, result)
+        return result
+
+    def _backtest_result(self, ticker: str, log: dict) -> dict:
+        """run_backtest result dict (metrics, equity curve, trades) from a non-empty trade log."""
+        pnl = log["result"]
+        # sequential sums (same floats as the old per-trade loop)
+        equity_curve = np.cumsum(pnl).tolist()
+        peak_equity = max([0.0] + equity_curve)
+
+        # metrics
+        total = len(pnl)
+        winrate = int((pnl > 0).sum()) / total if total > 0 else 0
+        gross_win = sum(pnl[pnl > 0].tolist())
+        gross_loss = abs(sum(pnl[pnl < 0].tolist()))
+        pf = (gross_win / gross_loss) if gross_loss > 0 else float("inf")
+        max_dd = max([0] + [peak_equity - eq for eq in equity_curve]) if equity_curve else 0
+
+        return {
+            "ticker": ticker,
+            "total_trades": total,
+            "winrate": winrate,
+            "pf": pf,
+            "max_dd": max_dd,
+            "equity_curve": equity_curve,
+            "trades": trade_records(log, ticker),
+            "trade_log": log,
+        }
+
+    def run_event_backtest(self, ticker: str, df: pd.DataFrame,
+                           signal_generator: Callable = None,
+                           signal_params: Optional[dict] = None,
+                           fee_pct: float = 0.0,
+                           slippage_pct: float = 0.0) -> dict:
+        """Single-position, next-bar-open backtest (see backtest/engine.py)."""
+        signals = self._generate_signals(df, signal_generator, signal_params)
+        return run_event_backtest(ticker, df, signals or [], fee_pct=fee_pct, slippage_pct=slippage_pct)
+
+    def run_portfolio_backtest(self, frames: dict, signal_generator: Callable = None,
+                               signal_params: Optional[dict] = None, **kwargs) -> dict:
+        """Shared-capital backtest over ticker -> df frames (see backtest/portfolio.py)."""
+        signals = {t: self._generate_signals(df, signal_generator, signal_params) or [] for t, df in frames.items()}
+        return run_portfolio_backtest(frames, signals, **kwargs)
+
+    def _generate_signals(self, df: pd.DataFrame, signal_generator: Callable = None,
+                          signal_params: Optional[dict] = None) -> list:
         if signal_generator is None:
             signal_generator = default_generate_signals
 
         if signal_params is None:
             signal_params = {}
 
-        # generate signals
         try:
-            signals = signal_generator(df, signal_params) if signal_params else signal_generator(df)
+            return signal_generator(df, signal_params) if signal_params else signal_generator(df)
         except TypeError:
             # generator might expect (df) only
-            signals = signal_generator(df)
+            return signal_generator(df)
 
-        trades = []
-        equity = 0.0
-        peak_equity = 0.0
-        equity_curve = []
+    def _simulate_trades(self, df: pd.DataFrame, signals: list, intrabar=None,
+                         exit_policy: Optional[ExitPolicy] = None) -> dict:
+        """
+        Resolve every signal to an exit on NumPy arrays.
 
-        if not signals:
-            return {"ticker": ticker, "total_trades": 0, "winrate": 0, "pf": 0,
-                    "max_dd": 0, "equity_curve": [], "trades": []}
+        Each trade scans bars from its entry bar (inclusive) for the first bar with
+        High >= tp or Low <= sl; TP wins when both hit on the same bar. Trades that
+        never hit exit at the last Close with status END.
+
+        Returns a column dict (lists aligned per trade): entry_pos, exit_pos,
+        entry_time, exit_time, entry, exit, tp, sl, status. With intrabar, the exit bar
+        of a trade that touched both levels is resolved on finer bars, and an extra
+        "intrabar" column holds None (bar not ambiguous), True (resolved) or False
+        (no finer answer, TP kept).
+
+        With exit_policy the scan is risk.exits.resolve_exit instead: the stop can trail,
+        move to break-even or time out (status TRAIL / BE / TIME), and "exit" is the
+        blended price when a partial TP filled first (extra "partial_exit" column holds
+        the partial fill or None).
+        """
+        index = df.index
+        high = df["High"].to_numpy(dtype="float64")
+        low = df["Low"].to_numpy(dtype="float64")
+        last_pos = len(df) - 1
+        last_close = float(df.iloc[-1]["Close"])
+        monotonic = index.is_monotonic_increasing
+        if exit_policy is not None:
+            close = df["Close"].to_numpy(dtype="float64")
+            atr_values = None
+            if exit_policy.needs_atr:
+                col = f"ATR_{exit_policy.atr_period}"
+                if col in df.columns:
+                    atr_values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+                else:
+                    # same floats as indicators.atr, without its per-row pandas loop
+                    atr_values = StreamingATR(exit_policy.atr_period).update(high, low, close)
+
+        cols = {k: [] for k in ("entry_pos", "exit_pos", "entry_time", "exit_time",
+                                "entry", "exit", "tp", "sl", "status")}
 
-        # For each signal simulate TP/SL hit with naive approach
         for s in signals:
             entry_idx = pd.to_datetime(s.get("timestamp", s.get("datetime", s.get("entry_time"))))
-            if entry_idx not in df.index:
+            if entry_idx not in index:
                 # try nearest index (forward fill)
                 try:
-                    entry_idx = df.index[df.index.get_indexer([entry_idx], method="pad")[0]]
+                    entry_idx = index[index.get_indexer([entry_idx], method="pad")[0]]
                 except Exception:
                     continue
 
@@ -87,157 +307,294 @@ class Backtester:
                     tp = entry_price * 1.05
                     sl = entry_price * 0.98
 
-            df_future = df[df.index >= entry_idx]
-
-            exit_price = None
-            exit_time = None
-            status = None
-
-            for ts, row in df_future.iterrows():
-                high = row["High"]
-                low = row["Low"]
-                if high >= tp:
-                    exit_price = tp
-                    exit_time = ts
-                    status = "TP"
-                    break
-                if low <= sl:
-                    exit_price = sl
-                    exit_time = ts
-                    status = "SL"
-                    break
-
-            if exit_price is None:
-                last_ts = df.index[-1]
-                exit_price = float(df.iloc[-1]["Close"])
-                exit_time = last_ts
-                status = "END"
-
-            pnl = exit_price - entry_price
-            equity += pnl
-            peak_equity = max(peak_equity, equity)
-            equity_curve.append(equity)
-
-            trades.append(TradeResult(ticker=ticker,
-                                      entry_time=str(entry_idx),
-                                      exit_time=str(exit_time),
-                                      entry=entry_price,
-                                      exit=exit_price,
-                                      result=pnl,
-                                      status=status,
-                                      tp=tp, sl=sl))
+            resolved = None
+            partial = None
+            if exit_policy is not None:
+                if monotonic:
+                    start = int(index.searchsorted(entry_idx, side="left"))
+                    bars = None
+                    res = resolve_exit(high, low, close, atr_values, start, entry_price, tp, sl, exit_policy)
+                else:
+                    bars = np.flatnonzero(index >= entry_idx)
+                    start = int(bars[0]) if len(bars) else last_pos + 1
+                    res = resolve_exit(high[bars], low[bars], close[bars],
+                                       None if atr_values is None else atr_values[bars],
+                                       0, entry_price, tp, sl, exit_policy)
+                if res.exit_pos >= 0:
+                    exit_pos = res.exit_pos if bars is None else int(bars[res.exit_pos])
+                    status, level = res.status, res.exit_level
+                    if intrabar is not None and status == "TP" and low[exit_pos] <= res.stop:
+                        first = intrabar.resolve(index[exit_pos], bar_end(index, exit_pos), tp, res.stop)
+                        resolved = first is not None
+                        if first == "SL":
+                            status, level = stop_status(res.stop, entry_price, sl), res.stop
+                else:
+                    status, level, exit_pos = "END", last_close, last_pos
+                if res.partial_pos >= 0:
+                    partial = res.partial_level
+                    level = exit_policy.partial_fraction * partial + (1.0 - exit_policy.partial_fraction) * level
+                exit_price = level
+            else:
+                if monotonic:
+                    start = int(index.searchsorted(entry_idx, side="left"))
+                    hit = first_hit(high, low, start, tp, sl)
+                else:
+                    # unsorted index: scan the bars at/after entry_idx in frame order
+                    future = np.flatnonzero(index >= entry_idx)
+                    start = int(future[0]) if len(future) else last_pos + 1
+                    rel = first_hit(high[future], low[future], 0, tp, sl)
+                    hit = int(future[rel]) if rel >= 0 else -1
 
-        # metrics
-        total = len(trades)
-        wins = len([t for t in trades if t.result > 0])
-        losses = len([t for t in trades if t.result < 0])
-        winrate = wins / total if total > 0 else 0
-        gross_win = sum([t.result for t in trades if t.result > 0])
-        gross_loss = abs(sum([t.result for t in trades if t.result < 0]))
-        pf = (gross_win / gross_loss) if gross_loss > 0 else float("inf")
-        max_dd = max([0] + [peak_equity - eq for eq in equity_curve]) if equity_curve else 0
+                if hit >= 0:
+                    status = "TP" if high[hit] >= tp else "SL"
+                    if intrabar is not None and status == "TP" and low[hit] <= sl:
+                        first = intrabar.resolve(index[hit], bar_end(index, hit), tp, sl)
+                        resolved = first is not None
+                        status = first or status
+                    exit_price = tp if status == "TP" else sl
+                    exit_pos = hit
+                else:
+                    status = "END"
+                    exit_price = last_close
+                    exit_pos = last_pos
 
-        return {
-            "ticker": ticker,
-            "total_trades": total,
-            "winrate": winrate,
-            "pf": pf,
-            "max_dd": max_dd,
-            "equity_curve": equity_curve,
-            "trades": [asdict(t) for t in trades]
-        }
+            cols["entry_pos"].append(start)
+            cols["exit_pos"].append(exit_pos)
+            cols["entry_time"].append(entry_idx)
+            cols["exit_time"].append(index[exit_pos])
+            cols["entry"].append(entry_price)
+            cols["exit"].append(exit_price)
+            cols["tp"].append(tp)
+            cols["sl"].append(sl)
+            cols["status"].append(status)
+            if exit_policy is not None:
+                cols.setdefault("partial_exit", []).append(partial)
+            if intrabar is not None:
+                cols.setdefault("intrabar", []).append(resolved)
+
+        return cols
 
     def tune_params(self, ticker: str, df: pd.DataFrame, param_grid: dict,
                     signal_generator: Callable = None,
-                    walk_forward_days: Optional[int] = None) -> pd.DataFrame:
+                    walk_forward_days: Optional[int] = None,
+                    n_jobs: Optional[int] = None,
+                    walk_forward_bars: Optional[int] = None,
+                    walk_mode: str = "anchored",
+                    train_window: Optional[int] = None,
+                    search: str = "grid",
+                    budget: Optional[int] = None,
+                    time_budget: Optional[float] = None,
+                    metric: str = "pf",
+                    seed: int = 0,
+                    prune_below: Optional[float] = None,
+                    probe_fraction: float = 0.25,
+                    store=None,
+                    robust_resamples: Optional[int] = None,
+                    robust_method: str = "bootstrap",
+                    robust_confidence: float = 0.9) -> pd.DataFrame:
         """
         param_grid: dict of param_name -> list(values)
-        walk_forward_days: if provided, perform sliding validation windows of this many days
+        walk_forward_days / walk_forward_bars: if provided, validate on consecutive windows
+          of this many days / bars (see backtest/walkforward.py); walk_mode "anchored" or
+          "rolling" with train_window in the same unit
+        n_jobs: worker processes (None/1 = serial, -1 = all cores). Workers share one
+          read-only copy of the OHLCV arrays and live for the whole run (every search round
+          reuses them); signal_generator must be picklable (module-level). Frames with
+          non-numeric columns or without a DatetimeIndex are evaluated serially.
+        search: "grid", "random", "halving" or "bayes" (see backtest/search.py); budget is
+          the number of combos to try, time_budget a wall-clock limit in seconds, metric
+          the objective used to rank combos (pf, winrate, max_dd, ...)
+        prune_below: early stopping; each combo first runs on the most recent
+          probe_fraction of bars and is dropped (row marked pruned) if its score is below.
+          Probe results are in probe_* columns (plus probe_bars); pruned rows leave the
+          full-run metric columns empty (NaN)
+        store: optional TuningStore; each row is persisted as soon as it finishes, keyed by
+          ticker, data fingerprint, params (+ walk/window settings) and code_version(), and
+          combos already in the store are read back instead of re-run (resumable runs)
+        robust_resamples: if set, each row also gets bootstrap/shuffle confidence bounds
+          of its trade PnL (pf_lo, max_dd_hi, expectancy_lo, ... see backtest/robustness.py),
+          so metric="pf_lo" ranks combos by the pessimistic PF. Not available with walk-forward.
         returns DataFrame with columns param..., total_trades, winrate, pf, max_dd, avg_winrate(if walk)
+        grid rows are always in grid order, whatever order the workers finish in; other
+        searches return rows in evaluation order.
         """
         # build grid combos
         keys = list(param_grid.keys())
         combos = list(itertools.product(*[param_grid[k] for k in keys]))
+        space = [dict(zip(keys, combo)) for combo in combos]
 
-        results = []
-        for combo in combos:
-            params = dict(zip(keys, combo))
-
-            if walk_forward_days:
-                # sliding windows: for each fold do train on beginning up to t, validate next window
-                # we'll do expanding window: train_end moves forward by walk_forward_days
-                metrics = []
-                start = df.index[0]
-                end = df.index[-1]
-                window_delta = pd.Timedelta(days=walk_forward_days)
-                split_point = start + window_delta
-                while split_point + window_delta <= end:
-                    train_df = df[df.index < split_point]
-                    val_df = df[(df.index >= split_point) & (df.index < split_point + window_delta)]
-                    if len(train_df) < 10 or len(val_df) < 2:
-                        split_point = split_point + window_delta
-                        continue
+        walk = None
+        if walk_forward_days or walk_forward_bars:
+            walk = ("days", walk_forward_days) if walk_forward_days else ("bars", walk_forward_bars)
+        robust = None
+        if robust_resamples:
+            if walk is not None:
+                raise ValueError("robust_resamples is not supported together with walk-forward")
+            robust = {"n_resamples": int(robust_resamples), "method": robust_method,
+                      "confidence": float(robust_confidence), "seed": seed}
+        deadline = Deadline(time_budget)
+        caches: dict = {}
+        # one worker pool + shared frame for every evaluate() call of this run;
+        # frames workers could not see unchanged (object columns, no DatetimeIndex) stay serial
+        pool = None
+        if n_jobs not in (None, 0, 1) and len(space) > 1 and shareable(df):
+            workers = (os.cpu_count() or 1) if n_jobs < 0 else n_jobs
+            pool = SharedPool(self, ticker, df, signal_generator=signal_generator,
+                              n_jobs=min(workers, len(space)), robust=robust)
+        if store is not None:
+            data_fp = data_fingerprint(df)
+            version = self.code_version(signal_generator)
 
-                    # run on validation only, but generator may expect historical to compute indicators.
-                    # We'll generate signals on train+val but only evaluate trades that entry in val
-                    combined = pd.concat([train_df, val_df])
-                    res = self.run_backtest(ticker, combined, signal_generator=signal_generator, signal_params=params)
-                    # filter trades to only those with entry_time in val_df
-                    trades = res.get("trades", [])
-                    val_trade_results = []
-                    for t in trades:
-                        try:
-                            et = pd.to_datetime(t["entry_time"])
-                            if (et >= val_df.index[0]) and (et <= val_df.index[-1]):
-                                val_trade_results.append(t)
-                        except Exception:
-                            continue
-                    if not val_trade_results:
-                        metrics.append({"winrate": 0, "pf": 0, "trades": 0, "max_dd": 0})
-                    else:
-                        wins = sum(1 for t in val_trade_results if t["result"] > 0)
-                        total = len(val_trade_results)
-                        winrate = wins / total if total else 0
-                        gross_win = sum(t["result"] for t in val_trade_results if t["result"] > 0)
-                        gross_loss = abs(sum(t["result"] for t in val_trade_results if t["result"] < 0))
-                        pf = (gross_win / gross_loss) if gross_loss > 0 else float("inf")
-                        fold_equity = 0.0
-                        peak_equity = 0.0
-                        max_dd = 0.0
-                        for t in val_trade_results:
-                            fold_equity += float(t["result"])
-                            peak_equity = max(peak_equity, fold_equity)
-                            max_dd = max(max_dd, peak_equity - fold_equity)
-                        metrics.append({"winrate": winrate, "pf": pf, "trades": total, "max_dd": max_dd})
-
-                    split_point = split_point + window_delta
-
-                # aggregate metrics
-                if metrics:
-                    avg_winrate = float(pd.Series([m["winrate"] for m in metrics]).mean())
-                    avg_pf = float(pd.Series([m["pf"] if m["pf"] != float("inf") else 0 for m in metrics]).mean())
-                    avg_trades = int(pd.Series([m["trades"] for m in metrics]).sum())
-                    avg_maxdd = float(pd.Series([m["max_dd"] for m in metrics]).mean())
-                else:
-                    avg_winrate = 0.0
-                    avg_pf = 0.0
-                    avg_trades = 0
-                    avg_maxdd = 0.0
+        def evaluate(param_list, n_bars=None):
+            frame = df if n_bars is None or n_bars >= len(df) else df.iloc[-n_bars:]
+            folds = None
+            if walk is not None:
+                folds = fold_ranges(frame.index, walk[1], unit=walk[0], mode=walk_mode, train_window=train_window)
+            if store is None:
+                return self._evaluate_many(ticker, frame, param_list, signal_generator, folds, pool, deadline,
+                                           caches.setdefault(len(frame), {}), robust=robust)
 
-                row = {**params, "avg_winrate": avg_winrate, "avg_pf": avg_pf,
-                       "total_val_trades": avg_trades, "avg_max_dd": avg_maxdd}
-                results.append(row)
-            else:
-                # single backtest on full df
-                res = self.run_backtest(ticker, df, signal_generator=signal_generator, signal_params=params)
-                row = {**params, "total_trades": res["total_trades"], "winrate": res["winrate"],
-                       "pf": res["pf"], "max_dd": res["max_dd"]}
-                results.append(row)
+            # the same params on another window/walk setup is a different result
+            context = {"walk": walk, "walk_mode": walk_mode, "train_window": train_window, "bars": len(frame),
+                       "robust": robust}
+
+            def key(params):
+                return params_hash({"params": params, "context": context})
+
+            hashes = [key(p) for p in param_list]
+            done = store.load(ticker, data_fp, version, hashes)
+            todo = [i for i, h in enumerate(hashes) if h not in done]
+
+            def persist(params, row):
+                store.save(ticker, data_fp, key(params), version, params, row)
+
+            fresh = self._evaluate_many(ticker, frame, [param_list[i] for i in todo], signal_generator, folds,
+                                        pool, deadline, caches.setdefault(len(frame), {}), on_result=persist,
+                                        robust=robust)
+            rows = [done.get(h) for h in hashes]
+            for i, row in zip(todo, fresh):
+                rows[i] = row
+            return rows
+
+        if prune_below is not None and search != "halving":
+            inner = evaluate
+
+            def evaluate(param_list, n_bars=None):
+                probe_bars = max(1, int(len(df) * probe_fraction))
+                probe = inner(param_list, n_bars=probe_bars)
+                survivors = [i for i, row in enumerate(probe) if row is not None and score(row, metric) >= prune_below]
+                full = inner([param_list[i] for i in survivors], n_bars=n_bars)
+
+                # probe-window numbers go to probe_* columns; a pruned row has no full-run
+                # metrics, so it can never be ranked next to full rows on the same column
+                def probe_cols(params, row):
+                    return {f"probe_{k}": v for k, v in row.items() if k not in params}
+
+                rows = []
+                for params, row in zip(param_list, probe):
+                    if row is None:
+                        rows.append(None)
+                        continue
+                    blank = {k: None for k in row if k not in params}
+                    rows.append({**params, **blank, **probe_cols(params, row), "probe_bars": probe_bars,
+                                 "pruned": True})
+                for i, row in zip(survivors, full):
+                    if row is not None:
+                        rows[i] = {**row, **probe_cols(param_list[i], probe[i]), "probe_bars": probe_bars,
+                                   "pruned": False}
+                return rows
+
+        try:
+            results = run_search(search, space, evaluate, budget=budget, metric=metric, seed=seed,
+                                 n_bars=len(df), deadline=deadline)
+        finally:
+            if pool is not None:
+                pool.close()
 
         df_res = pd.DataFrame(results)
         return df_res
 
-    def save_report(self, result: dict, path: str):
-        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "w") as f:
-            json.dump(result, f, indent=2)
+    def _evaluate_many(self, ticker: str, df: pd.DataFrame, param_list: list,
+                       signal_generator: Callable = None,
+                       folds: Optional[list] = None,
+                       pool: Optional[SharedPool] = None,
+                       deadline: Optional[Deadline] = None,
+                       indicator_cache: Optional[dict] = None,
+                       on_result: Optional[Callable] = None,
+                       robust: Optional[dict] = None) -> list:
+        """
+        Rows for param_list (same order); None for combos skipped after the deadline.
+
+        on_result(params, row) is called as each combo finishes (in completion order).
+        """
+        if not param_list:
+            return []
+        if deadline is not None and deadline.expired():
+            return [None] * len(param_list)
+
+        # group by indicator signature so each unique EMA/SMA/ATR series is computed once
+        order = sorted(range(len(param_list)), key=lambda i: indicator_signature(param_list[i]))
+        grouped = [param_list[i] for i in order]
+
+        if pool is not None and len(grouped) > 1:
+            # df is always the most recent len(df) bars of the frame the pool shares
+            results = pool.evaluate(grouped, n_bars=len(df), folds=folds, on_result=on_result)
+        else:
+            cache = {} if indicator_cache is None else indicator_cache
+            results = []
+            for params in grouped:
+                if deadline is not None and deadline.expired():
+                    results.append(None)
+                    continue
+                row = self._evaluate_params(ticker, df, params, signal_generator, folds, indicator_cache=cache,
+                                            robust=robust)
+                if on_result is not None:
+                    on_result(params, row)
+                results.append(row)
+
+        # restore input order
+        rows = [None] * len(param_list)
+        for i, row in zip(order, results):
+            rows[i] = row
+        return rows
+
+    def _evaluate_params(self, ticker: str, df: pd.DataFrame, params: dict,
+                         signal_generator: Callable = None,
+                         folds: Optional[list] = None,
+                         indicator_cache: Optional[dict] = None,
+                         robust: Optional[dict] = None) -> dict:
+        """
+        One tune_params row for a single param combo (walk-forward summary when folds given).
+
+        With indicator_cache (and the default strategy) the EMA/SMA/ATR columns the combo
+        needs are taken from / added to the cache and attached to df up front, so the
+        strategy skips its own compute_indicators call.
+        """
+        if indicator_cache is not None and signal_generator in (None, default_generate_signals):
+            df = with_strategy_indicators(df, params, indicator_cache)
+
+        if folds is not None:
+            frame = walk_forward_folds(self, ticker, df, params, folds, signal_generator=signal_generator)
+            return {**params, **summarize_folds(frame)}
+
+        # single backtest on full df
+        # tune_params persists rows in its own TuningStore; skip hashing the frame per combo
+        res = self.run_backtest(ticker, df, signal_generator=signal_generator, signal_params=params, use_cache=False)
+        row = {**params, "total_trades": res["total_trades"], "winrate": res["winrate"],
+               "pf": res["pf"], "max_dd": res["max_dd"]}
+        if robust is not None:
+            stats = robustness(res["trade_log"]["result"], **robust)
+            row.update({k: v for k, v in stats.items() if k not in ("n_trades", "n_resamples")})
+        return row
+
+    def walk_forward(self, ticker: str, df: pd.DataFrame, params: Optional[dict] = None,
+                     window: int = 30, unit: str = "days", mode: str = "anchored",
+                     train_window: Optional[int] = None,
+                     signal_generator: Callable = None) -> pd.DataFrame:
+        """Per-fold train/validation metrics for one params dict (tidy frame, one row per fold)."""
+        folds = fold_ranges(df.index, window, unit=unit, mode=mode, train_window=train_window)
+        return walk_forward_folds(self, ticker, df, params or {}, folds, signal_generator=signal_generator)
+
+    def save_report(self, result: dict, path: str, fmt: str = "npz") -> dict:
+        """Summary JSON + columnar trade log next to it (see backtest/report.py)."""
+        return save_report(result, path, fmt=fmt)
@@ -0,0 +1,109 @@
+"""
+engine.py
+
+Event-driven, single-position backtest for one ticker.
+
+Differences from Backtester.run_backtest (which treats every signal as an
+independent trade filled at the signal bar's Close):
+  - at most one open position; signals that arrive while a position is open are skipped
+  - entry fills at the Open of the bar after the signal (plus slippage)
+  - a signal whose next Open already gaps through its TP or SL is skipped
+  - exits scan from the entry bar; when a later bar opens beyond SL/TP the exit
+    fills at that Open (gap-through), otherwise at the level itself, TP first
+  - optional fee_pct per side and slippage_pct against us on both fills
+
+The engine walks the signal list once and jumps straight to each exit with the
+first_hit kernel, so the cost is linear in bars + signals.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bot_analisa.backtest.kernels import first_hit, trade_metrics
+
+
+def signal_positions(index: pd.Index, signals: List[dict]) -> np.ndarray:
+    """Bar position of each signal timestamp (exact match, else previous bar; -1 if none)."""
+    stamps = [pd.to_datetime(s.get("timestamp", s.get("datetime", s.get("entry_time")))) for s in signals]
+    if not stamps:
+        return np.zeros(0, dtype="int64")
+    return np.asarray(index.get_indexer(stamps, method="pad"), dtype="int64")
+
+
+def run_event_backtest(ticker: str, df: pd.DataFrame, signals: List[dict],
+                       fee_pct: float = 0.0, slippage_pct: float = 0.0,
+                       max_bars: Optional[int] = None) -> dict:
+    """
+    signals: strategy output (timestamp, tp, sl; entry is ignored, fills come from Open).
+    max_bars: optional cap on bars held (exit at that bar's Close, status TIME).
+
+    Returns the same shape as run_backtest plus "skipped_signals".
+    """
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    index = df.index
+    opens = df["Open"].to_numpy(dtype="float64")
+    high = df["High"].to_numpy(dtype="float64")
+    low = df["Low"].to_numpy(dtype="float64")
+    close = df["Close"].to_numpy(dtype="float64")
+    n = len(df)
+
+    pos = signal_positions(index, signals)
+    order = np.argsort(pos, kind="stable")
+
+    trades = []
+    pnl = []
+    skipped = 0
+    next_free = 0  # first bar on which a new position may be entered
+
+    for k in order:
+        p = int(pos[k])
+        e = p + 1
+        if p < 0 or e >= n or e < next_free:
+            skipped += 1
+            continue
+        s = signals[k]
+        tp = float(s["tp"])
+        sl = float(s["sl"])
+        if not (sl < opens[e] < tp):
+            skipped += 1
+            continue
+
+        entry_fill = opens[e] * (1.0 + slippage_pct)
+        stop = n if max_bars is None else min(n, e + int(max_bars))
+        h = first_hit(high, low, e, tp, sl, stop=stop)
+        if h < 0:
+            x = stop - 1
+            status = "END" if stop == n else "TIME"
+            exit_level = close[x]
+        else:
+            x = h
+            if h > e and opens[h] <= sl:
+                status, exit_level = "SL", opens[h]
+            elif h > e and opens[h] >= tp:
+                status, exit_level = "TP", opens[h]
+            elif high[h] >= tp:
+                status, exit_level = "TP", tp
+            else:
+                status, exit_level = "SL", sl
+        exit_fill = exit_level * (1.0 - slippage_pct)
+        result = exit_fill * (1.0 - fee_pct) - entry_fill * (1.0 + fee_pct)
+
+        trades.append({
+            "ticker": ticker,
+            "entry_time": str(index[e]),
+            "exit_time": str(index[x]),
+            "entry": float(entry_fill),
+            "exit": float(exit_fill),
+            "result": float(result),
+            "status": status,
+            "tp": tp,
+            "sl": sl,
+        })
+        pnl.append(result)
+        next_free = x + 1
+
+    metrics = trade_metrics(pnl)
+    return {"ticker": ticker, **metrics, "trades": trades, "skipped_signals": skipped}
@@ -0,0 +1,97 @@
+"""
+intrabar.py
+
+Resolve bars where both TP and SL were touched using finer-interval bars.
+
+On a daily bar with High >= TP and Low <= SL the OHLC alone cannot tell which level
+was hit first; run_backtest assumes TP. IntrabarResolver looks at the finer bars
+(e.g. 15m or 1m from the DataProvider cache, `<ticker>_<interval>.csv`) inside that
+bar's time span and returns the level hit first:
+
+  - the finer file is read once per ticker and kept as sorted int64 ns timestamps +
+    High/Low arrays; each lookup is two searchsorted calls plus a first_hit scan over
+    that bar's slice, so only ambiguous bars pay anything
+  - answers are memoized per (bar_start, tp, sl)
+  - returns None when there are no finer bars for the span, or the first finer bar
+    touching a level touches both (still ambiguous) -- the caller keeps its default
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bot_analisa.backtest.kernels import first_hit
+
+
+class IntrabarResolver:
+    def __init__(self, provider, ticker: str, interval: str = "15m", download: bool = False) -> None:
+        """
+        provider: DataProvider (load_cached / get_historical)
+        download: fetch the finer interval when it is not cached (default: cache only)
+        """
+        self.provider = provider
+        self.ticker = ticker
+        self.interval = interval
+        self.download = download
+        self._loaded = False
+        self._stamps = np.zeros(0, dtype="int64")
+        self._high = np.zeros(0, dtype="float64")
+        self._low = np.zeros(0, dtype="float64")
+        self._tz = None
+        self._memo: Dict[Tuple[int, float, float], Optional[str]] = {}
+        self.lookups = 0
+
+    def _load(self, tz) -> None:
+        self._loaded = True
+        df = self.provider.load_cached(self.ticker, self.interval)
+        if df is None and self.download:
+            df = self.provider.get_historical(self.ticker, period="60d", interval=self.interval)
+        if df is None or df.empty:
+            return
+        stamps = pd.DatetimeIndex(pd.to_datetime(df["Datetime"]))
+        # compare on the wall clock of the coarse bars
+        if stamps.tz is not None and tz is None:
+            stamps = stamps.tz_localize(None)
+        elif stamps.tz is None and tz is not None:
+            stamps = stamps.tz_localize(tz)
+        elif stamps.tz is not None:
+            stamps = stamps.tz_convert(tz)
+        order = np.argsort(stamps.asi8, kind="stable")
+        self._tz = tz
+        self._stamps = stamps.as_unit("ns").asi8[order]
+        self._high = pd.to_numeric(df["High"], errors="coerce").to_numpy(dtype="float64")[order]
+        self._low = pd.to_numeric(df["Low"], errors="coerce").to_numpy(dtype="float64")[order]
+
+    @staticmethod
+    def _ns(ts: pd.Timestamp) -> int:
+        return int(pd.Timestamp(ts).as_unit("ns").value)
+
+    def resolve(self, bar_start: pd.Timestamp, bar_end: pd.Timestamp, tp: float, sl: float) -> Optional[str]:
+        """'TP' or 'SL' for the level hit first within [bar_start, bar_end), else None."""
+        if not self._loaded:
+            self._load(pd.Timestamp(bar_start).tz)
+        key = (self._ns(bar_start), float(tp), float(sl))
+        if key in self._memo:
+            return self._memo[key]
+
+        self.lookups += 1
+        lo, hi = np.searchsorted(self._stamps, [self._ns(bar_start), self._ns(bar_end)], side="left")
+        answer = None
+        hit = first_hit(self._high, self._low, int(lo), tp, sl, stop=int(hi)) if hi > lo else -1
+        if hit >= 0:
+            up = self._high[hit] >= tp
+            down = self._low[hit] <= sl
+            if up != down:
+                answer = "TP" if up else "SL"
+        self._memo[key] = answer
+        return answer
+
+
+def bar_end(index: pd.Index, pos: int) -> pd.Timestamp:
+    """End (exclusive) of the bar at pos: the next bar's start, or start + the typical bar spacing."""
+    if pos + 1 < len(index):
+        return index[pos + 1]
+    if len(index) > 1:
+        return index[pos] + pd.Series(index).diff().median()
+    return index[pos] + pd.Timedelta(days=1)
@@ -0,0 +1,58 @@
+"""
+kernels.py
+
+Array kernels shared by the backtest engines. They work on plain NumPy arrays and
+integer bar positions, never on DataFrame rows.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# first scan window; doubles on every miss so long-running trades cost O(log n) calls
+FIRST_CHUNK = 16
+
+
+def first_hit(high: np.ndarray, low: np.ndarray, start: int, tp: float, sl: float,
+              stop: Optional[int] = None) -> int:
+    """
+    First position i in [start, stop) where high[i] >= tp or low[i] <= sl, else -1.
+
+    The caller decides priority on that bar (the backtester checks TP first).
+    NaN bars never hit, same as the row-wise comparison.
+    """
+    n = len(high) if stop is None else stop
+    pos = start
+    chunk = FIRST_CHUNK
+    while pos < n:
+        end = min(pos + chunk, n)
+        hit = (high[pos:end] >= tp) | (low[pos:end] <= sl)
+        idx = int(np.argmax(hit))
+        if hit[idx]:
+            return pos + idx
+        pos = end
+        chunk *= 2
+    return -1
+
+
+def trade_metrics(pnl) -> dict:
+    """
+    Summary metrics of a PnL sequence (in trade order).
+
+    max_dd is the largest drop of cumulative PnL from its running peak (peak starts at 0).
+    """
+    pnl = np.asarray(pnl, dtype="float64")
+    total = int(pnl.shape[0])
+    if total == 0:
+        return {"total_trades": 0, "winrate": 0, "pf": 0, "max_dd": 0, "equity_curve": []}
+    equity = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0))
+    gross_win = float(pnl[pnl > 0].sum())
+    gross_loss = float(-pnl[pnl < 0].sum())
+    return {
+        "total_trades": total,
+        "winrate": int((pnl > 0).sum()) / total,
+        "pf": (gross_win / gross_loss) if gross_loss > 0 else float("inf"),
+        "max_dd": float((peak - equity).max()),
+        "equity_curve": equity.tolist(),
+    }
@@ -0,0 +1,183 @@
+"""
+parallel.py
+
+Process-pool evaluation of tune_params combos over one shared-memory copy of the
+price arrays.
+
+The parent packs the columns and the DatetimeIndex (as int64 ns) into a single
+SharedMemory block. Each worker attaches once in its initializer and wraps the
+buffer in a read-only DataFrame without copying, so a task only ships (position,
+window, folds, params) instead of a pickled DataFrame. Results stream back with
+imap_unordered and are put back in input order before returning.
+
+SharedPool keeps the pool and the block alive for a whole tune_params run: halving
+rounds, random batches and prune_below probes all evaluate on the same frame (or its
+most recent n_bars), so they reuse the workers instead of paying for process spawn
+and a frame copy per call. Each worker keeps its own indicator cache per window, and
+tune_params hands over combos sorted by indicator signature, so neighbouring tasks
+(often picked up by the same worker) reuse the same EMA/SMA/ATR series.
+
+Only frames with a DatetimeIndex and plain numeric (int/float/bool) columns can be
+shared; shareable() tells tune_params when to stay serial instead.
+"""
+
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, List, Optional
+import os
+
+import numpy as np
+import pandas as pd
+
+# per-process state set by _init_worker
+_WORKER: dict = {}
+
+# numpy dtype kinds that round-trip losslessly through the float64 block
+_SHAREABLE_KINDS = "biuf"
+
+
+def shareable(df: pd.DataFrame) -> bool:
+    """True when share_frame can hand df to workers unchanged."""
+    if not isinstance(df.index, pd.DatetimeIndex):
+        return False
+    return all(isinstance(dtype, np.dtype) and dtype.kind in _SHAREABLE_KINDS and dtype.itemsize <= 8
+               for dtype in df.dtypes)
+
+
+def share_frame(df: pd.DataFrame):
+    """
+    Copy the columns + index of df into shared memory. Returns (shm, spec).
+
+    Raises ValueError for frames shareable() rejects (other index types, object/string/
+    categorical/extension columns), so workers never see a different frame than the parent.
+    """
+    if not shareable(df):
+        raise ValueError("share_frame needs a DatetimeIndex and int/float/bool columns only")
+    n, k = df.shape
+    shm = SharedMemory(create=True, size=max(8 * n * (k + 1), 1))
+    index_view = np.ndarray((n,), dtype="int64", buffer=shm.buf)
+    index_view[:] = df.index.as_unit("ns").asi8
+    values_view = np.ndarray((n, k), dtype="float64", buffer=shm.buf, offset=8 * n)
+    values_view[:] = df.to_numpy(dtype="float64")
+    spec = {
+        "name": shm.name,
+        "rows": n,
+        "columns": list(df.columns),
+        "dtypes": [str(dtype) for dtype in df.dtypes],
+        "index_name": df.index.name,
+        "tz": str(df.index.tz) if df.index.tz is not None else None,
+    }
+    return shm, spec
+
+
+def attach_frame(spec: dict):
+    """Attach to a block made by share_frame. Returns (shm, df); keep shm alive while df is used."""
+    shm = SharedMemory(name=spec["name"])
+    n = spec["rows"]
+    k = len(spec["columns"])
+    stamps = np.ndarray((n,), dtype="int64", buffer=shm.buf)
+    stamps.flags.writeable = False
+    index = pd.DatetimeIndex(stamps.view("M8[ns]"), name=spec["index_name"])
+    if spec["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(spec["tz"])
+    values = np.ndarray((n, k), dtype="float64", buffer=shm.buf, offset=8 * n)
+    # every worker reads the same pages; a task must not be able to change another's data
+    values.flags.writeable = False
+    df = pd.DataFrame(values, index=index, columns=spec["columns"], copy=False)
+    # int/bool columns go back to their own dtype (a copy of just those columns)
+    restore = {col: dtype for col, dtype in zip(spec["columns"], spec["dtypes"]) if dtype != "float64"}
+    if restore:
+        df = df.astype(restore, copy=False)
+    return shm, df
+
+
+def _init_worker(spec: dict, backtester, ticker: str, signal_generator, robust=None) -> None:
+    shm, df = attach_frame(spec)
+    _WORKER.update(shm=shm, df=df, bt=backtester, ticker=ticker, indicator_caches={},
+                   signal_generator=signal_generator, robust=robust)
+
+
+def _run_task(task):
+    pos, n_bars, folds, params = task
+    w = _WORKER
+    df = w["df"]
+    frame = df if n_bars >= len(df) else df.iloc[-n_bars:]
+    cache = w["indicator_caches"].setdefault(len(frame), {})
+    row = w["bt"]._evaluate_params(w["ticker"], frame, params, w["signal_generator"], folds,
+                                   indicator_cache=cache, robust=w["robust"])
+    return pos, row
+
+
+class SharedPool:
+    """
+    Worker pool attached to one shared copy of df, reused across evaluate() calls.
+
+    Use as a context manager (or call close()); the block is unlinked on exit.
+    """
+
+    def __init__(self, backtester, ticker: str, df: pd.DataFrame,
+                 signal_generator: Optional[Callable] = None,
+                 n_jobs: int = -1,
+                 robust: Optional[dict] = None):
+        self.workers = max(1, (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else int(n_jobs))
+        self.rows = len(df)
+        self._shm, spec = share_frame(df)
+        try:
+            self._pool = get_context().Pool(processes=self.workers, initializer=_init_worker,
+                                            initargs=(spec, backtester, ticker, signal_generator, robust))
+        except Exception:
+            self._release()
+            raise
+
+    def evaluate(self, param_list: List[dict], n_bars: Optional[int] = None,
+                 folds: Optional[list] = None,
+                 on_result: Optional[Callable] = None) -> List[dict]:
+        """
+        Rows for param_list (same order), evaluated on the most recent n_bars of the
+        shared frame (all of it by default). on_result(params, row) runs in the parent as
+        each row arrives.
+        """
+        n_bars = self.rows if n_bars is None else int(n_bars)
+        rows: List[Optional[dict]] = [None] * len(param_list)
+        tasks = ((pos, n_bars, folds, params) for pos, params in enumerate(param_list))
+        for pos, row in self._pool.imap_unordered(_run_task, tasks):
+            rows[pos] = row
+            if on_result is not None:
+                on_result(param_list[pos], row)
+        return rows
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._release()
+
+    def _release(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def evaluate_parallel(backtester, ticker: str, df: pd.DataFrame, param_list: List[dict],
+                      signal_generator: Optional[Callable] = None,
+                      folds: Optional[list] = None,
+                      n_jobs: int = -1,
+                      on_result: Optional[Callable] = None,
+                      robust: Optional[dict] = None) -> List[dict]:
+    """
+    One-off SharedPool.evaluate: every params dict in a process pool; returns rows in
+    param_list order. on_result(params, row) runs in the parent as each row arrives.
+    """
+    workers = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else int(n_jobs)
+    n_jobs = max(1, min(workers, len(param_list)))
+    with SharedPool(backtester, ticker, df, signal_generator=signal_generator, n_jobs=n_jobs,
+                    robust=robust) as pool:
+        return pool.evaluate(param_list, folds=folds, on_result=on_result)
@@ -0,0 +1,261 @@
+"""
+portfolio.py
+
+Multi-ticker portfolio backtest over one merged timeline with shared capital.
+
+Prices are packed into compact T x N float32 panels (T = union of all bar
+timestamps, N = tickers; NaN where a ticker has no bar), so 500 tickers x 5 years
+of daily bars is ~2.5 MB per panel. The simulation steps the timeline once; on
+every bar the open book is updated with array ops over the N columns:
+
+  1. entries: a signal fills at the Open (plus slippage) of its own ticker's next bar,
+     which on a suspended or misaligned calendar can be several timeline rows later.
+     It is skipped when the ticker is already held, has no later bar, or the Open gaps
+     through TP/SL. Candidates are sized and capped with risk.allocate_arrays against the
+     cash on hand, the free position slots and optional sector budgets.
+  2. exits: same rules as engine.run_event_backtest (gap-through at the Open after
+     the entry bar, otherwise TP first, then SL; optional max_bars at the Close).
+  3. equity: cash + qty * last known Close of every held ticker.
+
+Positions still open after the last bar are closed at their last Close (END).
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bot_analisa.backtest.engine import signal_positions
+from bot_analisa.backtest.kernels import trade_metrics
+from bot_analisa.risk.portfolio import ALLOC_OK, allocate_arrays
+from bot_analisa.risk.ticks import IDX_LOT_SIZE
+
+
+def build_panel(frames: Dict[str, pd.DataFrame], columns=("Open", "High", "Low", "Close"),
+                dtype="float32") -> Tuple[pd.Index, List[str], Dict[str, np.ndarray]]:
+    """Align per-ticker OHLC frames on the union timeline. Returns (index, tickers, {col: T x N array})."""
+    tickers = list(frames.keys())
+    index = None
+    for df in frames.values():
+        index = df.index if index is None else index.union(df.index)
+    if index is None:
+        index = pd.DatetimeIndex([])
+    index = index.sort_values()
+
+    panel = {c: np.full((len(index), len(tickers)), np.nan, dtype=dtype) for c in columns}
+    for j, t in enumerate(tickers):
+        df = frames[t]
+        rows = index.get_indexer(df.index)
+        for c in columns:
+            panel[c][rows, j] = df[c].to_numpy(dtype=dtype)
+    return index, tickers, panel
+
+
+def _signal_table(index: pd.Index, tickers: List[str], signals: Dict[str, List[dict]],
+                  ticker_rows: List[np.ndarray]):
+    """
+    Flatten per-ticker signals into arrays sorted by fill bar: (bar, col, tp, sl, score).
+
+    bar is the timeline row of the ticker's first own bar after the signal (ticker_rows[j]
+    holds the sorted timeline rows where ticker j has a bar), -1 when there is none.
+    """
+    bars, cols, tps, sls, scores = [], [], [], [], []
+    for j, t in enumerate(tickers):
+        sigs = signals.get(t) or []
+        if not sigs:
+            continue
+        pos = signal_positions(index, sigs)
+        # the ticker's next own row, not the next timeline row (suspensions, other calendars)
+        own = np.append(ticker_rows[j], -1)
+        pos = np.where(pos >= 0, own[np.searchsorted(own[:-1], pos, side="right")], -1)
+        tp = np.asarray([float(s["tp"]) for s in sigs], dtype="float64")
+        sl = np.asarray([float(s["sl"]) for s in sigs], dtype="float64")
+        entry = np.asarray([float(s.get("entry", np.nan)) for s in sigs], dtype="float64")
+        # default ranking: reward/risk of the signal as issued
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rr = (tp - entry) / (entry - sl)
+        score = np.asarray([float(s["score"]) if s.get("score") is not None else r for s, r in zip(sigs, rr)])
+        bars.append(pos)
+        cols.append(np.full(len(sigs), j, dtype="int64"))
+        tps.append(tp)
+        sls.append(sl)
+        scores.append(np.nan_to_num(score, nan=0.0))
+    if not bars:
+        empty = np.zeros(0)
+        return np.zeros(0, dtype="int64"), np.zeros(0, dtype="int64"), empty, empty, empty
+    bar = np.concatenate(bars)
+    order = np.argsort(bar, kind="stable")
+    return (bar[order], np.concatenate(cols)[order], np.concatenate(tps)[order],
+            np.concatenate(sls)[order], np.concatenate(scores)[order])
+
+
+def run_portfolio_backtest(frames: Dict[str, pd.DataFrame],
+                           signals: Dict[str, List[dict]],
+                           initial_cash: float = 100_000_000.0,
+                           max_positions: int = 10,
+                           risk_per_trade: float = 0.01,
+                           lot_size: int = IDX_LOT_SIZE,
+                           fee_pct: float = 0.0,
+                           slippage_pct: float = 0.0,
+                           max_bars: Optional[int] = None,
+                           sectors: Optional[Dict[str, str]] = None,
+                           sector_cap: Optional[float] = None) -> dict:
+    """
+    frames: ticker -> OHLC DataFrame (DatetimeIndex); signals: ticker -> strategy output
+      (timestamp, tp, sl, optional entry/score; higher score is filled first, default
+      reward/risk).
+    sectors / sector_cap: ticker -> sector, and the max fraction of current equity
+      held per sector.
+
+    Returns portfolio metrics (final_equity, total_return, max_dd, max_dd_pct),
+    trade metrics over all closed trades, the equity curve aligned with "timeline",
+    the trade list and skipped-signal counts by reason.
+    """
+    frames = {t: (df if df.index.is_monotonic_increasing else df.sort_index()) for t, df in frames.items()}
+    index, tickers, panel = build_panel(frames)
+    opens, high, low, close = panel["Open"], panel["High"], panel["Low"], panel["Close"]
+    n_bars, n_tickers = opens.shape
+    last_close = pd.DataFrame(close).ffill().to_numpy(dtype="float32") if n_bars else close
+    sector_of = np.asarray([(sectors or {}).get(t, "") for t in tickers], dtype=object)
+
+    ticker_rows = [np.sort(index.get_indexer(frames[t].index)) for t in tickers]
+    sig_bar, sig_col, sig_tp, sig_sl, sig_score = _signal_table(index, tickers, signals, ticker_rows)
+
+    # open book, one slot per ticker
+    qty = np.zeros(n_tickers, dtype="int64")
+    entry_px = np.zeros(n_tickers, dtype="float64")
+    entry_bar = np.full(n_tickers, -1, dtype="int64")
+    tp = np.zeros(n_tickers, dtype="float64")
+    sl = np.zeros(n_tickers, dtype="float64")
+
+    cash = float(initial_cash)
+    equity = np.zeros(n_bars, dtype="float64")
+    trades: List[dict] = []
+    skipped: Dict[str, int] = {}
+
+    def skip(reason: str, count: int) -> None:
+        if count:
+            skipped[reason] = skipped.get(reason, 0) + int(count)
+
+    def close_positions(cols: np.ndarray, bar: int, levels: np.ndarray, status: np.ndarray) -> float:
+        fills = levels * (1.0 - slippage_pct)
+        proceeds = qty[cols] * fills * (1.0 - fee_pct)
+        costs = qty[cols] * entry_px[cols] * (1.0 + fee_pct)
+        for j, fill, res, st in zip(cols, fills, proceeds - costs, status):
+            trades.append({
+                "ticker": tickers[j],
+                "entry_time": str(index[entry_bar[j]]),
+                "exit_time": str(index[bar]),
+                "qty": int(qty[j]),
+                "entry": float(entry_px[j]),
+                "exit": float(fill),
+                "result": float(res),
+                "status": str(st),
+                "tp": float(tp[j]),
+                "sl": float(sl[j]),
+            })
+        qty[cols] = 0
+        entry_bar[cols] = -1
+        return float(proceeds.sum())
+
+    # signals before the ticker's first bar or on its last bar never get an entry bar
+    skip("no_bar", int((sig_bar < 0).sum()))
+    bounds = np.searchsorted(sig_bar, np.arange(0, n_bars + 1), side="left")
+
+    for t in range(n_bars):
+        o = opens[t].astype("float64")
+        held = qty > 0
+
+        # 1. entries from signals whose ticker's next bar is this one
+        lo, hi = int(bounds[t]), int(bounds[t + 1])
+        if t > 0 and hi > lo:
+            cols = sig_col[lo:hi]
+            c_tp = sig_tp[lo:hi]
+            c_sl = sig_sl[lo:hi]
+            c_score = sig_score[lo:hi]
+            # several signals for one ticker on a bar: keep the last one
+            _, last = np.unique(cols[::-1], return_index=True)
+            keep = np.sort(len(cols) - 1 - last)
+            skip("duplicate", len(cols) - len(keep))
+            cols, c_tp, c_sl, c_score = cols[keep], c_tp[keep], c_sl[keep], c_score[keep]
+
+            c_open = o[cols]
+            busy = held[cols]
+            no_bar = ~np.isfinite(c_open) & ~busy
+            gapped = np.isfinite(c_open) & ~busy & ~((c_sl < c_open) & (c_open < c_tp))
+            skip("position_open", busy.sum())
+            skip("no_bar", no_bar.sum())
+            skip("gap", gapped.sum())
+            ok = ~(busy | no_bar | gapped)
+            cols, c_tp, c_sl, c_score = cols[ok], c_tp[ok], c_sl[ok], c_score[ok]
+
+            if len(cols):
+                fill = c_open[ok] * (1.0 + slippage_pct)
+                mark = float(cash + (qty * np.nan_to_num(last_close[t - 1])).sum())
+                budget = {}
+                if sector_cap is not None:
+                    exposure = pd.Series(qty * np.nan_to_num(last_close[t - 1])).groupby(sector_of).sum()
+                    for sec in set(sector_of[cols]):
+                        budget[sec] = max(0.0, sector_cap * mark - float(exposure.get(sec, 0.0)))
+                q, reason = allocate_arrays(fill * (1.0 + fee_pct), c_sl, c_score, sector_of[cols], cash, mark,
+                                            max_positions - int(held.sum()), budget,
+                                            risk_per_trade=risk_per_trade, lot_size=lot_size)
+                for r in set(reason[reason != ALLOC_OK]):
+                    skip(r, (reason == r).sum())
+                filled = q > 0
+                fc = cols[filled]
+                qty[fc] = q[filled]
+                entry_px[fc] = fill[filled]
+                entry_bar[fc] = t
+                tp[fc] = c_tp[filled]
+                sl[fc] = c_sl[filled]
+                cash -= float((q[filled] * fill[filled] * (1.0 + fee_pct)).sum())
+
+        # 2. exits (new positions can exit on their entry bar, but not by gap)
+        held = qty > 0
+        if held.any():
+            h = high[t].astype("float64")
+            lw = low[t].astype("float64")
+            later = held & (entry_bar < t)
+            gap_sl = later & (o <= sl)
+            gap_tp = later & ~gap_sl & (o >= tp)
+            hit_tp = held & ~gap_sl & ~gap_tp & (h >= tp)
+            hit_sl = held & ~gap_sl & ~gap_tp & ~hit_tp & (lw <= sl)
+            level = np.where(gap_sl | gap_tp, o, np.where(hit_tp, tp, sl))
+            status = np.where(gap_tp | hit_tp, "TP", "SL").astype(object)
+            done = gap_sl | gap_tp | hit_tp | hit_sl
+            if max_bars is not None:
+                timed = held & ~done & (t - entry_bar + 1 >= int(max_bars)) & np.isfinite(close[t])
+                level = np.where(timed, close[t], level)
+                status[timed] = "TIME"
+                done |= timed
+            cols = np.flatnonzero(done)
+            if len(cols):
+                cash += close_positions(cols, t, level[cols], status[cols])
+
+        equity[t] = cash + float((qty * np.nan_to_num(last_close[t])).sum())
+
+    open_cols = np.flatnonzero(qty > 0)
+    if len(open_cols):
+        cash += close_positions(open_cols, n_bars - 1, last_close[-1, open_cols].astype("float64"),
+                                np.full(len(open_cols), "END", dtype=object))
+        equity[-1] = cash
+
+    metrics = trade_metrics([tr["result"] for tr in trades])
+    peak = np.maximum.accumulate(np.maximum(equity, initial_cash)) if n_bars else equity
+    drawdown = peak - equity
+    return {
+        "tickers": tickers,
+        "initial_cash": float(initial_cash),
+        "final_equity": float(equity[-1]) if n_bars else float(initial_cash),
+        "total_return": (float(equity[-1]) / initial_cash - 1.0) if n_bars else 0.0,
+        "max_dd": float(drawdown.max()) if n_bars else 0.0,
+        "max_dd_pct": float((drawdown / peak).max()) if n_bars else 0.0,
+        "total_trades": metrics["total_trades"],
+        "winrate": metrics["winrate"],
+        "pf": metrics["pf"],
+        "timeline": [str(ts) for ts in index],
+        "equity_curve": equity.tolist(),
+        "trades": trades,
+        "skipped_signals": skipped,
+    }
@@ -0,0 +1,234 @@
+"""
+report.py
+
+Columnar trade logs and compact on-disk backtest reports.
+
+A trade log is a column dict, one aligned array per field:
+
+    entry_time, exit_time   DatetimeIndex (tz kept)
+    entry, exit, result, tp, sl   float64
+    status                  str array (TP / SL / END / TIME)
+    qty                     int64 (portfolio backtests only)
+
+save_report writes two files per report:
+
+    <stem>.json   small summary (ticker + scalar metrics, Infinity/NaN -> null,
+                  trade_count, files written) -- cheap to scan for many tickers
+    <stem>.npz    the trade log (timestamps as int64 ns UTC) + equity_curve
+                  (or <stem>.parquet for the trade log when fmt="parquet", needs pyarrow)
+
+load_report reads one report back; load_reports / load_summaries read a whole
+folder into one trades / summary DataFrame for cross-ticker analysis.
+"""
+
+from typing import Dict, List, Optional
+import glob
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+TIME_COLUMNS = ("entry_time", "exit_time")
+FLOAT_COLUMNS = ("entry", "exit", "result", "tp", "sl")
+
+
+def _times(values) -> object:
+    values = list(values)
+    if values and all(isinstance(v, pd.Timestamp) for v in values):
+        return pd.DatetimeIndex(values)
+    if not values:
+        return pd.DatetimeIndex([])
+    return np.asarray(values)
+
+
+def trade_log(cols: dict) -> Dict[str, object]:
+    """Trade log from a column dict such as Backtester._simulate_trades output (result = exit - entry if missing)."""
+    log: Dict[str, object] = {c: _times(cols.get(c, [])) for c in TIME_COLUMNS}
+    for c in ("entry", "exit", "tp", "sl"):
+        log[c] = np.asarray(cols.get(c, []), dtype="float64")
+    log["result"] = (np.asarray(cols["result"], dtype="float64") if "result" in cols
+                     else log["exit"] - log["entry"])
+    log["status"] = np.asarray(cols.get("status", []), dtype=str)
+    if "qty" in cols:
+        log["qty"] = np.asarray(cols["qty"], dtype="int64")
+    return log
+
+
+def trade_log_from_records(trades: List[dict]) -> Dict[str, object]:
+    """Trade log from a list of trade dicts (run_event_backtest / portfolio output)."""
+    if not trades:
+        return trade_log({})
+    frame = pd.DataFrame(trades)
+    cols = {c: frame[c].tolist() for c in frame.columns if c != "ticker"}
+    for c in TIME_COLUMNS:
+        if c in cols:
+            cols[c] = list(pd.to_datetime(frame[c]))
+    log = trade_log(cols)
+    if "ticker" in frame.columns and frame["ticker"].nunique() > 1:
+        log["ticker"] = frame["ticker"].to_numpy(dtype=str)
+    return log
+
+
+def trade_records(log: Dict[str, object], ticker: str) -> List[dict]:
+    """Row dicts (TradeResult layout, timestamps as str) from a trade log."""
+    return [
+        {"ticker": ticker, "entry_time": str(et), "exit_time": str(xt), "entry": en, "exit": ex,
+         "result": r, "status": st, "tp": tp, "sl": sl}
+        for et, xt, en, ex, r, st, tp, sl in zip(
+            log["entry_time"], log["exit_time"], log["entry"].tolist(), log["exit"].tolist(),
+            log["result"].tolist(), log["status"].tolist(), log["tp"].tolist(), log["sl"].tolist())
+    ]
+
+
+def _json_safe(value):
+    """Scalars for strict JSON: numpy -> python, non-finite floats -> None."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def report_summary(result: dict) -> dict:
+    """Scalar part of a backtest result (lists/arrays dropped, strict-JSON safe)."""
+    summary = {}
+    for k, v in result.items():
+        if k in ("trades", "trade_log", "equity_curve", "timeline"):
+            continue
+        if isinstance(v, dict):
+            summary[k] = {kk: _json_safe(vv) for kk, vv in v.items()}
+        elif isinstance(v, (list, tuple, np.ndarray)):
+            continue
+        else:
+            summary[k] = _json_safe(v)
+    return summary
+
+
+def _stem(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return root if ext in (".json", ".npz", ".parquet") else path
+
+
+def save_report(result: dict, path: str, fmt: str = "npz") -> dict:
+    """
+    Write <stem>.json (summary) + <stem>.npz / <stem>.parquet (trade log, equity curve).
+
+    fmt="json" writes the old single-file layout (whole result) but still as strict JSON.
+    Returns the summary that was written.
+    """
+    if fmt not in ("npz", "parquet", "json"):
+        raise ValueError(f"Unknown report format '{fmt}'")
+    stem = _stem(path)
+    os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+
+    log = result.get("trade_log")
+    if log is None:
+        log = trade_log_from_records(result.get("trades", []))
+    equity = np.asarray(result.get("equity_curve", []), dtype="float64")
+
+    summary = report_summary(result)
+    summary["trade_count"] = int(len(log["entry"]))
+
+    if fmt == "json":
+        full = dict(summary)
+        full["equity_curve"] = [_json_safe(float(v)) for v in equity]
+        full["trades"] = [{k: _json_safe(v) for k, v in t.items()}
+                          for t in trade_records(log, result.get("ticker", ""))]
+        with open(stem + ".json", "w") as f:
+            json.dump(full, f, indent=2, allow_nan=False)
+        return full
+
+    arrays, summary["tz"] = pack_trade_log(log)
+
+    if fmt == "parquet":
+        pd.DataFrame(arrays).to_parquet(stem + ".parquet", index=False)
+        np.savez(stem + ".npz", equity_curve=equity)
+        summary["files"] = [os.path.basename(stem + ".parquet"), os.path.basename(stem + ".npz")]
+    else:
+        np.savez(stem + ".npz", equity_curve=equity, **arrays)
+        summary["files"] = [os.path.basename(stem + ".npz")]
+
+    with open(stem + ".json", "w") as f:
+        json.dump(summary, f, indent=2, allow_nan=False)
+    return summary
+
+
+def pack_trade_log(log: Dict[str, object]):
+    """Plain arrays for np.savez (timestamps -> int64 ns UTC) and the tz needed to undo it."""
+    tz = None
+    arrays = {}
+    for c, v in log.items():
+        if isinstance(v, pd.DatetimeIndex):
+            tz = str(v.tz) if v.tz is not None else None
+            arrays[c] = v.as_unit("ns").asi8
+        else:
+            arrays[c] = np.asarray(v)
+    return arrays, tz
+
+
+def unpack_trade_log(arrays: dict, tz: Optional[str]) -> dict:
+    """Inverse of pack_trade_log (modifies and returns arrays)."""
+    for c in TIME_COLUMNS:
+        if c in arrays and np.issubdtype(np.asarray(arrays[c]).dtype, np.integer):
+            idx = pd.DatetimeIndex(np.asarray(arrays[c], dtype="int64").view("M8[ns]"))
+            arrays[c] = idx.tz_localize("UTC").tz_convert(tz) if tz else idx
+    return arrays
+
+
+def load_report(path: str) -> dict:
+    """Summary dict plus "trade_log" (column dict) and "equity_curve" (array)."""
+    stem = _stem(path)
+    with open(stem + ".json") as f:
+        summary = json.load(f)
+    if "files" not in summary:
+        # single-file JSON report (fmt="json" or written before the columnar layout)
+        records = summary.pop("trades", [])
+        summary["trade_log"] = trade_log_from_records(records)
+        summary["equity_curve"] = np.asarray(summary.get("equity_curve", []), dtype="float64")
+        return summary
+
+    arrays: Dict[str, np.ndarray] = {}
+    with np.load(stem + ".npz", allow_pickle=False) as data:
+        equity = data["equity_curve"]
+        for name in data.files:
+            if name != "equity_curve":
+                arrays[name] = data[name]
+    if os.path.exists(stem + ".parquet"):
+        frame = pd.read_parquet(stem + ".parquet")
+        arrays = {c: frame[c].to_numpy() for c in frame.columns}
+    summary["trade_log"] = unpack_trade_log(arrays, summary.get("tz"))
+    summary["equity_curve"] = equity
+    return summary
+
+
+def _report_paths(folder: str, pattern: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(folder, pattern)))
+
+
+def load_summaries(folder: str, pattern: str = "report_*.json") -> pd.DataFrame:
+    """One row per report summary in folder (only the small JSON files are read)."""
+    rows = []
+    for path in _report_paths(folder, pattern):
+        with open(path) as f:
+            summary = json.load(f)
+        rows.append({k: v for k, v in summary.items() if not isinstance(v, (list, dict))})
+    return pd.DataFrame(rows)
+
+
+def load_reports(folder: str, pattern: str = "report_*.json") -> pd.DataFrame:
+    """All trade logs in folder as one DataFrame with a ticker column."""
+    frames = []
+    for path in _report_paths(folder, pattern):
+        rep = load_report(path)
+        log = rep["trade_log"]
+        if not len(log.get("entry", [])):
+            continue
+        frame = pd.DataFrame({c: v for c, v in log.items()})
+        if "ticker" not in frame.columns:
+            frame.insert(0, "ticker", rep.get("ticker"))
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
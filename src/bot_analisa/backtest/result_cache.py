@@ -0,0 +1,115 @@
+"""
+result_cache.py
+
+Content-addressed cache of backtest results on disk.
+
+The key is a sha1 over (kind, ticker, data hash, params hash, code version), so a
+rerun on an unchanged CSV with the same params and code returns the stored result
+without simulating anything, and any change to the data, the params or the version
+stamp (Backtester.code_version) misses.
+
+Each entry is one .npz file under <folder>/<key[:2]>/<key>.npz holding the packed
+trade log, the equity curve and the scalar summary (as a JSON string, Infinity
+allowed so PF round-trips). Writes go through a temp file + os.replace, so
+concurrent runs never read a half-written entry. A hit refreshes the file mtime;
+when the folder grows beyond max_bytes the least recently used entries are deleted.
+"""
+
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from bot_analisa.backtest.report import pack_trade_log, report_summary, trade_records, unpack_trade_log
+
+
+class ResultCache:
+    def __init__(self, folder: str = "cache/backtests", max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.folder = Path(folder)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(kind: str, ticker: str, data_hash: str, params_hash: str, code_version: str) -> str:
+        raw = "\0".join([kind, str(ticker), data_hash, params_hash, code_version])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.folder / key[:2] / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Stored result (same shape as run_backtest) or None."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["__meta__"]))
+                equity = data["equity_curve"]
+                arrays = {name: data[name] for name in data.files if name not in ("__meta__", "equity_curve")}
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+
+        result = dict(meta["summary"])
+        log = unpack_trade_log(arrays, meta["tz"])
+        result["equity_curve"] = equity.tolist()
+        result["trades"] = trade_records(log, result.get("ticker", "")) if len(log.get("entry", [])) else []
+        result["trade_log"] = log
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        log = result.get("trade_log")
+        if log is None:
+            return
+        arrays, tz = pack_trade_log(log)
+        summary = {k: v for k, v in result.items() if k in report_summary(result)}
+        meta = json.dumps({"summary": summary, "tz": tz}, default=str)
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, __meta__=np.asarray(meta),
+                         equity_curve=np.asarray(result.get("equity_curve", []), dtype="float64"), **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.folder.glob("*/*.npz"))
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the folder fits max_bytes. Returns entries removed."""
+        entries = []
+        for p in self.folder.glob("*/*.npz"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for p in self.folder.glob("*/*.npz"):
+            p.unlink()
@@ -0,0 +1,89 @@
+"""
+robustness.py
+
+Monte Carlo robustness of a realised trade sequence.
+
+Winrate / PF / max_dd of one backtest are a single draw. Here the trade PnLs are
+resampled into an (n_resamples x n_trades) matrix of alternative PnL paths and the
+metrics are computed for every path at once with NumPy (no Python loop per path):
+
+  - method="bootstrap": trades drawn with replacement (varies PF, expectancy and max_dd)
+  - method="shuffle":   the same trades in random order (PF and expectancy are fixed,
+                        only the drawdown path changes)
+
+Resamples are processed in blocks of at most MAX_BLOCK_CELLS matrix cells, so memory
+stays bounded for long trade logs. 10k resamples of a few hundred trades take tens
+of milliseconds.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+METHODS = ("bootstrap", "shuffle")
+MAX_BLOCK_CELLS = 4_000_000
+
+
+def resample_paths(pnl, n_resamples: int = 10_000, method: str = "bootstrap",
+                   rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """(n_resamples, n_trades) matrix of resampled PnL sequences."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown resample method '{method}', expected one of {METHODS}")
+    pnl = np.asarray(pnl, dtype="float64")
+    rng = np.random.default_rng() if rng is None else rng
+    n = pnl.shape[0]
+    if method == "bootstrap":
+        return pnl[rng.integers(0, n, size=(n_resamples, n))]
+    return rng.permuted(np.broadcast_to(pnl, (n_resamples, n)), axis=1)
+
+
+def path_metrics(paths: np.ndarray) -> Dict[str, np.ndarray]:
+    """PF, max drawdown (running peak from 0, as trade_metrics) and expectancy per row."""
+    gross_win = np.where(paths > 0, paths, 0.0).sum(axis=1)
+    gross_loss = -np.where(paths < 0, paths, 0.0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pf = np.where(gross_loss > 0, gross_win / gross_loss, np.inf)
+    equity = np.cumsum(paths, axis=1)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0), axis=1)
+    return {
+        "pf": pf,
+        "max_dd": (peak - equity).max(axis=1),
+        "expectancy": paths.mean(axis=1),
+    }
+
+
+def robustness(pnl, n_resamples: int = 10_000, method: str = "bootstrap",
+               confidence: float = 0.9, seed: Optional[int] = 0) -> dict:
+    """
+    Confidence intervals of PF, max_dd and expectancy under resampling.
+
+    Returns <metric>_lo / <metric>_median / <metric>_hi for pf, max_dd and expectancy
+    (two-sided interval at `confidence`), plus n_trades and n_resamples. The
+    pessimistic bounds for ranking are pf_lo, expectancy_lo and max_dd_hi.
+    With fewer than two trades every bound equals the single realised value (or 0).
+    """
+    pnl = np.asarray(pnl, dtype="float64")
+    n = pnl.shape[0]
+    out = {"n_trades": int(n), "n_resamples": int(n_resamples)}
+    if n == 0:
+        for m in ("pf", "max_dd", "expectancy"):
+            out.update({f"{m}_lo": 0.0, f"{m}_median": 0.0, f"{m}_hi": 0.0})
+        return out
+
+    rng = np.random.default_rng(seed)
+    block = max(1, MAX_BLOCK_CELLS // n)
+    parts = {"pf": [], "max_dd": [], "expectancy": []}
+    done = 0
+    while done < n_resamples:
+        size = min(block, n_resamples - done)
+        for k, v in path_metrics(resample_paths(pnl, size, method=method, rng=rng)).items():
+            parts[k].append(v)
+        done += size
+
+    tail = (1.0 - confidence) / 2.0
+    for m, chunks in parts.items():
+        values = np.concatenate(chunks)
+        # inverted_cdf picks observed values, so an infinite PF never interpolates to NaN
+        lo, med, hi = np.quantile(values, [tail, 0.5, 1.0 - tail], method="inverted_cdf")
+        out.update({f"{m}_lo": float(lo), f"{m}_median": float(med), f"{m}_hi": float(hi)})
+    return out
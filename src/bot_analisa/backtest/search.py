@@ -0,0 +1,177 @@
+"""
+search.py
+
+Search strategies for Backtester.tune_params over a discrete param grid.
+
+  - "grid":     every combo (the default, same as before)
+  - "random":   `budget` distinct combos sampled without replacement
+  - "halving":  successive halving over growing data windows: all (or `budget`) combos
+                run on the most recent slice of bars, the best 1/eta advance to an
+                eta-times larger slice, until the survivors run on the full history
+  - "bayes":    lightweight surrogate optimizer: a Gaussian-process (RBF kernel) fit
+                in NumPy over the combos evaluated so far picks the next combo by
+                upper confidence bound, after `n_init` random combos
+
+Every strategy receives an `evaluate(param_list, n_bars=None)` callable that returns
+one row per params dict, aligned with param_list, with None for combos skipped once
+the wall-clock deadline has passed. Rows are ranked with `score(row, metric)`.
+"""
+
+import math
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+SEARCH_STRATEGIES = ("grid", "random", "halving", "bayes")
+
+Evaluate = Callable[..., List[dict]]
+
+
+def score(row: dict, metric: str = "pf") -> float:
+    """
+    Objective of a tune_params row (walk rows use avg_<metric>); non-finite -> 0, max_dd negated.
+
+    Pruned rows carry no full-run metrics; they score by their probe_<metric> value.
+    """
+    key = metric if metric in row else f"avg_{metric}"
+    value = row.get(key)
+    if value is None:
+        value = row.get(f"probe_{key}")
+    value = float(value or 0.0)
+    if not math.isfinite(value):
+        return 0.0
+    return -value if "max_dd" in key else value
+
+
+class Deadline:
+    """Wall-clock budget in seconds (None = unlimited)."""
+
+    def __init__(self, seconds: Optional[float] = None) -> None:
+        self.end = None if seconds is None else time.monotonic() + float(seconds)
+
+    def expired(self) -> bool:
+        return self.end is not None and time.monotonic() >= self.end
+
+
+def _done(rows: List[Optional[dict]]) -> List[dict]:
+    return [r for r in rows if r is not None]
+
+
+def grid_search(space: List[dict], evaluate: Evaluate, **_) -> List[dict]:
+    return _done(evaluate(space))
+
+
+def random_search(space: List[dict], evaluate: Evaluate, budget: Optional[int] = None,
+                  seed: int = 0, **_) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    n = len(space) if budget is None else min(int(budget), len(space))
+    picks = rng.choice(len(space), size=n, replace=False)
+    return _done(evaluate([space[i] for i in picks]))
+
+
+def successive_halving(space: List[dict], evaluate: Evaluate, n_bars: int,
+                       budget: Optional[int] = None, eta: int = 3, min_bars: int = 100,
+                       metric: str = "pf", seed: int = 0, deadline: Optional[Deadline] = None,
+                       **_) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    configs = list(space)
+    if budget is not None and budget < len(configs):
+        configs = [configs[i] for i in rng.choice(len(configs), size=int(budget), replace=False)]
+
+    # number of halvings limited by the config count and the smallest useful window
+    rungs = 0
+    while eta ** (rungs + 1) <= len(configs) and n_bars / eta ** (rungs + 1) >= min_bars:
+        rungs += 1
+
+    rows: List[dict] = []
+    for rung in range(rungs + 1):
+        bars = n_bars if rung == rungs else int(n_bars / eta ** (rungs - rung))
+        evaluated = evaluate(configs, n_bars=bars)
+        for row in _done(evaluated):
+            row["rung"] = rung
+            row["bars"] = bars
+            rows.append(row)
+        if rung == rungs or None in evaluated or (deadline is not None and deadline.expired()):
+            break
+        keep = max(1, len(configs) // eta)
+        ranked = sorted(range(len(evaluated)), key=lambda i: score(evaluated[i], metric), reverse=True)
+        configs = [configs[i] for i in sorted(ranked[:keep])]
+    return rows
+
+
+def _encode(space: List[dict], keys: List[str]) -> np.ndarray:
+    """Each param -> position of its value in the sorted distinct values, scaled to [0, 1]."""
+    cols = []
+    for k in keys:
+        values = [p[k] for p in space]
+        distinct = sorted(set(values), key=lambda v: (str(type(v)), v))
+        pos = {v: i for i, v in enumerate(distinct)}
+        denom = max(len(distinct) - 1, 1)
+        cols.append([pos[v] / denom for v in values])
+    return np.asarray(cols, dtype="float64").T
+
+
+def _gp_posterior(x_train: np.ndarray, y_train: np.ndarray, x_test: np.ndarray,
+                  length_scale: float = 0.3, noise: float = 1e-3):
+    def kernel(a, b):
+        d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=-1)
+        return np.exp(-0.5 * d2 / length_scale ** 2)
+
+    mean = y_train.mean()
+    std = y_train.std() or 1.0
+    y = (y_train - mean) / std
+    k_tt = kernel(x_train, x_train) + noise * np.eye(len(x_train))
+    k_st = kernel(x_test, x_train)
+    chol = np.linalg.cholesky(k_tt)
+    alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, y))
+    mu = k_st @ alpha
+    v = np.linalg.solve(chol, k_st.T)
+    var = np.clip(1.0 - (v ** 2).sum(axis=0), 1e-12, None)
+    return mu * std + mean, np.sqrt(var) * std
+
+
+def surrogate_search(space: List[dict], evaluate: Evaluate, budget: Optional[int] = None,
+                     n_init: int = 5, kappa: float = 1.0, metric: str = "pf", seed: int = 0,
+                     deadline: Optional[Deadline] = None, max_candidates: int = 5000,
+                     **_) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    if not space:
+        return []
+    keys = list(space[0].keys())
+    x_all = _encode(space, keys)
+    budget = len(space) if budget is None else min(int(budget), len(space))
+
+    seen: Dict[int, float] = {}
+    rows: List[dict] = []
+    init = rng.choice(len(space), size=min(n_init, budget), replace=False)
+    for i, row in zip(init, evaluate([space[i] for i in init])):
+        if row is not None:
+            seen[int(i)] = score(row, metric)
+            rows.append(row)
+
+    while seen and len(rows) < budget and not (deadline is not None and deadline.expired()):
+        pending = np.setdiff1d(np.arange(len(space)), np.fromiter(seen.keys(), dtype="int64"))
+        if len(pending) > max_candidates:
+            pending = rng.choice(pending, size=max_candidates, replace=False)
+        idx = np.fromiter(seen.keys(), dtype="int64")
+        mu, sigma = _gp_posterior(x_all[idx], np.fromiter(seen.values(), dtype="float64"), x_all[pending])
+        pick = int(pending[int(np.argmax(mu + kappa * sigma))])
+        evaluated = evaluate([space[pick]])
+        if evaluated[0] is None:
+            break
+        seen[pick] = score(evaluated[0], metric)
+        rows.append(evaluated[0])
+    return rows
+
+
+def run_search(strategy: str, space: List[dict], evaluate: Evaluate, **kwargs) -> List[dict]:
+    if strategy == "grid":
+        return grid_search(space, evaluate, **kwargs)
+    if strategy == "random":
+        return random_search(space, evaluate, **kwargs)
+    if strategy == "halving":
+        return successive_halving(space, evaluate, **kwargs)
+    if strategy == "bayes":
+        return surrogate_search(space, evaluate, **kwargs)
+    raise ValueError(f"Unknown search strategy '{strategy}', expected one of {SEARCH_STRATEGIES}")
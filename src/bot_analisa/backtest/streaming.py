@@ -0,0 +1,160 @@
+"""
+streaming.py
+
+Out-of-core twin of Backtester.run_backtest for the default strategy.
+
+The CSV is read in fixed-size blocks (pd.read_csv chunksize). Per block:
+
+  1. indicators continue from the carried state (indicators/streaming.py), so every
+     EMA/SMA/ATR value equals the in-memory one bit for bit
+  2. entry rules run on the block arrays via strategy.signal_rules, with the previous
+     bar's EMAs carried over the block boundary for the cross check
+  3. trades still open from earlier blocks are scanned first, then the new signals;
+     a trade that does not hit TP/SL inside the block stays open with only its
+     (seq, entry, tp, sl) kept
+  4. after the last block the remaining trades exit at the last Close (END)
+
+iter_trade_blocks yields the trades finished in each block as soon as every older
+signal has closed too, so trades come out in signal order and metrics match
+run_backtest on load_csv(path) exactly. Its own memory is one block plus the open
+trades and the closed ones still waiting behind an older open trade; it does not
+grow with the history length. stream_trades (and so run_backtest_csv) collects
+every yielded block into one trade log, which is O(number of trades) like the
+in-memory result, but never holds the bars or indicator columns of the whole file.
+
+The file must be sorted by Datetime with unique timestamps (load_csv sorts, and the
+in-memory strategy treats duplicate timestamps specially); otherwise ValueError.
+"""
+
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from bot_analisa.backtest.kernels import first_hit
+from bot_analisa.indicators.streaming import StreamingATR, StreamingEMA, StreamingSMA
+from bot_analisa.strategy.strategy import signal_rules
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+TRADE_COLUMNS = ("entry_pos", "exit_pos", "entry_time", "exit_time", "entry", "exit", "tp", "sl", "status")
+
+
+def stream_trades(path: str, params: Optional[dict] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, list]:
+    """Column dict like Backtester._simulate_trades, computed block by block from a CSV."""
+    cols: Dict[str, list] = {k: [] for k in TRADE_COLUMNS}
+    for block in iter_trade_blocks(path, params, chunk_size=chunk_size):
+        for name in TRADE_COLUMNS:
+            cols[name].extend(block[name])
+    return cols
+
+
+def iter_trade_blocks(path: str, params: Optional[dict] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, list]]:
+    """Column dicts (TRADE_COLUMNS) of finished trades, in signal order, one per CSV block that closed any."""
+    params = params or {}
+    ema_fast_p = int(params.get("ema_fast", 9))
+    ema_slow_p = int(params.get("ema_slow", 21))
+    sma_p = int(params.get("sma_trend", 50))
+    atr_p = int(params.get("atr_period", 14))
+    names = {"fast": f"EMA_{ema_fast_p}", "slow": f"EMA_{ema_slow_p}",
+             "sma": f"SMA_{sma_p}", "atr": f"ATR_{atr_p}"}
+    states = {"fast": StreamingEMA(ema_fast_p), "slow": StreamingEMA(ema_slow_p),
+              "sma": StreamingSMA(sma_p), "atr": StreamingATR(atr_p)}
+    snap_ticks = bool(params.get("snap_ticks", False))
+
+    # closed trades not yet yielded (an older signal is still open): seq -> row
+    closed: Dict[int, tuple] = {}
+    # open trades: seq -> (entry_pos, entry_time, entry, tp, sl)
+    open_trades: Dict[int, tuple] = {}
+    seq = 0
+    offset = 0
+    last_ts = None
+    last_close = np.nan
+    prev_fast = np.nan
+    prev_slow = np.nan
+    provided = None
+
+    for block in pd.read_csv(path, chunksize=chunk_size, parse_dates=["Datetime"]):
+        n = len(block)
+        if n == 0:
+            continue
+        stamps = pd.DatetimeIndex(block["Datetime"])
+        if not stamps.is_monotonic_increasing or not stamps.is_unique or (last_ts is not None and stamps[0] <= last_ts):
+            raise ValueError("streaming backtest needs a CSV sorted by Datetime with unique timestamps")
+
+        def num(col):
+            return pd.to_numeric(block[col], errors="coerce").to_numpy(dtype="float64")
+
+        high, low, close = num("High"), num("Low"), num("Close")
+        if provided is None:
+            provided = {k for k, name in names.items() if name in block.columns}
+        values = {}
+        for key, name in names.items():
+            if key in provided:
+                values[key] = num(name)
+            elif {"fast", "slow", "atr"} <= provided:
+                # the strategy only computes indicators when one of EMA/EMA/ATR is missing
+                values[key] = np.full(n, np.nan)
+            elif key == "atr":
+                values[key] = states[key].update(high, low, close)
+            else:
+                values[key] = states[key].update(close)
+        fast, slow = values["fast"], values["slow"]
+        atr = np.nan_to_num(values["atr"], nan=0.0)
+
+        prev_f = np.concatenate(([prev_fast], fast[:-1]))
+        prev_s = np.concatenate(([prev_slow], slow[:-1]))
+        mask, tp_arr, sl_arr = signal_rules(close, fast, slow, prev_f, prev_s, values["sma"], atr, params)
+        starts = np.flatnonzero(mask)
+        entries = close[starts]
+        tps = tp_arr[starts].astype("float64")
+        sls = sl_arr[starts].astype("float64")
+        if snap_ticks and len(starts):
+            # same as generate_signals(snap_ticks): entry to the nearest tick, TP/SL clamped around it
+            from bot_analisa.risk.ticks import snap_tp_sl, snap_to_tick
+            entries = snap_to_tick(entries)
+            tps, sls = snap_tp_sl(tps, sls, entries)
+
+        def settle(key, start, entry_pos, entry_time, entry, tp, sl) -> bool:
+            hit = first_hit(high, low, start, tp, sl)
+            if hit < 0:
+                return False
+            status = "TP" if high[hit] >= tp else "SL"
+            closed[key] = (entry_pos, offset + hit, entry_time, stamps[hit], entry,
+                           tp if status == "TP" else sl, tp, sl, status)
+            return True
+
+        for key in list(open_trades):
+            if settle(key, 0, *open_trades[key]):
+                del open_trades[key]
+
+        for i, entry, tp, sl in zip(starts.tolist(), entries.tolist(), tps.tolist(), sls.tolist()):
+            trade = (offset + i, stamps[i], float(entry), float(tp), float(sl))
+            if not settle(seq, i, *trade):
+                open_trades[seq] = trade
+            seq += 1
+
+        offset += n
+        last_ts = stamps[-1]
+        last_close = float(close[-1])
+        prev_fast, prev_slow = fast[-1], slow[-1]
+
+        ready = _pop_ready(closed, min(open_trades) if open_trades else seq)
+        if ready:
+            yield ready
+
+    for key, (entry_pos, entry_time, entry, tp, sl) in open_trades.items():
+        closed[key] = (entry_pos, offset - 1, entry_time, last_ts, entry, last_close, tp, sl, "END")
+    ready = _pop_ready(closed, seq)
+    if ready:
+        yield ready
+
+
+def _pop_ready(closed: Dict[int, tuple], before: int) -> Dict[str, list]:
+    """Remove and return (as columns) the closed trades with seq < before, in seq order."""
+    keys = sorted(k for k in closed if k < before)
+    if not keys:
+        return {}
+    rows = [closed.pop(k) for k in keys]
+    return {name: list(values) for name, values in zip(TRADE_COLUMNS, zip(*rows))}
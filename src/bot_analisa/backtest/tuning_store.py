@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import math
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+# strict-JSON stand-in for non-finite floats (pf=inf when a run has no losing trade)
+_FLOAT_TAG = "__float__"
+
+
+def _encode(value):
+    """JSON-ready copy of a row: numpy scalars -> python, inf/-inf/nan -> {"__float__": "inf"}."""
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return {_FLOAT_TAG: repr(value)}
+    return value
+
+
+def _decode_object(obj: dict):
+    if len(obj) == 1 and _FLOAT_TAG in obj:
+        return float(obj[_FLOAT_TAG])
+    return obj
+
+
+def dumps(value, sort_keys: bool = False) -> str:
+    """Strict JSON (allow_nan=False); raises TypeError for values a fresh row could not round-trip."""
+    return json.dumps(_encode(value), sort_keys=sort_keys, allow_nan=False)
+
+
+def loads(text: str):
+    """Inverse of dumps (also reads rows written with bare Infinity/NaN by older code)."""
+    return json.loads(text, object_hook=_decode_object)
+
+
+class TuningStore:
+    """
+    SQLite store of tune_params rows (`tuning/tuning.db` by default).
+
+    One row per (ticker, data_fp, param_hash, code_version), written and committed as
+    soon as a combo finishes, so a killed run keeps everything evaluated so far and a
+    rerun on the same data/code skips those combos. Rows are strict JSON with inf/NaN
+    tagged, so a stored row reads back with the same values and types as a fresh one.
+    Like SignalStorage, each thread keeps one connection (reopened after a fork).
+    """
+
+    def __init__(self, path: str = "tuning/tuning.db") -> None:
+        self.db_path = Path(path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection (opened on first use, and again after a fork)."""
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None and local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA busy_timeout=30000;")
+        local.conn, local.pid = conn, os.getpid()
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection (a later call reopens it)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def _init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tuning_results (
+                    ticker TEXT NOT NULL,
+                    data_fp TEXT NOT NULL,
+                    param_hash TEXT NOT NULL,
+                    code_version TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at TEXT,
+                    PRIMARY KEY (ticker, data_fp, param_hash, code_version)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tuning_ticker ON tuning_results(ticker)")
+
+    def load(self, ticker: str, data_fp: str, code_version: str, param_hashes: list[str]) -> dict:
+        """param_hash -> stored row, for the hashes already evaluated."""
+        if not param_hashes:
+            return {}
+        found: dict = {}
+        with self._connect() as conn:
+            # stay well below SQLite's bound-parameter limit
+            for start in range(0, len(param_hashes), 500):
+                chunk = param_hashes[start:start + 500]
+                marks = ", ".join("?" for _ in chunk)
+                cur = conn.execute(
+                    f"""
+                    SELECT param_hash, result FROM tuning_results
+                    WHERE ticker = ? AND data_fp = ? AND code_version = ? AND param_hash IN ({marks})
+                    """,
+                    (str(ticker), str(data_fp), str(code_version), *chunk),
+                )
+                for r in cur:
+                    found[r["param_hash"]] = loads(r["result"])
+        return found
+
+    def save(self, ticker: str, data_fp: str, param_hash: str, code_version: str,
+             params: dict, result: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO tuning_results
+                (ticker, data_fp, param_hash, code_version, params, result, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    str(ticker),
+                    str(data_fp),
+                    str(param_hash),
+                    str(code_version),
+                    dumps(params, sort_keys=True),
+                    dumps(result),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def leaderboard(self, metric: str = "pf", ticker: str | None = None,
+                    code_version: str | None = None, limit: int = 20) -> pd.DataFrame:
+        """Best stored rows across runs, sorted by metric (max_dd ascending, others descending)."""
+        query = "SELECT ticker, data_fp, code_version, result, created_at FROM tuning_results"
+        clauses = []
+        params: list[str] = []
+        if ticker is not None:
+            clauses.append("ticker = ?")
+            params.append(str(ticker))
+        if code_version is not None:
+            clauses.append("code_version = ?")
+            params.append(str(code_version))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+
+        with self._connect() as conn:
+            rows = [
+                {"ticker": r["ticker"], "data_fp": r["data_fp"], "code_version": r["code_version"],
+                 "created_at": r["created_at"], **loads(r["result"])}
+                for r in conn.execute(query, params)
+            ]
+        df = pd.DataFrame(rows)
+        if df.empty:
+            return df
+        key = metric if metric in df.columns else f"avg_{metric}"
+        if key not in df.columns:
+            raise ValueError(f"Unknown metric '{metric}' for leaderboard")
+        ascending = "max_dd" in key
+        values = pd.to_numeric(df[key], errors="coerce")
+        # infinite PF comes from runs without a losing trade; rank it below finite values
+        df["_rank"] = values.where(values.map(lambda v: math.isfinite(v) if pd.notna(v) else False))
+        df = df.sort_values("_rank", ascending=ascending, na_position="last").drop(columns="_rank")
+        return df.head(limit).reset_index(drop=True)
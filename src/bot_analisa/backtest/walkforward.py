@@ -0,0 +1,118 @@
+"""
+walkforward.py
+
+Walk-forward evaluation that runs the strategy and exit resolution once over the
+full series and then assigns trades to folds by integer bar position.
+
+Folds:
+  - window / unit: validation window length in "days" (calendar, on the index) or "bars"
+  - mode="anchored": train = [0, split); mode="rolling": train = the train_window
+    (default = window) right before split
+  - the first split is one window after the start; folds advance by one window while
+    a full validation window fits, and folds with < min_train_bars train bars or
+    < min_val_bars validation bars are skipped
+
+A trade belongs to the fold whose range contains its entry bar. Its exit is the one
+resolved on the full series, so a trade entered near the end of a fold may exit in
+the next fold (it is not force-closed at the fold boundary).
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bot_analisa.backtest.kernels import trade_metrics
+from bot_analisa.risk.exits import ExitPolicy
+
+Fold = Tuple[int, int, int, int]  # train_start, train_end, val_start, val_end (end exclusive)
+
+
+def fold_ranges(index: pd.Index, window: int, unit: str = "days", mode: str = "anchored",
+                train_window: Optional[int] = None, min_train_bars: int = 10,
+                min_val_bars: int = 2) -> List[Fold]:
+    """Integer position ranges of every walk-forward fold over a sorted index."""
+    if unit not in ("days", "bars"):
+        raise ValueError(f"Unknown unit '{unit}' for walk-forward")
+    if mode not in ("anchored", "rolling"):
+        raise ValueError(f"Unknown mode '{mode}' for walk-forward")
+    n = len(index)
+    if n == 0 or window <= 0:
+        return []
+    train_window = window if train_window is None else train_window
+
+    folds: List[Fold] = []
+    if unit == "days":
+        delta = pd.Timedelta(days=window)
+        train_delta = pd.Timedelta(days=train_window)
+        end = index[-1]
+        split = index[0] + delta
+        while split + delta <= end:
+            val_start = int(index.searchsorted(split, side="left"))
+            val_end = int(index.searchsorted(split + delta, side="left"))
+            train_start = 0 if mode == "anchored" else int(index.searchsorted(split - train_delta, side="left"))
+            folds.append((train_start, val_start, val_start, val_end))
+            split = split + delta
+    else:
+        split = window
+        while split + window <= n:
+            train_start = 0 if mode == "anchored" else max(0, split - train_window)
+            folds.append((train_start, split, split, split + window))
+            split += window
+
+    return [f for f in folds if f[1] - f[0] >= min_train_bars and f[3] - f[2] >= min_val_bars]
+
+
+def _fold_metrics(prefix: str, pnl: np.ndarray) -> dict:
+    m = trade_metrics(pnl)
+    return {f"{prefix}_trades": m["total_trades"], f"{prefix}_winrate": m["winrate"],
+            f"{prefix}_pf": m["pf"], f"{prefix}_max_dd": m["max_dd"]}
+
+
+def walk_forward_folds(backtester, ticker: str, df: pd.DataFrame, params: Optional[dict],
+                       folds: List[Fold], signal_generator: Optional[Callable] = None) -> pd.DataFrame:
+    """
+    Tidy per-fold metrics (one row per fold) for a single params dict.
+
+    Columns: fold, train_start, train_end, val_start, val_end (timestamps, end inclusive),
+    train_bars, val_bars, train_/val_ trades, winrate, pf, max_dd. Exit keys in params
+    (trail_atr, break_even_r, ...) apply as in run_backtest.
+    """
+    signals = backtester._generate_signals(df, signal_generator, params)
+    exit_policy = ExitPolicy.from_params(params)
+    cols = backtester._simulate_trades(df, signals, exit_policy=exit_policy) if signals else {"entry_pos": [], "entry": [], "exit": []}
+
+    entry_pos = np.asarray(cols["entry_pos"], dtype="int64")
+    pnl = np.asarray(cols["exit"], dtype="float64") - np.asarray(cols["entry"], dtype="float64")
+    # trades come out in signal order; sort by entry bar so each fold is one slice
+    order = np.argsort(entry_pos, kind="stable")
+    entry_pos = entry_pos[order]
+    pnl = pnl[order]
+
+    index = df.index
+    rows = []
+    for k, (t0, t1, v0, v1) in enumerate(folds):
+        tr = slice(*np.searchsorted(entry_pos, [t0, t1], side="left"))
+        va = slice(*np.searchsorted(entry_pos, [v0, v1], side="left"))
+        rows.append({
+            "fold": k,
+            "train_start": index[t0], "train_end": index[t1 - 1],
+            "val_start": index[v0], "val_end": index[v1 - 1],
+            "train_bars": t1 - t0, "val_bars": v1 - v0,
+            **_fold_metrics("train", pnl[tr]),
+            **_fold_metrics("val", pnl[va]),
+        })
+    return pd.DataFrame(rows)
+
+
+def summarize_folds(frame: pd.DataFrame) -> dict:
+    """tune_params walk-forward columns from a per-fold frame (inf PF counts as 0)."""
+    if frame.empty:
+        return {"avg_winrate": 0.0, "avg_pf": 0.0, "total_val_trades": 0, "avg_max_dd": 0.0}
+    pf = frame["val_pf"].replace([np.inf, -np.inf], 0)
+    return {
+        "avg_winrate": float(frame["val_winrate"].mean()),
+        "avg_pf": float(pf.mean()),
+        "total_val_trades": int(frame["val_trades"].sum()),
+        "avg_max_dd": float(frame["val_max_dd"].mean()),
+    }
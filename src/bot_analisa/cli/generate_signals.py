@@ -1,45 +1,103 @@
+"""
+EOD signal generation: latest closed bar per ticker -> SQLite.
+
+Tickers whose bars and strategy params are unchanged since the last run are skipped
+(per-ticker fingerprint in ticker_state). --shard i/n processes a stable hash partition
+of the tickers, written to its own signals-shard-<i>-of-<n>.db (merge with
+bot_analisa.cli.merge_signals) or to the shared signals.db.
+"""
 from __future__ import annotations
 
 import argparse
 import hashlib
+from pathlib import Path
 
+from bot_analisa import __version__
 from bot_analisa.data.cleaner import clean
+from bot_analisa.data.fingerprint import data_fingerprint, last_bar_timestamp, params_hash
 from bot_analisa.data.provider import DataProvider
 from bot_analisa.indicators.indicators import compute_indicators
 from bot_analisa.signals.storage import SignalStorage
 from bot_analisa.strategy.strategy import generate_signals
 
 
+STRATEGY_PARAMS = {"only_latest": True, "snap_ticks": True}
+
+
 def build_signal_id(ticker: str, ts: str, strategy_version: str, side: str) -> str:
     raw = f"{ticker}:{ts}:{strategy_version}:{side}"
     return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
 
-def main() -> None:
-    p = argparse.ArgumentParser(description="EOD signal generation: latest closed bar -> SQLite")
-    p.add_argument("tickers", nargs="+", help="Ticker list, e.g. BBCA.JK BBRI.JK")
-    p.add_argument("--period", default="1y")
-    p.add_argument("--interval", default="1d")
-    p.add_argument("--data-folder", default="data")
-    p.add_argument("--signals-folder", default="signals")
-    args = p.parse_args()
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse `i/n` into (index, count); index is 0-based."""
+    try:
+        index_text, count_text = spec.split("/", 1)
+        index, count = int(index_text), int(count_text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard spec {spec!r}, expected i/n") from None
+    if count < 1 or not (0 <= index < count):
+        raise argparse.ArgumentTypeError(f"invalid shard spec {spec!r}, need 0 <= i < n")
+    return index, count
 
-    provider = DataProvider(data_folder=args.data_folder)
-    storage = SignalStorage(folder=args.signals_folder)
 
-    for ticker in args.tickers:
+def shard_of(ticker: str, count: int) -> int:
+    # sha1 instead of hash(): stable across processes, machines and PYTHONHASHSEED
+    digest = hashlib.sha1(ticker.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def select_shard(tickers: list[str], index: int, count: int) -> list[str]:
+    return [t for t in tickers if shard_of(t, count) == index]
+
+
+def shard_db_name(index: int, count: int) -> str:
+    return f"signals-shard-{index}-of-{count}.db"
+
+
+def run_generation(provider, storage, tickers: list[str], period: str = "1y", interval: str = "1d",
+                   force: bool = False, state_fallback=None) -> dict:
+    """
+    Generate and store signals for tickers; returns recomputed/skipped/total counts.
+
+    state_fallback: storage consulted for a ticker's last-run fingerprint when storage
+    has none, e.g. the canonical signals.db for a shard db that was merged and removed.
+    """
+    run_params_hash = params_hash({"strategy": STRATEGY_PARAMS, "interval": interval, "version": __version__})
+    skipped = 0
+    recomputed = 0
+
+    for ticker in tickers:
         # refresh cache first, then read historical
-        provider.fetch_and_save(ticker, period=args.period, interval=args.interval, force=False)
-        df = provider.get_historical(ticker, period=args.period, interval=args.interval)
+        provider.fetch_and_save(ticker, period=period, interval=interval, force=False)
+        df = provider.get_historical(ticker, period=period, interval=interval)
         if df is None or df.empty:
             print(f"{ticker}: no data")
             continue
 
+        # skip clean/indicators/strategy when the bars and params are the same as last run
+        last_bar_ts = last_bar_timestamp(df)
+        data_hash = data_fingerprint(df)
+        state = storage.get_ticker_state(ticker)
+        if state is None and state_fallback is not None:
+            state = state_fallback.get_ticker_state(ticker)
+        if (
+            not force
+            and state is not None
+            and state["last_bar_ts"] == last_bar_ts
+            and state["data_hash"] == data_hash
+            and state["params_hash"] == run_params_hash
+        ):
+            print(f"{ticker}: unchanged since last run (last bar {last_bar_ts}), skipped")
+            skipped += 1
+            continue
+        recomputed += 1
+
         cleaned = clean(df)
         enriched = compute_indicators(cleaned)
-        signals = generate_signals(enriched, {"only_latest": True})
+        signals = generate_signals(enriched, STRATEGY_PARAMS)
 
-        saved = 0
+        payloads = []
         for sig in signals:
             ts = sig.get("timestamp")
             entry_price = sig.get("entry_price", sig.get("entry"))
@@ -73,10 +131,51 @@ def main() -> None:
                 "strategy_version": strategy_version,
                 "reason": sig.get("reason", ""),
             }
-            storage.save_signal_dict(payload)
-            saved += 1
+            payloads.append(payload)
+
+        counts = storage.save_signals_many(payloads)
+        storage.save_ticker_state(ticker, last_bar_ts, data_hash, run_params_hash)
+        print(f"{ticker}: saved {counts['inserted']} new signal(s) ({counts['ignored']} already stored) "
+              f"into {storage.db_path}")
+
+    summary = {"recomputed": recomputed, "skipped": skipped, "total": len(tickers)}
+    print(f"summary: recomputed={recomputed} skipped={skipped} total={len(tickers)}")
+    return summary
 
-        print(f"{ticker}: saved {saved} signal(s) into {storage.db_path}")
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="EOD signal generation: latest closed bar -> SQLite")
+    p.add_argument("tickers", nargs="+", help="Ticker list, e.g. BBCA.JK BBRI.JK")
+    p.add_argument("--period", default="1y")
+    p.add_argument("--interval", default="1d")
+    p.add_argument("--data-folder", default="data")
+    p.add_argument("--signals-folder", default="signals")
+    p.add_argument("--shard", type=parse_shard, default=None,
+                   help="Only process tickers of shard i/n (0-based), e.g. --shard 0/4")
+    p.add_argument("--shard-output", choices=["own", "shared"], default="own",
+                   help="With --shard: write to a per-shard db file (merge later) or to the shared signals.db")
+    p.add_argument("--force", action="store_true",
+                   help="Recompute every ticker even when its data and params fingerprint is unchanged")
+    args = p.parse_args()
+
+    tickers = list(args.tickers)
+    db_name = "signals.db"
+    state_fallback = None
+    if args.shard is not None:
+        index, count = args.shard
+        tickers = select_shard(tickers, index, count)
+        if args.shard_output == "own":
+            db_name = shard_db_name(index, count)
+            # merge_signals carries shard ticker_state into signals.db, so a removed shard
+            # file does not force every ticker to be recomputed
+            if (Path(args.signals_folder) / "signals.db").exists():
+                state_fallback = SignalStorage(folder=args.signals_folder)
+        print(f"shard {index}/{count}: {len(tickers)} of {len(args.tickers)} ticker(s)")
+
+    provider = DataProvider(data_folder=args.data_folder)
+    storage = SignalStorage(folder=args.signals_folder, db_name=db_name)
+    run_generation(provider, storage, tickers, period=args.period, interval=args.interval, force=args.force,
+                   state_fallback=state_fallback)
 
 
 if __name__ == "__main__":
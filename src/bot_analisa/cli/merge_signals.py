@@ -0,0 +1,81 @@
+"""
+Shard merge: signals-shard-<i>-of-<n>.db files (generate_signals --shard) -> signals.db.
+
+Signals are re-keyed and inserted with INSERT OR IGNORE, so a signal already in
+signals.db keeps its row and status (the first copy wins). ticker_state rows are
+merged too; per ticker the newest updated_at wins.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from bot_analisa.cli.generate_signals import build_signal_id
+from bot_analisa.signals.storage import SignalStorage
+
+
+def merge_shards(signals_folder: str, pattern: str = "signals-shard-*.db", remove: bool = False) -> dict:
+    """Consolidate per-shard db files into `<signals_folder>/signals.db`.
+
+    Rows are re-keyed with `build_signal_id` and inserted with INSERT OR IGNORE in a
+    single transaction per shard, so re-running a merge (or merging overlapping shards)
+    never duplicates a signal and never overwrites a status already in the canonical db.
+    Each shard's `ticker_state` (the unchanged-data skip of generate_signals) is merged
+    too, newest row per ticker wins, so `remove=True` does not make the next sharded
+    run recompute every ticker.
+    """
+    folder = Path(signals_folder)
+    storage = SignalStorage(folder=str(folder))
+
+    merged_files = 0
+    scanned = 0
+    inserted = 0
+    states_merged = 0
+    for shard_path in sorted(folder.glob(pattern)):
+        if shard_path.resolve() == storage.db_path.resolve():
+            continue
+        # opening migrates shards written before the epoch-ns columns existed
+        shard = SignalStorage(folder=str(shard_path.parent), db_name=shard_path.name)
+        try:
+            rows = shard.export_rows()
+            states = shard.list_ticker_states()
+        finally:
+            shard.close()
+
+        for row in rows:
+            row["id"] = build_signal_id(row["ticker"], row["timestamp"], row["strategy_version"], row["signal"])
+
+        # one commit per shard; rows keep the shard's timestamp_ns / updated_at_ns
+        with storage.transaction():
+            counts = storage.merge_rows(rows)
+            states_merged += storage.merge_ticker_states(states)
+        inserted += counts["inserted"]
+
+        scanned += len(rows)
+        merged_files += 1
+        if remove:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{shard_path}{suffix}").unlink(missing_ok=True)
+
+    return {
+        "shard_files": merged_files,
+        "scanned_rows": scanned,
+        "inserted_rows": inserted,
+        "ignored_rows": scanned - inserted,
+        "ticker_states": states_merged,
+        "db": str(storage.db_path),
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Merge per-shard signal db files into the canonical signals.db")
+    p.add_argument("--signals-folder", default="signals", help="Folder containing signals-shard-*.db and signals.db")
+    p.add_argument("--pattern", default="signals-shard-*.db")
+    p.add_argument("--remove", action="store_true", help="Delete shard files after a successful merge (their ticker_state is kept in signals.db)")
+    args = p.parse_args()
+
+    print(merge_shards(args.signals_folder, pattern=args.pattern, remove=args.remove))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,20 +15,21 @@ def migrate_folder(signals_folder: str) -> dict:
 
     storage = SignalStorage(folder=str(folder))
     imported = 0
+    inserted = 0
     scanned = 0
 
     for csv_path in sorted(folder.glob("*.csv")):
         scanned += 1
         with open(csv_path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
+            signals = []
+            for row in csv.DictReader(f):
                 ticker = row.get("ticker") or csv_path.stem
                 entry_price = row.get("entry_price") or row.get("entry")
                 tp = row.get("tp")
                 sl = row.get("sl")
                 if not ticker or entry_price in (None, "") or tp in (None, "") or sl in (None, ""):
                     continue
-                signal = {
+                signals.append({
                     "id": row.get("id") or None,
                     "ticker": ticker,
                     "timestamp": row.get("timestamp") or None,
@@ -41,14 +42,17 @@ def migrate_folder(signals_folder: str) -> dict:
                     "strategy_version": row.get("strategy_version") or "unknown",
                     "reason": row.get("reason") or "",
                     "updated_at": row.get("updated_at") or "",
-                }
-                storage.save_signal_dict(signal)
-                imported += 1
+                })
+        # one transaction per file: a file is either fully imported or not at all
+        counts = storage.save_signals_many(signals)
+        imported += counts["inserted"] + counts["ignored"]
+        inserted += counts["inserted"]
 
         target = legacy_dir / f"{csv_path.name}.bak"
         csv_path.rename(target)
 
-    return {"scanned_csv_files": scanned, "imported_rows": imported, "db": str(storage.db_path)}
+    return {"scanned_csv_files": scanned, "imported_rows": imported, "inserted_rows": inserted,
+            "db": str(storage.db_path)}
 
 
 def main() -> None:
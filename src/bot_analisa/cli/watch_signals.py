@@ -4,8 +4,9 @@ import argparse
 import time
 
 from bot_analisa.data.provider import DataProvider
+from bot_analisa.risk.exits import ExitPolicy
 from bot_analisa.signals.storage import SignalStorage
-from bot_analisa.signals.watcher import watch_once
+from bot_analisa.signals.watcher import OpenSignalCache, watch_once
 
 
 def main() -> None:
@@ -16,18 +17,31 @@ def main() -> None:
     p.add_argument("--once", action="store_true")
     p.add_argument("--loop", action="store_true")
     p.add_argument("--interval", type=int, default=300)
+    p.add_argument("--trail-atr", type=float, default=None, help="ATR trailing stop multiple")
+    p.add_argument("--break-even-r", type=float, default=None, help="Move stop to entry after this many R")
+    p.add_argument("--max-bars", type=int, default=None, help="Close after this many bars held")
+    p.add_argument("--partial-tp-r", type=float, default=None, help="Take a partial profit at this many R")
+    p.add_argument("--partial-fraction", type=float, default=None, help="Fraction closed at --partial-tp-r")
     args = p.parse_args()
+    if args.partial_fraction is not None and args.partial_tp_r is None:
+        p.error("--partial-fraction needs --partial-tp-r")
 
     tickers = [t.strip() for t in args.tickers.split(",")] if args.tickers else None
     provider = DataProvider(data_folder=args.data_folder)
     storage = SignalStorage(folder=args.signals_folder)
+    policy = ExitPolicy.from_params({
+        "trail_atr": args.trail_atr, "break_even_r": args.break_even_r, "max_bars": args.max_bars,
+        "partial_tp_r": args.partial_tp_r, "partial_fraction": args.partial_fraction,
+    })
 
     if args.once or not args.loop:
-        print(watch_once(provider, storage, tickers))
+        print(watch_once(provider, storage, tickers, policy=policy))
         return
 
+    # OPEN rows stay in memory between passes and are re-read only after the db changes
+    cache = OpenSignalCache(storage)
     while True:
-        print(watch_once(provider, storage, tickers))
+        print(watch_once(provider, storage, tickers, policy=policy, cache=cache))
         time.sleep(args.interval)
 
 
@@ -1,4 +1,6 @@
 from .provider import DataProvider
 from .cleaner import clean
+from .fingerprint import data_fingerprint, params_hash
+from .synthetic import synthetic_ohlcv, synthetic_universe
 
-__all__ = ["DataProvider", "clean"]
+__all__ = ["DataProvider", "clean", "data_fingerprint", "params_hash", "synthetic_ohlcv", "synthetic_universe"]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+import pandas as pd
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a price frame (values, index and column names)."""
+    h = hashlib.sha1()
+    h.update(",".join(map(str, df.columns)).encode("utf-8"))
+    if not df.empty:
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def file_fingerprint(path: str, block_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in blocks (for CSVs too large to load)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def params_hash(params: dict | None) -> str:
+    """Order-independent hash of a params dict (values are JSON-encoded, fallback str)."""
+    raw = json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def last_bar_timestamp(df: pd.DataFrame) -> str:
+    if df.empty:
+        return ""
+    if "Datetime" in df.columns:
+        return str(df["Datetime"].iloc[-1])
+    return str(df.index[-1])
@@ -13,8 +13,11 @@ class DataProvider:
         self.data_folder = Path(data_folder)
         self.data_folder.mkdir(parents=True, exist_ok=True)
 
-    def _file_path(self, ticker: str) -> Path:
-        return self.data_folder / f"{ticker}.csv"
+    def _file_path(self, ticker: str, interval: str = "1d") -> Path:
+        # daily bars keep the original <ticker>.csv name; finer intervals get their own file
+        if interval == "1d":
+            return self.data_folder / f"{ticker}.csv"
+        return self.data_folder / f"{ticker}_{interval}.csv"
 
     def _ensure_datetime_column(self, df: pd.DataFrame) -> pd.DataFrame:
         out = df.copy()
@@ -48,8 +51,15 @@ class DataProvider:
             raw = raw.rename(columns={"Date": "Datetime"})
         return self._ensure_datetime_column(raw)
 
+    def load_cached(self, ticker: str, interval: str = "1d") -> Optional[pd.DataFrame]:
+        """Cached bars for ticker/interval without any download (None when not cached)."""
+        path = self._file_path(ticker, interval)
+        if not path.exists():
+            return None
+        return self._ensure_datetime_column(pd.read_csv(path))
+
     def get_historical(self, ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
-        path = self._file_path(ticker)
+        path = self._file_path(ticker, interval)
         if path.exists():
             cached = pd.read_csv(path)
             return self._ensure_datetime_column(cached)
@@ -64,7 +74,7 @@ class DataProvider:
         if new_df.empty:
             return None
 
-        path = self._file_path(ticker)
+        path = self._file_path(ticker, interval)
         if path.exists() and not force:
             old_df = self._ensure_datetime_column(pd.read_csv(path))
             merged = pd.concat([old_df, new_df], ignore_index=True)
@@ -0,0 +1,46 @@
+"""
+synthetic.py
+Data OHLCV sintetis untuk benchmark dan test (tanpa download).
+
+synthetic_ohlcv draws a mean-reverting (Ornstein-Uhlenbeck) log price, so even 1M
+bars stay in a realistic range instead of drifting to 0 or infinity, with IDX-like
+prices (whole rupiah, never below 50) and consistent bars (Low <= Open/Close <= High).
+Hourly bars by default, so 1M bars still fit pandas' timestamp range. The same seed
+always gives the same frame, so timings across runs and machines compare like for
+like. synthetic_universe builds many tickers at once with per-ticker seeds.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(n_bars: int, seed: int = 0, start: str = "2000-01-03", freq: str = "h",
+                    start_price: float = 1000.0, vol: float = 0.01, half_life: float = 2000.0) -> pd.DataFrame:
+    """n_bars of OHLCV with a Datetime index (same layout as Backtester.load_csv)."""
+    rng = np.random.default_rng(seed)
+    phi = 0.5 ** (1.0 / half_life)
+    # x_t = phi * x_{t-1} + e_t, via ewm (y_t = phi * y_{t-1} + (1 - phi) * e_t, x = y / (1 - phi))
+    shocks = rng.normal(0.0, vol, n_bars)
+    if n_bars:
+        shocks[0] *= 1.0 - phi   # ewm(adjust=False) seeds y_0 = e_0; we want x_0 = e_0
+    shocks = pd.Series(shocks)
+    log_dev = shocks.ewm(alpha=1.0 - phi, adjust=False).mean().to_numpy() / (1.0 - phi)
+    close = start_price * np.exp(log_dev)
+    opens = np.concatenate(([start_price], close[:-1])) * np.exp(rng.normal(0.0, vol / 4, n_bars))
+    spread = np.abs(rng.normal(0.0, vol / 2, (2, n_bars)))
+    high = np.maximum(opens, close) * (1.0 + spread[0])
+    low = np.minimum(opens, close) * (1.0 - spread[1])
+
+    bars = np.maximum(np.round(np.column_stack([opens, high, low, close])), 50.0)
+    idx = pd.date_range(start, periods=n_bars, freq=freq)
+    df = pd.DataFrame(bars, columns=["Open", "High", "Low", "Close"], index=idx)
+    df["Volume"] = rng.integers(1_000, 1_000_000, n_bars).astype("float64")
+    df.index.name = "Datetime"
+    return df
+
+
+def synthetic_universe(n_tickers: int, n_bars: int, seed: int = 0, **kwargs) -> Dict[str, pd.DataFrame]:
+    """ticker -> synthetic_ohlcv frame for n_tickers tickers (SYN0000, SYN0001, ...)."""
+    return {f"SYN{i:04d}": synthetic_ohlcv(n_bars, seed=seed + i, **kwargs) for i in range(n_tickers)}
@@ -0,0 +1,157 @@
+"""
+streaming.py
+Versi streaming (per blok) dari sma / ema / atr di indicators.py.
+
+Each class keeps the recurrence state between calls to update(block), so feeding a
+series block by block gives exactly the same floats as the vectorized function on
+the whole series:
+
+- StreamingSMA: replays pandas' rolling-mean running sum (Kahan-compensated add /
+  remove, same-value and sign guards) over the carried last `period` values
+- StreamingEMA: seeds pandas' ewm(adjust=False) with the last smoothed value (plus any
+  trailing NaNs, so their weight decay is kept) and masks min_periods itself
+- StreamingATR: carries the previous Close, the warm-up TRs and the last Wilder value
+
+Only the state is carried, never the history, so memory does not grow with the
+number of blocks.
+"""
+
+from collections import deque
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class StreamingSMA:
+    """sma(series, period) over consecutive blocks."""
+
+    def __init__(self, period: int) -> None:
+        self.period = int(period)
+        self.window: deque = deque()
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_count = 0
+        self.prev_value = None
+
+    def update(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype="float64")
+        out = np.empty(len(values), dtype="float64")
+        p = self.period
+        window = self.window
+        nobs, neg_ct, sum_x = self.nobs, self.neg_ct, self.sum_x
+        comp_add, comp_remove = self.comp_add, self.comp_remove
+        same_count, prev_value = self.same_count, self.prev_value
+
+        for i, val in enumerate(values.tolist()):
+            if prev_value is None:
+                prev_value = val
+            if len(window) == p:
+                old = window.popleft()
+                if old == old:
+                    nobs -= 1
+                    y = -old - comp_remove
+                    t = sum_x + y
+                    comp_remove = t - sum_x - y
+                    sum_x = t
+                    if math.copysign(1.0, old) < 0:
+                        neg_ct -= 1
+            window.append(val)
+            if val == val:
+                nobs += 1
+                y = val - comp_add
+                t = sum_x + y
+                comp_add = t - sum_x - y
+                sum_x = t
+                if math.copysign(1.0, val) < 0:
+                    neg_ct += 1
+                if val == prev_value:
+                    same_count += 1
+                else:
+                    same_count = 1
+                prev_value = val
+
+            if nobs >= p and nobs > 0:
+                result = sum_x / nobs
+                if same_count >= nobs:
+                    result = prev_value
+                elif neg_ct == 0 and result < 0:
+                    result = 0.0
+                elif neg_ct == nobs and result > 0:
+                    result = 0.0
+                out[i] = result
+            else:
+                out[i] = np.nan
+
+        self.nobs, self.neg_ct, self.sum_x = nobs, neg_ct, sum_x
+        self.comp_add, self.comp_remove = comp_add, comp_remove
+        self.same_count, self.prev_value = same_count, prev_value
+        return out
+
+
+class StreamingEMA:
+    """ema(series, period) (ewm span, adjust=False, min_periods=period) over consecutive blocks."""
+
+    def __init__(self, period: int) -> None:
+        self.period = int(period)
+        self.seed = None   # [last smoothed value, trailing NaNs...]
+        self.nobs = 0
+
+    def update(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype="float64")
+        offset = 0 if self.seed is None else len(self.seed)
+        series = values if self.seed is None else np.concatenate([self.seed, values])
+        raw = pd.Series(series).ewm(span=self.period, adjust=False).mean().to_numpy()[offset:]
+
+        observed = ~np.isnan(values)
+        counts = self.nobs + np.cumsum(observed)
+        out = np.where(counts >= self.period, raw, np.nan)
+
+        obs_pos = np.flatnonzero(observed)
+        if len(obs_pos):
+            k = int(obs_pos[-1])
+            self.seed = np.concatenate([[raw[k]], values[k + 1:]])
+        elif self.seed is not None:
+            self.seed = np.concatenate([self.seed, values])
+        self.nobs = int(counts[-1]) if len(values) else self.nobs
+        return out
+
+
+class StreamingATR:
+    """atr(df, period) (Wilder smoothing, first value = mean of the first period TRs) over blocks."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = int(period)
+        self.prev_close = np.nan
+        self.warmup: list = []
+        self.prev_atr = None
+
+    def update(self, high, low, close) -> np.ndarray:
+        high = np.asarray(high, dtype="float64")
+        low = np.asarray(low, dtype="float64")
+        close = np.asarray(close, dtype="float64")
+        if len(close) == 0:
+            return np.zeros(0, dtype="float64")
+        prev_close = np.concatenate([[self.prev_close], close[:-1]])
+        # same NaN-skipping max as the row-wise max of the three TR columns
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        self.prev_close = close[-1]
+
+        p = self.period
+        out = np.full(len(tr), np.nan)
+        prev = self.prev_atr
+        for i, value in enumerate(tr.tolist()):
+            if prev is None:
+                self.warmup.append(value)
+                if len(self.warmup) == p:
+                    prev = float(pd.Series(self.warmup, dtype="float64").mean())
+                    self.warmup = []
+                    out[i] = prev
+                continue
+            prev = (prev * (p - 1) + value) / p
+            out[i] = prev
+        self.prev_atr = prev
+        return out
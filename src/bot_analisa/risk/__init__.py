@@ -1,3 +1,11 @@
-from .risk import compute_tp_sl, compute_position_size
+from .risk import compute_tp_sl, compute_position_size, compute_tp_sl_array, compute_position_size_array
+from .ticks import IDX_LOT_SIZE, tick_size, snap_to_tick, snap_tp_sl
+from .portfolio import allocate_arrays, allocate_portfolio
+from .exits import ExitPolicy, ExitResult, resolve_exit, stop_status
 
-__all__ = ["compute_tp_sl", "compute_position_size"]
+__all__ = [
+    "compute_tp_sl", "compute_position_size", "compute_tp_sl_array", "compute_position_size_array",
+    "IDX_LOT_SIZE", "tick_size", "snap_to_tick", "snap_tp_sl",
+    "allocate_arrays", "allocate_portfolio",
+    "ExitPolicy", "ExitResult", "resolve_exit", "stop_status",
+]
@@ -0,0 +1,148 @@
+"""
+exits.py
+
+Exit policy di luar TP/SL tetap: trailing stop ATR, break-even, time stop, partial TP.
+
+ExitPolicy holds the settings; resolve_exit is the single-pass array kernel that
+applies them to one position. The backtester calls it once per trade and the live
+watcher calls it on the bars since the signal, so both use the same rules:
+
+  - trail_atr: stop = highest (High - trail_atr * ATR) seen on earlier bars (ratchets up)
+  - break_even_r: once a bar's High reaches entry + break_even_r * R (R = entry - initial
+    SL), the stop is at least the entry from the next bar on
+  - partial_tp_r / partial_fraction: the first bar reaching entry + partial_tp_r * R
+    closes partial_fraction of the position at that level; the rest keeps running
+  - max_bars: exit at the Close of the max_bars-th bar held (status TIME)
+
+Stops only use information from bars before the one being checked, so a bar never
+moves its own stop. On a bar that touches both sides the favourable level is taken
+first (TP, then partial, then the stop), the same convention as the fixed TP/SL scan.
+
+The kernel scans windows that double in size (like kernels.first_hit), carrying the
+trailing peak and break-even flag from one window to the next, so a policy costs
+O(log n) NumPy calls per trade, the same order as the fixed scan.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+FIRST_CHUNK = 16
+
+POLICY_KEYS = ("trail_atr", "break_even_r", "max_bars", "partial_tp_r", "partial_fraction", "atr_period")
+
+
+@dataclass(frozen=True)
+class ExitPolicy:
+    trail_atr: Optional[float] = None
+    break_even_r: Optional[float] = None
+    max_bars: Optional[int] = None
+    partial_tp_r: Optional[float] = None
+    partial_fraction: float = 0.5
+    atr_period: int = 14
+
+    @classmethod
+    def from_params(cls, params: Optional[dict]) -> Optional["ExitPolicy"]:
+        """Policy from strategy params (same key names); None when no exit key is set."""
+        params = params or {}
+        if not any(params.get(k) is not None for k in ("trail_atr", "break_even_r", "max_bars", "partial_tp_r")):
+            return None
+        kwargs = {k: params[k] for k in POLICY_KEYS if params.get(k) is not None}
+        return cls(**kwargs)
+
+    def as_params(self) -> dict:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+    @property
+    def needs_atr(self) -> bool:
+        return self.trail_atr is not None
+
+
+class ExitResult(NamedTuple):
+    exit_pos: int          # bar of the final exit (-1 = still open at the end of the data)
+    exit_level: float      # fill of the remaining position (nan while open)
+    status: str            # TP, SL, BE, TRAIL, TIME or OPEN
+    partial_pos: int       # bar of the partial take-profit (-1 = none)
+    partial_level: float
+    stop: float            # stop level in force on the exit bar / after the last bar scanned
+
+
+def stop_status(level: float, entry: float, sl: float) -> str:
+    """Status of an exit at stop level: SL (original stop), BE (entry) or TRAIL (ratcheted)."""
+    if level <= sl:
+        return "SL"
+    if level == entry:
+        return "BE"
+    return "TRAIL"
+
+
+def resolve_exit(high: np.ndarray, low: np.ndarray, close: np.ndarray, atr: Optional[np.ndarray],
+                 start: int, entry: float, tp: float, sl: float, policy: ExitPolicy,
+                 stop: Optional[int] = None) -> ExitResult:
+    """Apply policy to a long position entered at bar start; scans [start, stop)."""
+    n = len(high) if stop is None else stop
+    limit = n if policy.max_bars is None else min(n, start + int(policy.max_bars))
+    risk = entry - sl
+    be_level = entry + policy.break_even_r * risk if policy.break_even_r is not None and risk > 0 else np.inf
+    partial_level = entry + policy.partial_tp_r * risk if policy.partial_tp_r is not None and risk > 0 else np.inf
+    if partial_level >= tp:
+        partial_level = np.inf   # a partial at/after the TP is just the TP
+    trail_k = policy.trail_atr
+
+    trail_peak = -np.inf   # highest High - k*ATR on bars already scanned
+    armed = False          # break-even reached on a bar already scanned
+    partial_pos = -1
+    current_stop = sl
+
+    pos = start
+    chunk = FIRST_CHUNK
+    while pos < limit:
+        end = min(pos + chunk, limit)
+        h = high[pos:end]
+        lo = low[pos:end]
+        m = end - pos
+
+        stops = np.full(m, sl, dtype="float64")
+        if trail_k is not None and atr is not None:
+            cand = h - trail_k * atr[pos:end]
+            # fmax ignores NaN ATR warm-up values; shift by one so a bar never uses itself
+            peaks = np.fmax.accumulate(np.concatenate(([trail_peak], cand)))
+            stops = np.fmax(stops, peaks[:-1])
+            trail_peak = float(peaks[-1])
+        if np.isfinite(be_level):
+            reached = np.logical_or.accumulate(np.concatenate(([armed], h >= be_level)))
+            stops = np.where(reached[:-1], np.maximum(stops, entry), stops)
+            armed = bool(reached[-1])
+
+        hit_tp = h >= tp
+        hit_stop = lo <= stops
+        done = hit_tp | hit_stop
+        k = int(np.argmax(done)) if done.any() else -1
+
+        if partial_pos < 0 and np.isfinite(partial_level):
+            upto = m if k < 0 else k + 1
+            touched = h[:upto] >= partial_level
+            if touched.any():
+                partial_pos = pos + int(np.argmax(touched))
+
+        if k >= 0:
+            x = pos + k
+            if hit_tp[k]:
+                return ExitResult(x, float(tp), "TP", partial_pos, float(partial_level), float(stops[k]))
+            level = float(stops[k])
+            return ExitResult(x, level, stop_status(level, entry, sl), partial_pos, float(partial_level), level)
+
+        current_stop = float(stops[-1])
+        pos = end
+        chunk *= 2
+
+    # stop for the next bar includes what the last scanned bar contributed
+    if trail_k is not None:
+        current_stop = max(current_stop, trail_peak)
+    if armed:
+        current_stop = max(current_stop, entry)
+    if policy.max_bars is not None and limit > start and limit - start >= int(policy.max_bars):
+        x = limit - 1
+        return ExitResult(x, float(close[x]), "TIME", partial_pos, float(partial_level), current_stop)
+    return ExitResult(-1, float("nan"), "OPEN", partial_pos, float(partial_level), current_stop)
@@ -0,0 +1,147 @@
+"""
+portfolio.py
+
+Alokasi modal level portofolio untuk banyak signal yang muncul bersamaan.
+
+compute_position_size sizes each trade alone against the full account. When many
+tickers signal on the same bar the requested exposure can be several times the cash
+available, so the allocator below:
+
+  1. sizes every candidate at once (compute_position_size_array, risk-based, lot aware)
+  2. ranks candidates by score (highest first, ties keep input order)
+  3. walks the ranking greedily, capping each fill by free position slots, the
+     remaining sector budget and the remaining cash (partial fills round down to lots)
+
+The walk is the only sequential step and is O(candidates); everything else is array
+math. allocate_arrays is the core used by the portfolio backtester; allocate_portfolio
+is the DataFrame wrapper for EOD use.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .risk import compute_position_size_array, ERR_OK
+from .ticks import IDX_LOT_SIZE
+
+# reason codes per candidate
+ALLOC_OK = "ok"
+ALLOC_INVALID = "invalid"
+ALLOC_SIZE_ZERO = "size_zero"
+ALLOC_MAX_POSITIONS = "max_positions"
+ALLOC_SECTOR_CAP = "sector_cap"
+ALLOC_CASH = "cash"
+
+
+def allocate_arrays(entry: np.ndarray,
+                    sl: np.ndarray,
+                    score: np.ndarray,
+                    sector: np.ndarray,
+                    cash: float,
+                    equity: float,
+                    free_slots: int,
+                    sector_budget: Dict[object, float],
+                    risk_per_trade: float = 0.01,
+                    lot_size: int = IDX_LOT_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy allocation over aligned candidate arrays.
+
+    sector_budget: sector -> remaining notional allowed (missing sector = unlimited).
+      The dict is not modified.
+
+    Returns: (qty int64 array, reason object array), aligned with the inputs.
+    """
+    entry = np.asarray(entry, dtype="float64")
+    n = entry.shape[0]
+    qty = np.zeros(n, dtype="int64")
+    reason = np.full(n, ALLOC_OK, dtype=object)
+    if n == 0:
+        return qty, reason
+
+    desired, err = compute_position_size_array(equity, entry, sl, risk_per_trade=risk_per_trade, lot_size=lot_size)
+    reason[err != ERR_OK] = ALLOC_INVALID
+    reason[(err == ERR_OK) & (desired <= 0)] = ALLOC_SIZE_ZERO
+
+    lot = max(int(lot_size), 1)
+    budget = dict(sector_budget)
+    slots = int(free_slots)
+    remaining_cash = float(cash)
+
+    # stable sort on -score keeps input order among equal scores
+    order = np.argsort(-np.asarray(score, dtype="float64"), kind="stable")
+    for i in order[desired[order] > 0]:
+        if slots <= 0:
+            reason[i] = ALLOC_MAX_POSITIONS
+            continue
+        cap = remaining_cash
+        sec = sector[i]
+        sector_limited = sec in budget and budget[sec] < cap
+        if sector_limited:
+            cap = budget[sec]
+        affordable = int(cap // (entry[i] * lot)) * lot if cap > 0 else 0
+        take = min(int(desired[i]), affordable)
+        if take <= 0:
+            reason[i] = ALLOC_SECTOR_CAP if sector_limited else ALLOC_CASH
+            continue
+        cost = take * entry[i]
+        qty[i] = take
+        remaining_cash -= cost
+        if sec in budget:
+            budget[sec] -= cost
+        slots -= 1
+    return qty, reason
+
+
+def allocate_portfolio(candidates: pd.DataFrame,
+                       cash: float,
+                       max_positions: int,
+                       account_balance: Optional[float] = None,
+                       sector_caps: Optional[Dict[str, float]] = None,
+                       default_sector_cap: Optional[float] = None,
+                       open_positions: int = 0,
+                       sector_exposure: Optional[Dict[str, float]] = None,
+                       risk_per_trade: float = 0.01,
+                       lot_size: int = IDX_LOT_SIZE) -> pd.DataFrame:
+    """
+    Allocate cash across a batch of candidate signals.
+
+    candidates columns: ticker, entry (or entry_price), sl, score, optional sector.
+    account_balance: equity used for risk sizing (default = cash).
+    sector_caps: sector -> max fraction of account_balance held in that sector;
+      default_sector_cap applies to sectors not listed (None = uncapped).
+    open_positions / sector_exposure: what is already held, so EOD runs can
+      allocate on top of an existing book.
+
+    Returns a copy of candidates with columns qty, cost, allocated, reason.
+    """
+    out = candidates.copy()
+    equity = float(account_balance if account_balance is not None else cash)
+    entry_col = "entry" if "entry" in out.columns else "entry_price"
+    entry = out[entry_col].to_numpy(dtype="float64")
+    sl = out["sl"].to_numpy(dtype="float64")
+    score = out["score"].to_numpy(dtype="float64") if "score" in out.columns else np.zeros(len(out))
+    sector = out["sector"].to_numpy(dtype=object) if "sector" in out.columns else np.full(len(out), None, dtype=object)
+
+    sector_caps = sector_caps or {}
+    sector_exposure = sector_exposure or {}
+    budget: Dict[object, float] = {}
+    for sec in pd.unique(sector):
+        frac = sector_caps.get(sec, default_sector_cap)
+        if frac is not None:
+            budget[sec] = float(frac) * equity - float(sector_exposure.get(sec, 0.0))
+
+    qty, reason = allocate_arrays(
+        entry, sl, score, sector,
+        cash=cash,
+        equity=equity,
+        free_slots=max_positions - open_positions,
+        sector_budget=budget,
+        risk_per_trade=risk_per_trade,
+        lot_size=lot_size,
+    )
+    out["qty"] = qty
+    out["cost"] = qty * entry
+    out["allocated"] = qty > 0
+    out["reason"] = reason
+    return out
@@ -10,18 +10,37 @@ Fitur:
     - mode="percent" -> TP = entry * (1 + tp_pct) ; SL = entry * (1 - sl_pct)
   * If both atr and percent provided, mode selects which to use.
 
-- compute_position_size(account_balance, entry_price, sl_price, risk_per_trade=0.01, lot_size=1)
+  * params["tick_snap"]=True snaps TP down / SL up to the IDX tick grid, keeping each
+    at least one tick away from entry (see ticks.py)
+
+- compute_position_size(account_balance, entry_price, sl_price, risk_per_trade=0.01, lot_size=100)
   * returns number_of_shares (int) such that (entry - sl) * qty <= account_balance * risk_per_trade
-  * respects minimum lot_size (round down to nearest lot multiple)
+  * respects minimum lot_size (round down to nearest lot multiple); default is 1 IDX lot = 100 shares
+
+- compute_tp_sl_array / compute_position_size_array
+  * array-in/array-out versions of the two functions above for whole batches of signals
+  * invalid rows do not raise: they get NaN/0 output plus an error code (ERR_* constants)
 
 Notes:
 - Harga diserahkan dalam satuan harga (float).
-- Fungsi defensif terhadap input invalid (raises ValueError).
+- Fungsi scalar defensif terhadap input invalid (raises ValueError).
 """
 
 from typing import Tuple, Optional, Dict
 import math
 
+import numpy as np
+
+from .ticks import IDX_LOT_SIZE, snap_tp_sl
+
+# error codes returned by the *_array functions (0 = row is valid)
+ERR_OK = 0
+ERR_ENTRY = 1      # entry_price missing or <= 0
+ERR_ATR = 2        # ATR missing or <= 0 in mode="atr"
+ERR_BALANCE = 3    # account_balance missing or <= 0
+ERR_SL = 4         # sl_price missing or < 0
+ERR_RISK = 5       # risk_per_trade outside (0, 1]
+
 
 def compute_tp_sl(entry_price: float,
                   atr: Optional[float] = None,
@@ -33,6 +52,7 @@ def compute_tp_sl(entry_price: float,
       {"mode": "atr", "tp_atr_mul": 2.0, "sl_atr_mul": 1.5}
       OR
       {"mode": "percent", "tp_pct": 0.04, "sl_pct": 0.02}
+    Add "tick_snap": True to snap the result to valid IDX prices.
 
     If mode not provided, default to "atr" if atr provided, otherwise "percent" (requires tp_pct/sl_pct).
 
@@ -61,8 +81,6 @@ def compute_tp_sl(entry_price: float,
         # Ensure SL is positive (price floor)
         if sl <= 0:
             sl = 0.0
-        return round(float(tp), 8), round(float(sl), 8)
-
     elif mode == "percent":
         tp_pct = float(params.get("tp_pct", 0.04))  # 4% default
         sl_pct = float(params.get("sl_pct", 0.02))  # 2% default
@@ -70,17 +88,20 @@ def compute_tp_sl(entry_price: float,
         sl = entry_price * (1.0 - sl_pct)
         if sl <= 0:
             sl = 0.0
-        return round(float(tp), 8), round(float(sl), 8)
-
     else:
         raise ValueError(f"Unknown mode '{mode}' for compute_tp_sl")
 
+    if params.get("tick_snap", False):
+        snapped_tp, snapped_sl = snap_tp_sl(tp, sl, entry_price)
+        tp, sl = float(snapped_tp), float(snapped_sl)
+    return round(float(tp), 8), round(float(sl), 8)
+
 
 def compute_position_size(account_balance: float,
                           entry_price: float,
                           sl_price: float,
                           risk_per_trade: float = 0.01,
-                          lot_size: int = 1) -> int:
+                          lot_size: int = IDX_LOT_SIZE) -> int:
     """
     Compute number of shares/contracts to buy such that the dollar risk does not exceed
     account_balance * risk_per_trade.
@@ -122,3 +143,104 @@ def compute_position_size(account_balance: float,
         qty = (raw_qty // lot_size) * lot_size
 
     return int(max(0, qty))
+
+
+def _as_float_array(values, size: Optional[int] = None) -> np.ndarray:
+    """None -> all-NaN array; scalars are broadcast to `size`."""
+    if values is None:
+        return np.full(size or 0, np.nan)
+    arr = np.asarray(values, dtype="float64")
+    if arr.ndim == 0 and size is not None:
+        arr = np.full(size, float(arr))
+    return arr
+
+
+def compute_tp_sl_array(entry_price,
+                        atr=None,
+                        params: Optional[Dict] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized compute_tp_sl over arrays of entries (and ATRs).
+
+    Same params as compute_tp_sl. When mode is not given, rows with a finite ATR use
+    mode="atr" and rows with NaN ATR use mode="percent", mirroring the scalar default.
+
+    Returns: (tp, sl, err) arrays; invalid rows have tp/sl = NaN and err != ERR_OK.
+
+    Raises:
+      ValueError only for an unknown mode (a config error, not a per-row error).
+    """
+    if params is None:
+        params = {}
+
+    entry = _as_float_array(entry_price)
+    atr_arr = _as_float_array(atr, size=entry.shape[0])
+
+    mode = params.get("mode", None)
+    if mode is None:
+        use_atr = ~np.isnan(atr_arr)
+    elif mode == "atr":
+        use_atr = np.ones(entry.shape, dtype=bool)
+    elif mode == "percent":
+        use_atr = np.zeros(entry.shape, dtype=bool)
+    else:
+        raise ValueError(f"Unknown mode '{mode}' for compute_tp_sl")
+
+    tp_atr_mul = float(params.get("tp_atr_mul", 2.0))
+    sl_atr_mul = float(params.get("sl_atr_mul", 1.5))
+    tp_pct = float(params.get("tp_pct", 0.04))
+    sl_pct = float(params.get("sl_pct", 0.02))
+
+    err = np.zeros(entry.shape, dtype="int8")
+    err[use_atr & ~(atr_arr > 0)] = ERR_ATR
+    err[~(entry > 0)] = ERR_ENTRY
+
+    with np.errstate(invalid="ignore"):
+        tp = np.where(use_atr, entry + tp_atr_mul * atr_arr, entry * (1.0 + tp_pct))
+        sl = np.where(use_atr, entry - sl_atr_mul * atr_arr, entry * (1.0 - sl_pct))
+    # price floor, same as the scalar version
+    sl = np.where(sl <= 0, 0.0, sl)
+    if params.get("tick_snap", False):
+        tp, sl = snap_tp_sl(tp, sl, entry)
+
+    bad = err != ERR_OK
+    tp = np.round(tp, 8)
+    sl = np.round(sl, 8)
+    tp[bad] = np.nan
+    sl[bad] = np.nan
+    return tp, sl, err
+
+
+def compute_position_size_array(account_balance,
+                                entry_price,
+                                sl_price,
+                                risk_per_trade: float = 0.01,
+                                lot_size: int = IDX_LOT_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized compute_position_size. account_balance may be a scalar or an array
+    aligned with entry_price/sl_price.
+
+    Returns: (qty int64 array, err int8 array); invalid rows get qty 0 and err != ERR_OK.
+    """
+    entry = _as_float_array(entry_price)
+    size = entry.shape[0]
+    sl = _as_float_array(sl_price, size=size)
+    balance = _as_float_array(account_balance, size=size)
+
+    # validation order follows compute_position_size: the first failing check wins
+    err = np.zeros(size, dtype="int8")
+    if not (0 < risk_per_trade <= 1.0):
+        err[:] = ERR_RISK
+    err[~(sl >= 0)] = ERR_SL
+    err[~(entry > 0)] = ERR_ENTRY
+    err[~(balance > 0)] = ERR_BALANCE
+
+    risk_per_unit = entry - sl
+    ok = (err == ERR_OK) & (risk_per_unit > 0)
+
+    qty = np.zeros(size, dtype="int64")
+    raw_qty = np.floor(balance[ok] * risk_per_trade / risk_per_unit[ok])
+    raw_qty = np.maximum(raw_qty, 0).astype("int64")
+    if lot_size > 1:
+        raw_qty = (raw_qty // lot_size) * lot_size
+    qty[ok] = raw_qty
+    return qty, err
@@ -0,0 +1,79 @@
+"""
+ticks.py
+
+Fraksi harga (tick size) IDX dan snapping harga ke grid yang valid.
+
+Tick bands (saham, pasar reguler):
+  harga < 200          -> tick 1
+  200  <= harga < 500  -> tick 2
+  500  <= harga < 2000 -> tick 5
+  2000 <= harga < 5000 -> tick 10
+  harga >= 5000        -> tick 25
+
+Every band boundary is a multiple of the ticks below it, so snapping with the tick
+of the raw price always lands on a valid price, even when rounding up crosses into
+the next band (e.g. 499 -> 500).
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+IDX_LOT_SIZE = 100
+
+TICK_BAND_LOWER = np.array([0.0, 200.0, 500.0, 2000.0, 5000.0])
+TICK_BAND_SIZE = np.array([1.0, 2.0, 5.0, 10.0, 25.0])
+
+# tolerance for float noise such as 1234.9999999 before floor/ceil
+_EPS = 1e-9
+
+
+def tick_size(prices) -> np.ndarray:
+    """Tick size for each price (vectorized lookup in the band table)."""
+    p = np.asarray(prices, dtype="float64")
+    band = np.searchsorted(TICK_BAND_LOWER, p, side="right") - 1
+    return TICK_BAND_SIZE[np.clip(band, 0, len(TICK_BAND_SIZE) - 1)]
+
+
+def snap_to_tick(prices, direction: str = "nearest") -> np.ndarray:
+    """
+    Snap prices to the IDX tick grid.
+
+    direction: "nearest", "down" (floor to tick) or "up" (ceil to tick).
+    NaN stays NaN; prices <= 0 snap to 0.
+    """
+    p = np.asarray(prices, dtype="float64")
+    tick = tick_size(p)
+    steps = p / tick
+    if direction == "nearest":
+        snapped = np.floor(steps + 0.5) * tick
+    elif direction == "down":
+        snapped = np.floor(steps + _EPS) * tick
+    elif direction == "up":
+        snapped = np.ceil(steps - _EPS) * tick
+    else:
+        raise ValueError(f"Unknown direction '{direction}' for snap_to_tick")
+    return np.where(p <= 0, 0.0, snapped)
+
+
+def snap_tp_sl(tp, sl, entry=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Snap BUY-side TP/SL inward: TP down, SL up.
+
+    Keeps both levels inside the raw bracket, so backtests never get a TP that the
+    raw target would not have reached. With entry given, the snapped bracket never
+    collapses onto the entry: TP stays at least one tick above it and SL at least one
+    tick below it (small ATR on a low price can otherwise snap both onto entry). Only
+    then can a snapped level move outside the raw bracket, by less than one tick.
+    """
+    tp, sl = snap_to_tick(tp, "down"), snap_to_tick(sl, "up")
+    if entry is None:
+        return tp, sl
+    e = np.asarray(entry, dtype="float64")
+    # nearest valid levels strictly above / below entry (entry itself may be off-grid);
+    # the tick below a band boundary is the lower band's (500 -> 498, not 495)
+    floor_e = snap_to_tick(e, "down")
+    ceil_e = snap_to_tick(e, "up")
+    tp_min = floor_e + tick_size(floor_e)
+    sl_max = np.maximum(ceil_e - tick_size(ceil_e - 0.5 * TICK_BAND_SIZE[0]), 0.0)
+    return np.maximum(tp, tp_min), np.minimum(sl, sl_max)
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable, Iterator
+import os
 import sqlite3
+import threading
 import uuid
 
 import pandas as pd
@@ -13,26 +17,121 @@ DEFAULT_COLUMNS = [
     "status", "status_info", "strategy_version", "reason", "updated_at"
 ]
 
+# integer UTC epoch nanoseconds mirroring timestamp / updated_at, used for ordering and ranges
+NS_COLUMNS = ["timestamp_ns", "updated_at_ns"]
+
+# PRAGMA user_version of a db whose NS_COLUMNS exist and are backfilled
+SCHEMA_VERSION = 1
+
+STATEMENT_CACHE_SIZE = 256
+
+INSERT_SQL = f"""
+    INSERT OR IGNORE INTO signals ({", ".join(DEFAULT_COLUMNS + NS_COLUMNS)})
+    VALUES ({", ".join(":" + c for c in DEFAULT_COLUMNS + NS_COLUMNS)})
+"""
+
+
+def epoch_ns(value) -> int | None:
+    """UTC epoch nanoseconds of a timestamp (text, datetime, Timestamp); naive values count as UTC, None if unparsable."""
+    if value is None or value == "":
+        return None
+    try:
+        ts = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    if ts is pd.NaT:
+        return None
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    return int(ts.value)
+
+
+def _now() -> tuple[str, int]:
+    now = datetime.now(timezone.utc)
+    return now.isoformat(), epoch_ns(now)
+
 
 class SignalStorage:
-    """SQLite-backed signal storage (`<folder>/signals.db`)."""
+    """
+    SQLite-backed signal storage (`<folder>/<db_name>`, default `signals.db`).
 
-    def __init__(self, folder: str = "signals") -> None:
+    Each thread keeps one long-lived connection (PRAGMAs applied once, prepared
+    statements cached by sqlite3). A connection is never reused across fork: a child
+    process opens its own, so several processes can share the WAL database.
+    Writes go through `transaction()`; nest it to group several writes in one commit.
+    """
+
+    def __init__(self, folder: str = "signals", db_name: str = "signals.db") -> None:
         self.folder = Path(folder)
         self.folder.mkdir(parents=True, exist_ok=True)
-        self.db_path = self.folder / "signals.db"
+        self.db_path = self.folder / db_name
+        self._local = threading.local()
+        self._commits = 0
         self._init_db()
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, timeout=30)
+        """This thread's connection (opened on first use, and again after a fork)."""
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None and local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=STATEMENT_CACHE_SIZE)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode=WAL;")
         conn.execute("PRAGMA synchronous=NORMAL;")
         conn.execute("PRAGMA busy_timeout=30000;")
+        local.conn, local.pid, local.depth = conn, os.getpid(), 0
         return conn
 
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        One write transaction (BEGIN IMMEDIATE ... COMMIT, ROLLBACK on error).
+
+        Nested calls join the outer transaction, so storage methods used inside
+        `with storage.transaction():` all land in a single commit.
+        """
+        conn = self._connect()
+        local = self._local
+        if local.depth:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+        # IMMEDIATE takes the write lock up front instead of failing on a later upgrade
+        conn.execute("BEGIN IMMEDIATE")
+        local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+            self._commits += 1
+        finally:
+            local.depth = 0
+
+    def change_token(self) -> tuple[int, int]:
+        """
+        (PRAGMA data_version, commits made through this object).
+
+        data_version moves when another connection (thread or process) commits,
+        the counter when this storage commits; equal tokens mean nothing changed.
+        """
+        version = self._connect().execute("PRAGMA data_version").fetchone()[0]
+        return int(version), self._commits
+
+    def close(self) -> None:
+        """Close this thread's connection (a later call reopens it)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
     def _init_db(self) -> None:
-        with self._connect() as conn:
+        with self.transaction() as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS signals (
@@ -47,43 +146,170 @@ class SignalStorage:
                     status_info TEXT,
                     strategy_version TEXT,
                     reason TEXT,
-                    updated_at TEXT
+                    updated_at TEXT,
+                    timestamp_ns INTEGER,
+                    updated_at_ns INTEGER
                 )
                 """
             )
+            self._migrate(conn)
             conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_ticker ON signals(ticker)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_status ON signals(status)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_ticker_status ON signals(ticker, status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_timestamp_ns ON signals(timestamp_ns)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_updated_at_ns ON signals(updated_at_ns)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_signals_version_ts ON signals(strategy_version, timestamp_ns)"
+            )
+            # the watcher only reads OPEN rows; this stays small however much TP/SL history piles up
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_signals_open_ns ON signals(ticker, timestamp_ns, id) WHERE status = 'OPEN'"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ticker_state (
+                    ticker TEXT PRIMARY KEY,
+                    last_bar_ts TEXT,
+                    data_hash TEXT,
+                    params_hash TEXT,
+                    updated_at TEXT
+                )
+                """
+            )
 
-    def save_signal_dict(self, signal: dict) -> dict:
-        ticker = signal["ticker"]
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Add and backfill NS_COLUMNS on a db created before they existed (PRAGMA user_version < 1)."""
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(signals)")}
+        for col in NS_COLUMNS:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE signals ADD COLUMN {col} INTEGER")
+        self._backfill_epoch_ns(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _backfill_epoch_ns(conn: sqlite3.Connection) -> int:
+        rows = conn.execute(
+            "SELECT id, timestamp, updated_at FROM signals WHERE timestamp_ns IS NULL"
+        ).fetchall()
+        if not rows:
+            return 0
+        frame = pd.DataFrame([tuple(r) for r in rows], columns=["id", "timestamp", "updated_at"])
+        values = []
+        for col in ("timestamp", "updated_at"):
+            # vectorized parse; mixed formats and offsets are fine, naive text counts as UTC
+            parsed = pd.to_datetime(frame[col].replace("", None), utc=True, errors="coerce", format="mixed")
+            values.append([None if pd.isna(v) else int(v.value) for v in parsed])
+        conn.executemany(
+            "UPDATE signals SET timestamp_ns = ?, updated_at_ns = ? WHERE id = ?",
+            list(zip(values[0], values[1], frame["id"].tolist())),
+        )
+        return len(rows)
+
+    def backfill_epoch_ns(self) -> int:
+        """Fill timestamp_ns / updated_at_ns of rows without timestamp_ns (written by older code). Returns rows scanned."""
+        with self.transaction() as conn:
+            return self._backfill_epoch_ns(conn)
+
+    @staticmethod
+    def _record(signal: dict) -> dict:
+        """Row dict for the signals table (ValueError when ticker/entry/tp/sl are missing or not numeric)."""
+        ticker = signal.get("ticker")
         entry = signal.get("entry_price", signal.get("entry"))
-        record = {
-            "id": signal.get("id", str(uuid.uuid4())),
-            "ticker": ticker,
-            "timestamp": str(signal.get("timestamp", datetime.now(timezone.utc).isoformat())),
-            "entry_price": float(entry),
-            "tp": float(signal["tp"]),
-            "sl": float(signal["sl"]),
+        if not ticker or entry in (None, "") or signal.get("tp") in (None, "") or signal.get("sl") in (None, ""):
+            raise ValueError("signal needs ticker, entry/entry_price, tp and sl")
+        try:
+            entry_price, tp, sl = float(entry), float(signal["tp"]), float(signal["sl"])
+        except (TypeError, ValueError):
+            raise ValueError(f"non-numeric entry/tp/sl in signal for {ticker}") from None
+        timestamp = signal.get("timestamp") or datetime.now(timezone.utc).isoformat()
+        updated_at = signal.get("updated_at", "")
+        return {
+            "id": str(signal.get("id") or uuid.uuid4()),
+            "ticker": str(ticker),
+            "timestamp": str(timestamp),
+            "entry_price": entry_price,
+            "tp": tp,
+            "sl": sl,
             "signal": str(signal.get("signal", signal.get("side", "BUY"))),
             "status": str(signal.get("status", "OPEN")),
             "status_info": str(signal.get("status_info", "")),
             "strategy_version": str(signal.get("strategy_version", "unknown")),
             "reason": str(signal.get("reason", "")),
-            "updated_at": str(signal.get("updated_at", "")),
+            "updated_at": str(updated_at),
+            "timestamp_ns": epoch_ns(timestamp),
+            "updated_at_ns": epoch_ns(updated_at),
         }
 
-        with self._connect() as conn:
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO signals
-                (id, ticker, timestamp, entry_price, tp, sl, signal, status, status_info, strategy_version, reason, updated_at)
-                VALUES (:id, :ticker, :timestamp, :entry_price, :tp, :sl, :signal, :status, :status_info, :strategy_version, :reason, :updated_at)
-                """,
-                record,
-            )
+    def save_signal_dict(self, signal: dict) -> dict:
+        record = self._record(signal)
+        with self.transaction() as conn:
+            conn.execute(INSERT_SQL, record)
         return record
 
+    def save_signals_many(self, signals: Iterable[dict], batch_size: int = 10_000) -> dict:
+        """
+        Insert many signals with executemany in one transaction.
+
+        Records are normalized like save_signal_dict; invalid ones are skipped and
+        counted, existing ids are left untouched (INSERT OR IGNORE). Returns
+        {"inserted", "ignored", "invalid"} counts.
+        """
+        counts = {"inserted": 0, "ignored": 0, "invalid": 0}
+        batch: list[dict] = []
+
+        def flush(conn: sqlite3.Connection) -> None:
+            before = conn.total_changes
+            conn.executemany(INSERT_SQL, batch)
+            changed = conn.total_changes - before
+            counts["inserted"] += changed
+            counts["ignored"] += len(batch) - changed
+            batch.clear()
+
+        with self.transaction() as conn:
+            for signal in signals:
+                try:
+                    batch.append(self._record(signal))
+                except ValueError:
+                    counts["invalid"] += 1
+                    continue
+                if len(batch) >= batch_size:
+                    flush(conn)
+            if batch:
+                flush(conn)
+        return counts
+
+    def export_rows(self) -> list[dict]:
+        """Every signals row as stored, DEFAULT_COLUMNS + NS_COLUMNS (for copying into another db)."""
+        columns = ", ".join(DEFAULT_COLUMNS + NS_COLUMNS)
+        rows = self._connect().execute(f"SELECT {columns} FROM signals ORDER BY timestamp_ns, id").fetchall()
+        return [dict(row) for row in rows]
+
+    def merge_rows(self, rows: Iterable[dict]) -> dict:
+        """
+        Insert rows exported from another db (see export_rows) in one transaction.
+
+        Rows are taken as stored, status and updated_at included; existing ids are left
+        untouched (INSERT OR IGNORE). timestamp_ns / updated_at_ns come from the row and
+        are only derived from the text columns when missing. Returns {"inserted", "ignored"}.
+        """
+        records = []
+        for row in rows:
+            record = {c: row.get(c) for c in DEFAULT_COLUMNS}
+            record["timestamp_ns"] = row.get("timestamp_ns")
+            if record["timestamp_ns"] is None:
+                record["timestamp_ns"] = epoch_ns(record["timestamp"])
+            record["updated_at_ns"] = row.get("updated_at_ns")
+            if record["updated_at_ns"] is None:
+                record["updated_at_ns"] = epoch_ns(record["updated_at"])
+            records.append(record)
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(INSERT_SQL, records)
+            inserted = conn.total_changes - before
+        return {"inserted": inserted, "ignored": len(records) - inserted}
+
     def add_signal(self, ticker: str, entry_price: float, tp: float, sl: float, strategy_version: str = "v1", **kwargs) -> dict:
         sig = {
             "ticker": ticker,
@@ -95,22 +321,39 @@ class SignalStorage:
         }
         return self.save_signal_dict(sig)
 
-    def list_signals(self, ticker: str | None = None, status: str | None = None) -> pd.DataFrame:
+    def list_signals(self, ticker: str | None = None, status: str | None = None, since=None, until=None,
+                     strategy_version: str | None = None) -> pd.DataFrame:
+        """
+        Signals ordered by time. since / until (anything pd.Timestamp accepts, naive = UTC)
+        select since <= timestamp < until on the indexed timestamp_ns column.
+        """
         query = "SELECT * FROM signals"
         clauses = []
-        params: list[str] = []
+        params: list = []
         if ticker is not None:
             clauses.append("ticker = ?")
             params.append(str(ticker))
-        if status is not None:
+        if status == "OPEN":
+            # literal (not a bound parameter) so SQLite can pick the partial index
+            clauses.append("status = 'OPEN'")
+        elif status is not None:
             clauses.append("status = ?")
             params.append(str(status))
+        if strategy_version is not None:
+            clauses.append("strategy_version = ?")
+            params.append(str(strategy_version))
+        for op, bound in ((">=", since), ("<", until)):
+            if bound is not None:
+                ns = epoch_ns(bound)
+                if ns is None:
+                    raise ValueError(f"cannot parse time bound {bound!r}")
+                clauses.append(f"timestamp_ns {op} ?")
+                params.append(ns)
         if clauses:
             query += " WHERE " + " AND ".join(clauses)
-        query += " ORDER BY timestamp, id"
+        query += " ORDER BY timestamp_ns, id"
 
-        with self._connect() as conn:
-            df = pd.read_sql_query(query, conn, params=params)
+        df = pd.read_sql_query(query, self._connect(), params=params)
 
         if df.empty:
             return pd.DataFrame(columns=DEFAULT_COLUMNS)
@@ -121,19 +364,93 @@ class SignalStorage:
         return df[DEFAULT_COLUMNS]
 
     def update_signal_status(self, ticker: str, signal_id: str, new_status: str, status_info: str = "") -> bool:
-        with self._connect() as conn:
+        now, now_ns = _now()
+        with self.transaction() as conn:
             cur = conn.execute(
                 """
                 UPDATE signals
-                SET status = ?, status_info = ?, updated_at = ?
+                SET status = ?, status_info = ?, updated_at = ?, updated_at_ns = ?
                 WHERE ticker = ? AND id = ?
                 """,
                 (
                     str(new_status),
                     str(status_info),
-                    datetime.now(timezone.utc).isoformat(),
+                    now,
+                    now_ns,
                     str(ticker),
                     str(signal_id),
                 ),
             )
             return cur.rowcount > 0
+
+    def update_statuses_many(self, transitions: Iterable[tuple[str, str, str]]) -> list[str]:
+        """
+        Apply (id, status, info) transitions in one transaction; returns the ids changed.
+
+        Only rows still OPEN are updated, so when two watchers race on a signal the
+        second one is a no-op instead of overwriting the first close.
+        """
+        now, now_ns = _now()
+        updated = []
+        with self.transaction() as conn:
+            for signal_id, new_status, status_info in transitions:
+                cur = conn.execute(
+                    "UPDATE signals SET status = ?, status_info = ?, updated_at = ?, updated_at_ns = ? "
+                    "WHERE id = ? AND status = 'OPEN'",
+                    (str(new_status), str(status_info), now, now_ns, str(signal_id)),
+                )
+                if cur.rowcount > 0:
+                    updated.append(str(signal_id))
+        return updated
+
+    def get_ticker_state(self, ticker: str) -> dict | None:
+        row = self._connect().execute(
+            "SELECT ticker, last_bar_ts, data_hash, params_hash, updated_at FROM ticker_state WHERE ticker = ?",
+            (str(ticker),),
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def save_ticker_state(self, ticker: str, last_bar_ts: str, data_hash: str, params_hash: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO ticker_state (ticker, last_bar_ts, data_hash, params_hash, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    str(ticker),
+                    str(last_bar_ts),
+                    str(data_hash),
+                    str(params_hash),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def list_ticker_states(self) -> list[dict]:
+        """Every ticker_state row (see get_ticker_state)."""
+        rows = self._connect().execute(
+            "SELECT ticker, last_bar_ts, data_hash, params_hash, updated_at FROM ticker_state ORDER BY ticker"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def merge_ticker_states(self, states: Iterable[dict]) -> int:
+        """
+        Upsert ticker_state rows from another db (e.g. a shard); a row only replaces one
+        with an older updated_at. Returns the number of rows written.
+        """
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT INTO ticker_state (ticker, last_bar_ts, data_hash, params_hash, updated_at)
+                VALUES (:ticker, :last_bar_ts, :data_hash, :params_hash, :updated_at)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    last_bar_ts = excluded.last_bar_ts,
+                    data_hash = excluded.data_hash,
+                    params_hash = excluded.params_hash,
+                    updated_at = excluded.updated_at
+                WHERE excluded.updated_at > COALESCE(ticker_state.updated_at, '')
+                """,
+                list(states),
+            )
+            return conn.total_changes - before
@@ -1,29 +1,38 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Iterable, Tuple
+import logging
 
+import numpy as np
 import pandas as pd
 
+from bot_analisa.indicators.streaming import StreamingATR
+from bot_analisa.risk.exits import ExitPolicy, resolve_exit, stop_status
 
-def process_price_tick(storage, ticker: str, price: float) -> list[str]:
-    open_signals = storage.list_signals(ticker=ticker, status="OPEN")
-    updates = []
+
+logger = logging.getLogger(__name__)
+
+Transition = Tuple[str, str, str]   # (signal id, new status, status info)
+
+
+def price_transitions(open_signals: pd.DataFrame, price: float) -> list[Transition]:
+    """TP/SL transitions of OPEN signal rows at price (TP checked first)."""
     if open_signals is None or open_signals.empty:
-        return updates
+        return []
+    tp = open_signals["tp"].astype("float64").to_numpy()
+    sl = open_signals["sl"].astype("float64").to_numpy()
+    out = []
+    for sid, hit_tp, hit_sl in zip(open_signals["id"].tolist(), (price >= tp).tolist(), (price <= sl).tolist()):
+        if hit_tp:
+            out.append((sid, "TP", f"hit_tp_price={price}"))
+        elif hit_sl:
+            out.append((sid, "SL", f"hit_sl_price={price}"))
+    return out
 
-    for _, row in open_signals.iterrows():
-        sid = row["id"]
-        tp = float(row["tp"])
-        sl = float(row["sl"])
 
-        if price >= tp:
-            if storage.update_signal_status(ticker, sid, "TP", f"hit_tp_price={price}"):
-                updates.append(sid)
-            continue
-        if price <= sl:
-            if storage.update_signal_status(ticker, sid, "SL", f"hit_sl_price={price}"):
-                updates.append(sid)
-    return updates
+def process_price_tick(storage, ticker: str, price: float) -> list[str]:
+    open_signals = storage.list_signals(ticker=ticker, status="OPEN")
+    return storage.update_statuses_many(price_transitions(open_signals, price))
 
 
 def simulate_backfill(storage, ticker: str, price_series: pd.Series | pd.DataFrame):
@@ -41,17 +50,156 @@ def simulate_backfill(storage, ticker: str, price_series: pd.Series | pd.DataFra
     return out
 
 
-def watch_once(provider, storage, tickers: Iterable[str] | None = None):
-    if tickers is None:
+def _bars_since(bars: pd.DataFrame, timestamp) -> np.ndarray:
+    """Positions of bars strictly after the signal bar (the backtester scans from pos + 1)."""
+    times = pd.DatetimeIndex(pd.to_datetime(bars["Datetime"]))
+    ts = pd.Timestamp(timestamp)
+    if times.tz is None and ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    elif times.tz is not None and ts.tz is None:
+        ts = ts.tz_localize(times.tz)
+    return np.flatnonzero(times > ts)
+
+
+def policy_transitions(open_signals: pd.DataFrame, bars: pd.DataFrame, price: float,
+                       policy: ExitPolicy) -> list[Transition]:
+    """
+    price_transitions with an ExitPolicy: the stop of each OPEN signal is rebuilt with
+    risk.exits.resolve_exit on the bars since the signal (same rules as the backtest),
+    then the live price is checked against TP and that stop. Exits that already
+    happened on the bars (stop, TP, time stop) are recorded with their bar price.
+    """
+    if open_signals is None or open_signals.empty:
+        return []
+
+    high = pd.to_numeric(bars["High"], errors="coerce").to_numpy(dtype="float64")
+    low = pd.to_numeric(bars["Low"], errors="coerce").to_numpy(dtype="float64")
+    close = pd.to_numeric(bars["Close"], errors="coerce").to_numpy(dtype="float64")
+    atr_values = StreamingATR(policy.atr_period).update(high, low, close) if policy.needs_atr else None
+
+    out = []
+    for _, row in open_signals.iterrows():
+        entry = float(row["entry_price"])
+        tp = float(row["tp"])
+        sl = float(row["sl"])
+        pos = _bars_since(bars, row["timestamp"])
+        res = resolve_exit(high[pos], low[pos], close[pos], None if atr_values is None else atr_values[pos],
+                           0, entry, tp, sl, policy)
+        partial = f" partial_price={res.partial_level}" if res.partial_pos >= 0 else ""
+
+        if res.exit_pos >= 0:
+            status, info = res.status, f"exit_price={res.exit_level}"
+        elif price >= tp:
+            status, info = "TP", f"hit_tp_price={price}"
+        elif price <= res.stop:
+            status, info = stop_status(res.stop, entry, sl), f"hit_stop={res.stop} price={price}"
+        else:
+            continue
+        out.append((row["id"], status, info + partial))
+    return out
+
+
+def process_policy_tick(storage, ticker: str, bars: pd.DataFrame, price: float, policy: ExitPolicy) -> list[str]:
+    open_signals = storage.list_signals(ticker=ticker, status="OPEN")
+    return storage.update_statuses_many(policy_transitions(open_signals, bars, price, policy))
+
+
+_EMPTY = pd.DataFrame()
+
+
+class OpenSignalCache:
+    """
+    OPEN signals of a storage held in memory, grouped by ticker, for a long-running watcher.
+
+    refresh() compares storage.change_token() with the token of the last load and
+    re-reads the OPEN rows (one query) only when it moved, i.e. when some other
+    connection or this storage committed. apply() writes transitions and drops
+    the closed rows locally; when nothing else changed meanwhile the cache stays
+    valid without a reload.
+    """
+
+    def __init__(self, storage) -> None:
+        self.storage = storage
+        self.token = None
+        self.by_ticker: dict[str, pd.DataFrame] = {}
+        self.reloads = 0
+
+    def refresh(self) -> None:
+        token = self.storage.change_token()
+        if token == self.token:
+            return
+        open_df = self.storage.list_signals(status="OPEN")
+        self.by_ticker = {str(t): rows for t, rows in open_df.groupby("ticker", sort=True)} if not open_df.empty else {}
+        self.token = token
+        self.reloads += 1
+
+    def tickers(self) -> list[str]:
+        return sorted(self.by_ticker)
+
+    def get(self, ticker: str) -> pd.DataFrame:
+        return self.by_ticker.get(str(ticker), _EMPTY)
+
+    def apply(self, transitions: list[Transition]) -> list[str]:
+        """update_statuses_many, then remove the closed ids from the cache."""
+        before = self.token
+        updated = self.storage.update_statuses_many(transitions)
+        after = self.storage.change_token()
+        if before is not None and after == (before[0], before[1] + 1):
+            # our own commit was the only change: patch instead of reloading
+            closed = {sid for sid, _, _ in transitions}
+            for t, rows in list(self.by_ticker.items()):
+                keep = rows[~rows["id"].isin(closed)]
+                if keep.empty:
+                    del self.by_ticker[t]
+                elif len(keep) != len(rows):
+                    self.by_ticker[t] = keep
+            self.token = after
+        return updated
+
+
+def watch_once(provider, storage, tickers: Iterable[str] | None = None, policy: ExitPolicy | None = None,
+               cache: OpenSignalCache | None = None):
+    """
+    One pass over tickers: transitions of every ticker are collected first and written
+    in a single transaction (update_statuses_many), so a gap morning closing hundreds
+    of signals costs one commit. Returns {ticker: [updated ids]}. A ticker whose price
+    or bars cannot be fetched is logged and skipped; the others are still written.
+
+    With an OpenSignalCache (reuse it across passes) OPEN rows come from memory and
+    are only re-read from SQLite after the database changed.
+    """
+    if cache is not None:
+        cache.refresh()
+        if tickers is None:
+            tickers = cache.tickers()
+    elif tickers is None:
         open_df = storage.list_signals(status="OPEN")
         if open_df is None or open_df.empty:
             return {}
         tickers = sorted(set(open_df["ticker"].astype(str).tolist()))
 
-    result = {}
+    pending: list[Transition] = []
+    owner: dict[str, str] = {}
     for t in tickers:
-        price = float(provider.get_last_price(t))
-        updated = process_price_tick(storage, t, price)
-        if updated:
-            result[t] = updated
+        open_signals = cache.get(t) if cache is not None else storage.list_signals(ticker=t, status="OPEN")
+        if open_signals is None or open_signals.empty:
+            continue
+        try:
+            price = float(provider.get_last_price(t))
+            if policy is None:
+                found = price_transitions(open_signals, price)
+            else:
+                found = policy_transitions(open_signals, provider.get_historical(t), price, policy)
+        except Exception:
+            logger.exception("watch_once: skipping %s", t)
+            continue
+        pending.extend(found)
+        owner.update((sid, t) for sid, _, _ in found)
+
+    if not pending:
+        return {}
+    updated = cache.apply(pending) if cache is not None else storage.update_statuses_many(pending)
+    result: dict[str, list[str]] = {}
+    for sid in updated:
+        result.setdefault(owner[sid], []).append(sid)
     return result
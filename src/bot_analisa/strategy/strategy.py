@@ -1,8 +1,46 @@
 from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 
 
+def signal_rules(close: np.ndarray, fast: np.ndarray, slow: np.ndarray,
+                 prev_fast: np.ndarray, prev_slow: np.ndarray, sma: np.ndarray, atr: np.ndarray,
+                 params: Dict | None = None, unique: np.ndarray | None = None):
+    """
+    Entry rules of generate_signals on aligned arrays (atr with NaN already set to 0).
+
+    Returns (should_signal bool array, tp array, sl array). Shared with the streaming
+    backtest, which feeds the same arrays block by block.
+    """
+    params = params or {}
+    use_atr_sl = bool(params.get("use_atr_sl", True))
+    tp_atr = float(params.get("tp_atr", 2.0))
+    sl_atr = float(params.get("sl_atr", 1.5))
+    ratio_min_threshold = float(params.get("ratio_min_threshold", 0.5))
+    permissive_fallback = bool(params.get("permissive_fallback", True))
+
+    # strict cross on current bar
+    above = fast > slow
+    crossed = above & (prev_fast <= prev_slow)
+    if unique is not None:
+        crossed = crossed & unique
+
+    sma_ok = np.isnan(sma) | (close > sma)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio_ok = (atr <= 0) | ((close / (atr + 1e-9)) >= ratio_min_threshold)
+
+    should_signal = crossed & sma_ok & ratio_ok
+    if permissive_fallback:
+        # permissive only if fast above slow and basic filters pass
+        should_signal = should_signal | (above & sma_ok & ratio_ok)
+
+    use_atr = use_atr_sl & (atr > 0)
+    tp_arr = np.where(use_atr, close + tp_atr * atr, close * 1.02)
+    sl_arr = np.where(use_atr, close - sl_atr * atr, close * 0.985)
+    return should_signal, tp_arr, sl_arr
+
+
 def generate_signals(df: pd.DataFrame, params: Dict | None = None) -> List[Dict]:
     """
     Generate BUY signals based on EMA cross + optional SMA/ATR filters.
@@ -18,6 +56,8 @@ def generate_signals(df: pd.DataFrame, params: Dict | None = None) -> List[Dict]
       - ratio_min_threshold (default 0.5)
       - permissive_fallback (default True)
       - only_latest (default False): when True evaluate only the latest candle and emit max 1 signal
+      - snap_ticks (default False): snap entry to the nearest tick and TP down / SL up to the
+        IDX tick grid (fraksi harga), keeping TP/SL at least one tick away from entry
     """
     from bot_analisa.indicators.indicators import compute_indicators
 
@@ -28,12 +68,8 @@ def generate_signals(df: pd.DataFrame, params: Dict | None = None) -> List[Dict]
     sma_p = int(params.get("sma_trend", 50))
     atr_p = int(params.get("atr_period", 14))
 
-    use_atr_sl = bool(params.get("use_atr_sl", True))
-    tp_atr = float(params.get("tp_atr", 2.0))
-    sl_atr = float(params.get("sl_atr", 1.5))
-    ratio_min_threshold = float(params.get("ratio_min_threshold", 0.5))
-    permissive_fallback = bool(params.get("permissive_fallback", True))
     only_latest = bool(params.get("only_latest", False))
+    snap_ticks = bool(params.get("snap_ticks", False))
 
     ema_fast_col = f"EMA_{ema_fast_p}"
     ema_slow_col = f"EMA_{ema_slow_p}"
@@ -57,67 +93,56 @@ def generate_signals(df: pd.DataFrame, params: Dict | None = None) -> List[Dict]
     if ema_fast_col not in out.columns or ema_slow_col not in out.columns:
         raise RuntimeError("generate_signals: missing EMA columns")
 
-    prev_fast = out[ema_fast_col].shift(1)
-    prev_slow = out[ema_slow_col].shift(1)
-
-    rows = [out.iloc[-1]] if only_latest and not out.empty else [r for _, r in out.iterrows()]
-    idxs = [out.index[-1]] if only_latest and not out.empty else list(out.index)
-
+    # rule evaluation on arrays; NaN comparisons are False, same as the former row loop
+    def col(name):
+        if name not in out.columns:
+            return None
+        return pd.to_numeric(out[name], errors="coerce").to_numpy(dtype="float64")
+
+    if "Close" not in out.columns:
+        return []
+    rows = slice(len(out) - 1, len(out)) if only_latest and not out.empty else slice(0, len(out))
+    close = col("Close")[rows]
+    fast_all = col(ema_fast_col)
+    slow_all = col(ema_slow_col)
+    fast = fast_all[rows]
+    slow = slow_all[rows]
+    atr_all = col(atr_col)
+    atr = np.nan_to_num(atr_all[rows], nan=0.0) if atr_all is not None else np.zeros(len(close))
+    sma_all = col(sma_col)
+    sma = sma_all[rows] if sma_all is not None else np.full(len(close), np.nan)
+
+    # previous bar by position; duplicated timestamps never cross
+    prev_fast = np.concatenate(([np.nan], fast_all[:-1]))[rows]
+    prev_slow = np.concatenate(([np.nan], slow_all[:-1]))[rows]
+    unique = ~out.index.duplicated(keep=False)[rows]
+    should_signal, tp_arr, sl_arr = signal_rules(close, fast, slow, prev_fast, prev_slow, sma, atr, params, unique)
+
+    idxs = out.index[rows]
     signals: List[Dict] = []
-
-    for idx, row in zip(idxs, rows):
-        try:
-            close = float(row["Close"])
-            fast = float(row[ema_fast_col])
-            slow = float(row[ema_slow_col])
-            atr = float(row[atr_col]) if atr_col in row.index and not pd.isna(row[atr_col]) else 0.0
-        except Exception:
-            continue
-
-        # strict cross on current bar
-        crossed = False
-        try:
-            pf = float(prev_fast.loc[idx])
-            ps = float(prev_slow.loc[idx])
-            crossed = (fast > slow) and (pf <= ps)
-        except Exception:
-            crossed = False
-
-        sma_ok = True
-        if sma_col in out.columns and not pd.isna(row.get(sma_col)):
-            try:
-                sma_ok = close > float(row[sma_col])
-            except Exception:
-                sma_ok = True
-
-        ratio_ok = True
-        if atr > 0:
-            ratio_ok = (close / (atr + 1e-9)) >= ratio_min_threshold
-
-        should_signal = crossed and sma_ok and ratio_ok
-        if not should_signal and permissive_fallback:
-            # permissive only if fast above slow and basic filters pass
-            should_signal = (fast > slow) and sma_ok and ratio_ok
-
-        if should_signal:
-            if use_atr_sl and atr > 0:
-                tp = close + tp_atr * atr
-                sl = close - sl_atr * atr
-            else:
-                tp = close * 1.02
-                sl = close * 0.985
-
-            signals.append(
-                {
-                    "timestamp": idx,
-                    "entry": float(close),
-                    "tp": float(tp),
-                    "sl": float(sl),
-                    "signal": "BUY",
-                    "strategy_version": "v1",
-                }
-            )
+    for i in np.flatnonzero(should_signal):
+        signals.append(
+            {
+                "timestamp": idxs[i],
+                "entry": float(close[i]),
+                "tp": float(tp_arr[i]),
+                "sl": float(sl_arr[i]),
+                "signal": "BUY",
+                "strategy_version": "v1",
+            }
+        )
 
     if only_latest and signals:
-        return [signals[-1]]
+        signals = [signals[-1]]
+
+    if snap_ticks and signals:
+        from bot_analisa.risk.ticks import snap_tp_sl, snap_to_tick
+
+        # entry is the close, already on the grid up to float noise (e.g. 1234.9999999)
+        entries = snap_to_tick([s["entry"] for s in signals])
+        tps, sls = snap_tp_sl([s["tp"] for s in signals], [s["sl"] for s in signals], entries)
+        for s, entry, tp, sl in zip(signals, entries, tps, sls):
+            s["entry"] = float(entry)
+            s["tp"] = float(tp)
+            s["sl"] = float(sl)
     return signals
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot paths (indicators, strategy, backtest, storage, watcher) on synthetic data.
+
+Usage:
+  python scripts/benchmark.py --out benchmarks/baseline.json
+  python scripts/benchmark.py --sizes 1000,100000,1000000 --tickers 10,100,1000 --out benchmarks/full.json
+  python scripts/benchmark.py --compare benchmarks/baseline.json --threshold 0.2
+  python scripts/benchmark.py --stages indicators,backtest.run_backtest --repeat 5
+
+Every stage runs on bot_analisa.data.synthetic frames, so numbers compare across runs
+and machines. Bar stages run once per --sizes entry, ticker stages (portfolio,
+storage, watcher) once per --tickers entry. Setup (data, signals, fresh SQLite file)
+is never timed.
+
+Per stage and size:
+  seconds   best wall time of --repeat runs (perf_counter, tracemalloc off)
+  peak_mb   peak Python/NumPy allocation of one extra run under tracemalloc
+            (skipped with --no-memory)
+
+--out writes the results as JSON. --compare reads such a file and exits with status 1
+when a stage got slower or bigger than the baseline by more than --threshold (a
+fraction; timings under --min-seconds are ignored as noise).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from bot_analisa import __version__
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.portfolio import run_portfolio_backtest
+from bot_analisa.data.synthetic import synthetic_ohlcv, synthetic_universe
+from bot_analisa.indicators.indicators import atr, ema, sma
+from bot_analisa.signals.storage import SignalStorage
+from bot_analisa.signals.watcher import OpenSignalCache, process_price_tick, watch_once
+from bot_analisa.strategy import generate_signals
+
+SIGNALS_PER_TICKER = 20
+
+
+def _bars(cache: dict, n: int) -> pd.DataFrame:
+    if n not in cache:
+        cache[n] = synthetic_ohlcv(n, seed=n)
+    return cache[n]
+
+
+def _signals(cache: dict, n: int) -> list:
+    key = ("signals", n)
+    if key not in cache:
+        cache[key] = generate_signals(_bars(cache, n))
+    return cache[key]
+
+
+def _universe(cache: dict, n: int, bars: int) -> dict:
+    key = ("universe", n, bars)
+    if key not in cache:
+        cache[key] = synthetic_universe(n, bars)
+    return cache[key]
+
+
+def _stored_signals(n_tickers: int) -> List[dict]:
+    rows = []
+    for t in range(n_tickers):
+        for k in range(SIGNALS_PER_TICKER):
+            entry = 1000.0 + k
+            rows.append({"id": f"SYN{t:04d}-{k}", "ticker": f"SYN{t:04d}", "entry": entry,
+                         "tp": entry * 1.05, "sl": entry * 0.97, "timestamp": f"2025-01-01T{k % 24:02d}:00:00",
+                         "strategy_version": "bench"})
+    return rows
+
+
+class _FlatPrice:
+    """Provider stub: every ticker trades at 1005 (between all stored TPs and SLs)."""
+
+    def get_last_price(self, ticker):
+        return 1005.0
+
+
+def bar_stages(cache: dict, workdir: str) -> Dict[str, Callable[[int], Callable[[], object]]]:
+    """stage name -> prepare(n_bars) returning the timed callable."""
+
+    def backtest(n):
+        df, signals = _bars(cache, n), _signals(cache, n)
+        bt = Backtester()
+        return lambda: bt.run_backtest("SYN", df, signal_generator=lambda d, p=None: signals, use_cache=False)
+
+    def stream(n):
+        path = os.path.join(workdir, f"stream_{n}.csv")
+        if not os.path.exists(path):
+            _bars(cache, n).to_csv(path)
+        bt = Backtester()
+        return lambda: bt.run_backtest_csv("SYN", path, use_cache=False)
+
+    return {
+        "indicators.atr": lambda n: (lambda df=_bars(cache, n): atr(df, period=14)),
+        "indicators.ema": lambda n: (lambda c=_bars(cache, n)["Close"]: ema(c, 21)),
+        "indicators.sma": lambda n: (lambda c=_bars(cache, n)["Close"]: sma(c, 50)),
+        "strategy.generate_signals": lambda n: (lambda df=_bars(cache, n): generate_signals(df)),
+        "backtest.run_backtest": backtest,
+        "backtest.run_backtest_csv": stream,
+    }
+
+
+def ticker_stages(cache: dict, workdir: str, portfolio_bars: int) -> Dict[str, Callable[[int], Callable[[], object]]]:
+    """stage name -> prepare(n_tickers) returning the timed callable."""
+    counter = iter(range(1 << 30))
+
+    def fresh_storage() -> SignalStorage:
+        return SignalStorage(folder=os.path.join(workdir, f"signals_{next(counter)}"))
+
+    def portfolio(n):
+        frames = _universe(cache, n, portfolio_bars)
+        signals = {t: generate_signals(df) for t, df in frames.items()}
+        return lambda: run_portfolio_backtest(frames, signals)
+
+    def save(n):
+        storage, rows = fresh_storage(), _stored_signals(n)
+
+        def run():
+            for row in rows:
+                storage.save_signal_dict(row)
+        return run
+
+    def save_many(n):
+        storage, rows = fresh_storage(), _stored_signals(n)
+        return lambda: storage.save_signals_many(rows)
+
+    def watch(n):
+        storage, rows = fresh_storage(), _stored_signals(n)
+        storage.save_signals_many(rows)
+        tickers = sorted({row["ticker"] for row in rows})
+
+        def run():
+            # price between every TP and SL: all rows are checked, none is closed
+            for t in tickers:
+                process_price_tick(storage, t, 1005.0)
+        return run
+
+    def watch_cached(n):
+        storage, rows = fresh_storage(), _stored_signals(n)
+        storage.save_signals_many(rows)
+        cache = OpenSignalCache(storage)
+        watch_once(_FlatPrice(), storage, cache=cache)   # warm: first pass loads the rows
+
+        return lambda: watch_once(_FlatPrice(), storage, cache=cache)
+
+    return {
+        "backtest.portfolio": portfolio,
+        "storage.save_signals": save,
+        "storage.save_signals_many": save_many,
+        "watcher.process_price_tick": watch,
+        "watcher.watch_once_cached": watch_cached,
+    }
+
+
+def measure(prepare: Callable[[], Callable[[], object]], repeat: int = 3, memory: bool = True) -> dict:
+    """Best time of repeat runs and (optionally) the tracemalloc peak of one more run."""
+    times = []
+    for _ in range(max(1, repeat)):
+        fn = prepare()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    out = {"seconds": min(times), "repeat": len(times)}
+    if memory:
+        fn = prepare()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        out["peak_mb"] = peak / (1024 * 1024)
+    return out
+
+
+def _selected(name: str, stages: List[str]) -> bool:
+    return not stages or any(name == s or name.startswith(s + ".") for s in stages)
+
+
+def run_benchmarks(sizes: List[int], tickers: List[int], stages: List[str] = (), repeat: int = 3,
+                   memory: bool = True, portfolio_bars: int = 500, log=print) -> dict:
+    """Benchmark results keyed "<stage>@<size>" plus run metadata."""
+    cache: dict = {}
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        plan = [(bar_stages(cache, workdir), sizes), (ticker_stages(cache, workdir, portfolio_bars), tickers)]
+        for table, dims in plan:
+            for name, prepare in table.items():
+                if not _selected(name, list(stages)):
+                    continue
+                for n in dims:
+                    row = measure(lambda: prepare(n), repeat=repeat, memory=memory)
+                    row.update({"stage": name, "size": n})
+                    results[f"{name}@{n}"] = row
+                    if log:
+                        mem = f"  peak {row['peak_mb']:.1f} MB" if "peak_mb" in row else ""
+                        log(f"{name:<28} {n:>9}  {row['seconds']:.4f}s{mem}")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "version": __version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "portfolio_bars": portfolio_bars,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, min_seconds: float = 0.005) -> List[dict]:
+    """Rows for every stage/metric present in both runs; "regressed" marks ratio > 1 + threshold."""
+    rows = []
+    for key, cur in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            if metric not in cur or metric not in base:
+                continue
+            b, c = float(base[metric]), float(cur[metric])
+            ratio = c / b if b > 0 else float("inf") if c > 0 else 1.0
+            noise = metric == "seconds" and max(b, c) < min_seconds
+            rows.append({"key": key, "metric": metric, "baseline": b, "current": c, "ratio": ratio,
+                         "regressed": bool(ratio > 1.0 + threshold and not noise)})
+    return rows
+
+
+def _ints(value: str) -> List[int]:
+    return [int(float(v)) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indicators, strategy, backtest, storage and watcher")
+    parser.add_argument("--sizes", default="1000,100000", help="bar counts for the bar stages (e.g. 1000,100000,1000000)")
+    parser.add_argument("--tickers", default="10,100", help="ticker counts for portfolio/storage/watcher (e.g. 10,100,1000)")
+    parser.add_argument("--stages", default="", help="comma separated stage names or prefixes (default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--portfolio-bars", type=int, default=500, help="bars per ticker in backtest.portfolio")
+    parser.add_argument("--out", default=None, help="write results JSON (a baseline) here")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown/growth as a fraction")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="ignore timings below this")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    result = run_benchmarks(_ints(args.sizes), _ints(args.tickers), stages, repeat=args.repeat,
+                            memory=not args.no_memory, portfolio_bars=args.portfolio_bars)
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print("Results saved to:", args.out)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, result, threshold=args.threshold, min_seconds=args.min_seconds)
+        for r in rows:
+            flag = "REGRESSION" if r["regressed"] else ""
+            print(f"{r['key']:<38} {r['metric']:<8} {r['baseline']:>10.4f} -> {r['current']:>10.4f}"
+                  f"  x{r['ratio']:.2f} {flag}")
+        regressed = [r for r in rows if r["regressed"]]
+        if regressed:
+            print(f"{len(regressed)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions above", f"{args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,76 @@
 #!/usr/bin/env python3
+"""
+Usage:
+  python scripts/run_backtest.py --ticker BBCA --csv data/BBCA.csv
+  python scripts/run_backtest.py --portfolio data/ --cash 100000000 --max-positions 10
+"""
 import argparse
+import glob
 import os
 from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.intrabar import IntrabarResolver
+from bot_analisa.backtest.result_cache import ResultCache
+from bot_analisa.data.provider import DataProvider
+from bot_analisa.risk.exits import ExitPolicy
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--ticker", required=True)
-    parser.add_argument("--csv", required=True)
+    parser.add_argument("--ticker")
+    parser.add_argument("--csv")
     parser.add_argument("--out", default="backtests")
+    parser.add_argument("--portfolio", default=None,
+                        help="folder of <TICKER>.csv files backtested together with shared capital")
+    parser.add_argument("--cash", type=float, default=100_000_000.0)
+    parser.add_argument("--max-positions", type=int, default=10)
+    parser.add_argument("--risk", type=float, default=0.01, help="risk per trade (fraction of equity)")
+    parser.add_argument("--intrabar", default=None,
+                        help="finer cached interval (e.g. 15m, 1m) used to resolve bars touching TP and SL")
+    parser.add_argument("--data-folder", default="data", help="DataProvider cache folder for --intrabar")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="stream the CSV in blocks of this many rows (bounded memory, default strategy)")
+    parser.add_argument("--cache-dir", default="cache/backtests", help="memoized results (data + params + code version)")
+    parser.add_argument("--cache-max-mb", type=float, default=256, help="LRU size limit of the result cache")
+    parser.add_argument("--no-cache", action="store_true", help="always recompute, never read or write the cache")
+    parser.add_argument("--trail-atr", type=float, default=None, help="ATR trailing stop multiple")
+    parser.add_argument("--break-even-r", type=float, default=None, help="move stop to entry after this many R")
+    parser.add_argument("--max-bars", type=int, default=None, help="time stop: close after this many bars held")
+    parser.add_argument("--partial-tp-r", type=float, default=None, help="partial take-profit at this many R")
+    parser.add_argument("--partial-fraction", type=float, default=None, help="fraction closed at --partial-tp-r")
     args = parser.parse_args()
+    if args.partial_fraction is not None and args.partial_tp_r is None:
+        parser.error("--partial-fraction needs --partial-tp-r")
 
     os.makedirs(args.out, exist_ok=True)
 
-    bt = Backtester()
-    df = bt.load_csv(args.csv)
-    result = bt.run_backtest(args.ticker, df)
+    cache = None if args.no_cache else ResultCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    bt = Backtester(cache=cache)
+    if args.portfolio:
+        frames = {}
+        for path in sorted(glob.glob(os.path.join(args.portfolio, "*.csv"))):
+            frames[os.path.splitext(os.path.basename(path))[0]] = bt.load_csv(path)
+        result = bt.run_portfolio_backtest(frames, initial_cash=args.cash, max_positions=args.max_positions,
+                                           risk_per_trade=args.risk)
+        outfile = os.path.join(args.out, "report_portfolio.json")
+        bt.save_report(result, outfile)
+        print("Portfolio backtest saved to:", outfile)
+        print("Tickers:", len(frames), "Trades:", result["total_trades"],
+              "Return:", round(result["total_return"]*100, 2),
+              "MaxDD%:", round(result["max_dd_pct"]*100, 2))
+        return
+    if not (args.ticker and args.csv):
+        parser.error("--ticker and --csv are required without --portfolio")
+
+    intrabar = IntrabarResolver(DataProvider(args.data_folder), args.ticker, args.intrabar) if args.intrabar else None
+    policy = ExitPolicy.from_params({
+        "trail_atr": args.trail_atr, "break_even_r": args.break_even_r, "max_bars": args.max_bars,
+        "partial_tp_r": args.partial_tp_r, "partial_fraction": args.partial_fraction,
+    })
+    if args.chunk_size:
+        if intrabar is not None or policy is not None:
+            parser.error("--chunk-size cannot be combined with --intrabar or exit policy flags")
+        result = bt.run_backtest_csv(args.ticker, args.csv, chunk_size=args.chunk_size)
+    else:
+        result = bt.run_backtest(args.ticker, bt.load_csv(args.csv), intrabar=intrabar, exit_policy=policy)
 
     outfile = os.path.join(args.out, f"report_{args.ticker}.json")
     bt.save_report(result, outfile)
@@ -24,6 +80,10 @@ def main():
           "Winrate:", round(result["winrate"]*100, 2),
           "PF:", result["pf"],
           "MaxDD:", result["max_dd"])
+    if cache is not None and cache.hits:
+        print("Result served from cache:", args.cache_dir)
+    if intrabar is not None:
+        print("Ambiguous bars:", result.get("ambiguous_bars", 0), "resolved intrabar:", result.get("intrabar_resolved", 0))
 
 if __name__ == "__main__":
     main()
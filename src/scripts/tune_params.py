@@ -5,13 +5,17 @@ CLI for parameter sweep + walk-forward tuning.
 Usage:
   python scripts/tune_params.py --ticker BBCA --csv data/BBCA.csv --out tuning --preset simple
   python scripts/tune_params.py --ticker BBCA --csv data/BBCA.csv --out tuning --grid '{"atr_period":[10,14],"ema_fast":[5,9],"ema_slow":[21,50]}' --walk 30
+  python scripts/tune_params.py --ticker BBCA --csv data/BBCA.csv --preset simple --jobs -1
+  python scripts/tune_params.py --ticker BBCA --csv data/BBCA.csv --grid '{...}' --search bayes --budget 40
+  python scripts/tune_params.py --ticker BBCA --csv data/BBCA.csv --preset simple --store tuning/tuning.db
+  python scripts/tune_params.py --ticker BBCA --leaderboard --store tuning/tuning.db
 """
 import argparse
 import json
 import os
-import pandas as pd
 from datetime import datetime
 from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.tuning_store import TuningStore
 # optional: import strategy generator if you want to pass into backtester
 try:
     from bot_analisa.strategy import generate_signals
@@ -36,13 +40,40 @@ def parse_grid(grid_str):
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--ticker", required=True)
-    p.add_argument("--csv", required=True)
+    p.add_argument("--csv", default=None)
     p.add_argument("--out", default="tuning")
     p.add_argument("--preset", default=None, help="use preset grid name")
     p.add_argument("--grid", default=None, help="json string param grid")
     p.add_argument("--walk", type=int, default=None, help="walk-forward window in days")
+    p.add_argument("--walk-bars", type=int, default=None, help="walk-forward window in bars")
+    p.add_argument("--walk-mode", choices=["anchored", "rolling"], default="anchored")
+    p.add_argument("--train-window", type=int, default=None, help="rolling train window (same unit as the walk)")
+    p.add_argument("--jobs", type=int, default=1, help="worker processes (-1 = all cores)")
+    p.add_argument("--search", choices=["grid", "random", "halving", "bayes"], default="grid")
+    p.add_argument("--budget", type=int, default=None, help="max number of combos to try (random/halving/bayes)")
+    p.add_argument("--time-budget", type=float, default=None, help="wall-clock limit in seconds")
+    p.add_argument("--metric", default="pf", help="objective used to rank combos (pf, winrate, max_dd)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--prune-below", type=float, default=None,
+                   help="early stop: drop combos scoring below this on a recent probe window")
+    p.add_argument("--robust", type=int, default=None,
+                   help="bootstrap resamples per combo; adds pf_lo/max_dd_hi/expectancy_lo (use --metric pf_lo)")
+    p.add_argument("--robust-method", choices=["bootstrap", "shuffle"], default="bootstrap")
+    p.add_argument("--store", default=None,
+                   help="sqlite file for resumable runs; finished combos are saved and skipped on rerun")
+    p.add_argument("--leaderboard", action="store_true", help="print the best stored rows and exit")
+    p.add_argument("--top", type=int, default=20, help="leaderboard size")
     args = p.parse_args()
 
+    store = TuningStore(args.store) if args.store else None
+    if args.leaderboard:
+        if store is None:
+            raise SystemExit("--leaderboard needs --store")
+        print(store.leaderboard(metric=args.metric, ticker=args.ticker, limit=args.top).to_string(index=False))
+        return
+    if not args.csv:
+        raise SystemExit("Provide --csv")
+
     os.makedirs(args.out, exist_ok=True)
     bt = Backtester()
     df = bt.load_csv(args.csv)
@@ -56,8 +87,13 @@ def main():
     else:
         raise SystemExit("Provide --preset or --grid")
 
-    print("Running tuning for", args.ticker, "grid:", grid, "walk:", args.walk)
-    res_df = bt.tune_params(args.ticker, df, grid, signal_generator=strategy_gen, walk_forward_days=args.walk)
+    print("Running tuning for", args.ticker, "grid:", grid, "walk:", args.walk, "search:", args.search)
+    res_df = bt.tune_params(args.ticker, df, grid, signal_generator=strategy_gen, walk_forward_days=args.walk,
+                            n_jobs=args.jobs, walk_forward_bars=args.walk_bars, walk_mode=args.walk_mode,
+                            train_window=args.train_window, search=args.search, budget=args.budget,
+                            time_budget=args.time_budget, metric=args.metric, seed=args.seed,
+                            prune_below=args.prune_below, store=store, robust_resamples=args.robust,
+                            robust_method=args.robust_method)
 
     ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
     out_csv = os.path.join(args.out, f"tuning_{args.ticker}_{ts}.csv")
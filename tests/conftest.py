@@ -0,0 +1,25 @@
+# tests/conftest.py
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _random_walk(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    idx = pd.date_range("2020-01-01", periods=n, freq="D")
+    df = pd.DataFrame({
+        "Open": close,
+        "High": close * (1 + rng.uniform(0, 0.03, n)),
+        "Low": close * (1 - rng.uniform(0, 0.03, n)),
+        "Close": close,
+        "Volume": [1000] * n,
+    }, index=idx)
+    df.index.name = "Datetime"
+    return df
+
+
+@pytest.fixture
+def make_random_walk():
+    """make_random_walk(n=400, seed=0): daily OHLCV random walk with a Datetime index."""
+    return _random_walk
@@ -0,0 +1,32 @@
+# tests/test_allocator.py
+import pandas as pd
+from bot_analisa.risk.portfolio import allocate_portfolio
+
+
+def make_candidates():
+    return pd.DataFrame({
+        "ticker": ["AAA", "BBB", "CCC", "DDD", "EEE"],
+        "entry": [1000.0, 2000.0, 500.0, 1500.0, 100.0],
+        "sl": [950.0, 1900.0, 480.0, 1400.0, 0.0],
+        "score": [0.9, 0.8, 0.7, 0.6, 0.5],
+        "sector": ["bank", "bank", "energy", "energy", "tech"],
+    })
+
+
+def test_allocation_respects_cash_and_slots():
+    res = allocate_portfolio(make_candidates(), cash=30_000_000, account_balance=100_000_000,
+                             max_positions=2, risk_per_trade=0.01)
+    # AAA: 1M risk / 50 = 20000 shares = 20M; BBB: 1M / 100 = 10000 shares = 20M -> only 10M cash left
+    assert res["qty"].tolist()[:2] == [20000, 5000]
+    assert res["cost"].sum() <= 30_000_000
+    assert res["allocated"].sum() == 2
+    assert res.loc[2, "reason"] == "max_positions"
+
+
+def test_allocation_sector_caps():
+    res = allocate_portfolio(make_candidates(), cash=100_000_000, max_positions=10,
+                             sector_caps={"bank": 0.2}, risk_per_trade=0.01)
+    bank_cost = res.loc[res["sector"] == "bank", "cost"].sum()
+    assert bank_cost <= 20_000_000
+    assert res.loc[1, "reason"] == "sector_cap"
+    assert res.loc[2, "allocated"]
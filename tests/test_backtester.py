@@ -22,3 +22,24 @@ def test_basic_backtest():
     assert "total_trades" in result
     assert "winrate" in result
     assert "equity_curve" in result
+
+
+def test_exit_resolution_matches_row_scan(make_random_walk):
+    df = make_random_walk()
+    bt = Backtester()
+    result = bt.run_backtest("TEST", df, signal_params={"tp_atr": 4.0, "sl_atr": 3.0})
+    assert result["total_trades"] > 0
+    statuses = set()
+    for t in result["trades"]:
+        # reference: walk rows from the entry bar, TP checked before SL, END at last close
+        expected = ("END", float(df["Close"].iloc[-1]), str(df.index[-1]))
+        for ts, row in df[df.index >= pd.Timestamp(t["entry_time"])].iterrows():
+            if row["High"] >= t["tp"]:
+                expected = ("TP", t["tp"], str(ts))
+                break
+            if row["Low"] <= t["sl"]:
+                expected = ("SL", t["sl"], str(ts))
+                break
+        assert (t["status"], t["exit"], t["exit_time"]) == expected
+        statuses.add(t["status"])
+    assert {"TP", "SL"} <= statuses
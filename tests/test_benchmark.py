@@ -0,0 +1,27 @@
+# tests/test_benchmark.py
+from bot_analisa.data.synthetic import synthetic_ohlcv
+from scripts.benchmark import compare, run_benchmarks
+
+
+def test_synthetic_bars_are_consistent_and_seeded():
+    df = synthetic_ohlcv(5000, seed=1)
+    assert df.index.is_monotonic_increasing and df.index.name == "Datetime"
+    assert (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+    assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+    assert df["Close"].between(50, 100_000).all()
+    assert synthetic_ohlcv(5000, seed=1).equals(df)
+
+
+def test_run_and_compare_flags_regressions():
+    res = run_benchmarks([300], [2], stages=["indicators.ema", "watcher"], repeat=1, log=None)
+    assert set(res["results"]) == {"indicators.ema@300", "watcher.process_price_tick@2", "watcher.watch_once_cached@2"}
+    assert all("peak_mb" in r for r in res["results"].values())
+
+    base = {"results": {"a@1": {"seconds": 1.0, "peak_mb": 10.0}, "b@1": {"seconds": 0.001}}}
+    cur = {"results": {"a@1": {"seconds": 1.1, "peak_mb": 20.0}, "b@1": {"seconds": 0.003},
+                       "new@1": {"seconds": 5.0}}}
+    rows = {(r["key"], r["metric"]): r for r in compare(base, cur, threshold=0.2)}
+    assert not rows[("a@1", "seconds")]["regressed"]
+    assert rows[("a@1", "peak_mb")]["regressed"]
+    assert not rows[("b@1", "seconds")]["regressed"]   # below min_seconds: noise
+    assert ("new@1", "seconds") not in rows
@@ -0,0 +1,60 @@
+# tests/test_engine.py
+import pandas as pd
+import pytest
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.engine import run_event_backtest
+
+
+def make_bars(rows):
+    idx = pd.date_range("2025-01-01", periods=len(rows), freq="D")
+    df = pd.DataFrame(rows, columns=["Open", "High", "Low", "Close"], index=idx)
+    df["Volume"] = 1000
+    df.index.name = "Datetime"
+    return df
+
+
+def sig(df, i, tp, sl):
+    return {"timestamp": df.index[i], "entry": float(df["Close"].iloc[i]), "tp": tp, "sl": sl, "signal": "BUY"}
+
+
+def test_next_open_entry_and_single_position():
+    df = make_bars([
+        (100, 101, 99, 100),
+        (101, 103, 100, 102),   # entry bar for signal 0
+        (102, 104, 101, 103),   # overlapping signal here is skipped
+        (103, 111, 102, 110),   # TP hit intrabar at 110
+        (110, 111, 109, 110),
+    ])
+    signals = [sig(df, 0, 110.0, 95.0), sig(df, 1, 120.0, 90.0)]
+    res = run_event_backtest("T", df, signals)
+    assert res["total_trades"] == 1
+    assert res["skipped_signals"] == 1
+    t = res["trades"][0]
+    assert t["entry"] == 101.0
+    assert (t["status"], t["exit"], t["exit_time"]) == ("TP", 110.0, str(df.index[3]))
+
+
+def test_gap_through_stop_fills_at_open_with_costs():
+    df = make_bars([
+        (100, 101, 99, 100),
+        (100, 101, 99, 100),    # entry at 100
+        (90, 92, 88, 91),       # gaps below SL=95 -> fill at open 90
+    ])
+    res = run_event_backtest("T", df, [sig(df, 0, 110.0, 95.0)], fee_pct=0.001, slippage_pct=0.001)
+    t = res["trades"][0]
+    assert t["status"] == "SL"
+    assert t["entry"] == pytest.approx(100.1)
+    assert t["exit"] == pytest.approx(89.91)
+    assert t["result"] == pytest.approx(89.91 * 0.999 - 100.1 * 1.001)
+
+
+def test_backtester_event_mode_runs_default_strategy():
+    idx = pd.date_range("2024-01-01", periods=120, freq="D")
+    close = pd.Series(range(120), index=idx, dtype="float64") + 100
+    df = pd.DataFrame({"Open": close, "High": close + 0.5, "Low": close - 0.5, "Close": close, "Volume": 1000})
+    res = Backtester().run_event_backtest("SYN", df)
+    assert res["total_trades"] >= 1
+    # positions never overlap
+    trades = res["trades"]
+    for prev, nxt in zip(trades, trades[1:]):
+        assert pd.Timestamp(nxt["entry_time"]) > pd.Timestamp(prev["exit_time"])
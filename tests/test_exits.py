@@ -0,0 +1,149 @@
+# tests/test_exits.py
+import numpy as np
+import pandas as pd
+
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.kernels import first_hit
+from bot_analisa.indicators.indicators import atr
+from bot_analisa.risk.exits import ExitPolicy, resolve_exit
+from bot_analisa.signals.storage import SignalStorage
+from bot_analisa.signals.watcher import process_policy_tick
+
+
+def reference_exit(high, low, close, atr_values, start, entry, tp, sl, policy):
+    """Bar-by-bar loop of the same rules (exit pos, level, status, partial pos, stop)."""
+    risk = entry - sl
+    be = entry + policy.break_even_r * risk if policy.break_even_r is not None else np.inf
+    part = entry + policy.partial_tp_r * risk if policy.partial_tp_r is not None else np.inf
+    if part >= tp:
+        part = np.inf
+    stop, peak, armed, partial = sl, -np.inf, False, -1
+    for i in range(start, len(high)):
+        if policy.max_bars is not None and i - start >= policy.max_bars:
+            return i - 1, close[i - 1], "TIME", partial, stop
+        stop = sl
+        if policy.trail_atr is not None and peak > stop:
+            stop = peak
+        if armed:
+            stop = max(stop, entry)
+        if partial < 0 and high[i] >= part:
+            partial = i
+        if high[i] >= tp:
+            return i, tp, "TP", partial, stop
+        if low[i] <= stop:
+            status = "SL" if stop <= sl else ("BE" if stop == entry else "TRAIL")
+            return i, stop, status, partial, stop
+        if policy.trail_atr is not None and not np.isnan(atr_values[i]):
+            peak = max(peak, high[i] - policy.trail_atr * atr_values[i])
+        armed = armed or high[i] >= be
+    if policy.max_bars is not None and len(high) - start >= policy.max_bars:
+        return len(high) - 1, close[-1], "TIME", partial, stop
+    return -1, np.nan, "OPEN", partial, None
+
+
+def random_walk(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    high = close * (1 + rng.uniform(0, 0.01, n))
+    low = close * (1 - rng.uniform(0, 0.01, n))
+    idx = pd.date_range("2024-01-01", periods=n, freq="h")
+    return pd.DataFrame({"Open": close, "High": high, "Low": low, "Close": close, "Volume": 1.0}, index=idx)
+
+
+def test_resolve_exit_matches_bar_loop():
+    df = random_walk(600, seed=3)
+    high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+    atr_values = atr(df, period=14).to_numpy()
+    policies = [
+        ExitPolicy(trail_atr=2.0),
+        ExitPolicy(break_even_r=1.0),
+        ExitPolicy(max_bars=25),
+        ExitPolicy(partial_tp_r=1.0, partial_fraction=0.5),
+        ExitPolicy(trail_atr=1.5, break_even_r=0.5, max_bars=200, partial_tp_r=1.5),
+    ]
+    for policy in policies:
+        for start in range(0, 600, 7):
+            entry = close[start]
+            tp, sl = entry * 1.06, entry * 0.97
+            got = resolve_exit(high, low, close, atr_values, start, entry, tp, sl, policy)
+            want = reference_exit(high, low, close, atr_values, start, entry, tp, sl, policy)
+            assert (got.exit_pos, got.status, got.partial_pos) == (want[0], want[2], want[3]), (policy, start)
+            if want[0] >= 0:
+                assert got.exit_level == want[1]
+
+
+def test_policy_without_rules_matches_first_hit():
+    df = random_walk(300, seed=5)
+    high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+    for start in range(0, 280, 11):
+        entry = close[start]
+        tp, sl = entry * 1.03, entry * 0.98
+        res = resolve_exit(high, low, close, None, start, entry, tp, sl, ExitPolicy())
+        assert res.exit_pos == first_hit(high, low, start, tp, sl)
+
+
+def test_from_params_and_backtest_statuses():
+    assert ExitPolicy.from_params({"ema_fast": 9}) is None
+    assert ExitPolicy.from_params({"max_bars": 5}) == ExitPolicy(max_bars=5)
+
+    idx = pd.date_range("2025-01-01", periods=6, freq="D")
+    df = pd.DataFrame({
+        "Open": [100] * 6,
+        "High": [101, 106, 104, 103, 103, 103],
+        "Low": [99, 101, 100.5, 99.5, 102, 102],
+        "Close": [100, 105, 103, 101, 102.5, 102.5],
+        "Volume": [1] * 6,
+    }, index=idx)
+    df.index.name = "Datetime"
+
+    def gen(df, params=None):
+        return [{"timestamp": df.index[0], "entry": 100.0, "tp": 110.0, "sl": 95.0, "signal": "BUY"}]
+
+    bt = Backtester()
+    fixed = bt.run_backtest("T", df, signal_generator=gen)
+    assert fixed["trades"][0]["status"] == "END"
+
+    # +1R (105) reached on bar 1 -> stop at entry from bar 2; bar 3 low 99.5 exits at 100
+    be = bt.run_backtest("T", df, signal_generator=gen, exit_policy=ExitPolicy(break_even_r=1.0))
+    assert be["trades"][0]["status"] == "BE" and be["trades"][0]["exit"] == 100.0
+
+    timed = bt.run_backtest("T", df, signal_generator=gen, exit_policy=ExitPolicy(max_bars=3))
+    assert timed["trades"][0]["status"] == "TIME" and timed["trades"][0]["exit"] == 103.0
+
+    # half closed at +1R (105), rest at break-even
+    part = bt.run_backtest("T", df, signal_generator=gen,
+                           exit_policy=ExitPolicy(break_even_r=1.0, partial_tp_r=1.0, partial_fraction=0.5))
+    assert part["trades"][0]["exit"] == 102.5
+
+
+def test_watcher_uses_policy_stop(tmp_path):
+    storage = SignalStorage(folder=str(tmp_path / "signals"))
+    storage.save_signal_dict({"ticker": "AAA", "entry": 100.0, "tp": 110.0, "sl": 95.0,
+                              "timestamp": "2025-01-01", "reason": "t"})
+    bars = pd.DataFrame({
+        "Datetime": pd.date_range("2025-01-01", periods=3, freq="D"),
+        "Open": [100, 100, 104], "High": [101, 106, 105], "Low": [99, 101, 103],
+        "Close": [100, 105, 104], "Volume": [1, 1, 1],
+    })
+    policy = ExitPolicy(break_even_r=1.0)
+
+    # without the policy 99.8 is still above SL 95; with it the stop sits at entry
+    assert process_policy_tick(storage, "AAA", bars, 101.0, policy) == []
+    updated = process_policy_tick(storage, "AAA", bars, 99.8, policy)
+    assert len(updated) == 1
+    assert storage.list_signals("AAA")["status"].tolist() == ["BE"]
+
+
+def test_watcher_policy_skips_signal_bar(tmp_path):
+    storage = SignalStorage(folder=str(tmp_path / "signals"))
+    storage.save_signal_dict({"ticker": "AAA", "entry": 101.5, "tp": 106.0, "sl": 99.0,
+                              "timestamp": "2025-01-02", "reason": "t"})
+    bars = pd.DataFrame({
+        "Datetime": pd.date_range("2025-01-01", periods=3, freq="D"),
+        "Open": [100, 101, 102], "High": [101, 102, 103], "Low": [99.5, 98, 101],
+        "Close": [100, 101.5, 102], "Volume": [1, 1, 1],
+    })
+
+    # the signal bar's own Low (98) is below SL; like the backtest, only later bars count
+    assert process_policy_tick(storage, "AAA", bars, 102.0, ExitPolicy(max_bars=10)) == []
+    assert storage.list_signals("AAA")["status"].tolist() == ["OPEN"]
@@ -0,0 +1,43 @@
+# tests/test_generate_signals.py
+import numpy as np
+import pandas as pd
+from bot_analisa.cli.generate_signals import run_generation
+from bot_analisa.signals.storage import SignalStorage
+
+
+class FakeProvider:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def fetch_and_save(self, ticker, period="1y", interval="1d", force=False):
+        return None
+
+    def get_historical(self, ticker, period="1y", interval="1d"):
+        return self.frames[ticker].copy()
+
+
+def make_prices(n=80):
+    price = np.linspace(100, 140, n)
+    return pd.DataFrame({
+        "Datetime": pd.date_range("2025-01-01", periods=n, freq="D"),
+        "Open": price - 0.3, "High": price + 0.5, "Low": price - 0.6, "Close": price,
+        "Volume": [1000] * n,
+    })
+
+
+def test_second_run_skips_unchanged_tickers(tmp_path):
+    storage = SignalStorage(folder=str(tmp_path))
+    provider = FakeProvider({"AAA.JK": make_prices(), "BBB.JK": make_prices()})
+
+    first = run_generation(provider, storage, ["AAA.JK", "BBB.JK"])
+    assert first["recomputed"] == 2 and first["skipped"] == 0
+
+    # a new bar arrives for AAA only
+    frame = make_prices(81)
+    provider.frames["AAA.JK"] = frame
+    second = run_generation(provider, storage, ["AAA.JK", "BBB.JK"])
+    assert second["recomputed"] == 1 and second["skipped"] == 1
+    assert storage.get_ticker_state("AAA.JK")["last_bar_ts"] == str(frame["Datetime"].iloc[-1])
+
+    forced = run_generation(provider, storage, ["AAA.JK", "BBB.JK"], force=True)
+    assert forced["recomputed"] == 2
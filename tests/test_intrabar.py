@@ -0,0 +1,60 @@
+# tests/test_intrabar.py
+import pandas as pd
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.intrabar import IntrabarResolver
+from bot_analisa.data.provider import DataProvider
+
+
+def daily_bars():
+    idx = pd.date_range("2025-01-01", periods=4, freq="D")
+    df = pd.DataFrame({
+        "Open": [100, 100, 100, 100],
+        "High": [101, 111, 101, 111],
+        "Low": [99, 89, 99, 89],      # bars 1 and 3 touch both TP 110 and SL 90
+        "Close": [100, 100, 100, 100],
+        "Volume": [1000] * 4,
+    }, index=idx)
+    df.index.name = "Datetime"
+    return df
+
+
+def write_fine(folder, rows):
+    pd.DataFrame(rows, columns=["Datetime", "Open", "High", "Low", "Close", "Volume"]).to_csv(
+        folder / "AAA_15m.csv", index=False)
+
+
+def gen(df, params=None):
+    return [{"timestamp": df.index[0], "entry": 100.0, "tp": 110.0, "sl": 90.0, "signal": "BUY"},
+            {"timestamp": df.index[2], "entry": 100.0, "tp": 110.0, "sl": 90.0, "signal": "BUY"}]
+
+
+def test_ambiguous_bars_resolved_from_finer_cache(tmp_path):
+    write_fine(tmp_path, [
+        # 2025-01-02: SL first, then TP
+        ("2025-01-02 09:00", 100, 100, 89, 95, 10),
+        ("2025-01-02 09:15", 95, 111, 95, 110, 10),
+        # 2025-01-04: TP first
+        ("2025-01-04 09:00", 100, 111, 99, 110, 10),
+        ("2025-01-04 09:15", 110, 110, 89, 90, 10),
+    ])
+    resolver = IntrabarResolver(DataProvider(str(tmp_path)), "AAA", "15m")
+    res = Backtester().run_backtest("AAA", daily_bars(), signal_generator=gen, intrabar=resolver)
+    assert [t["status"] for t in res["trades"]] == ["SL", "TP"]
+    assert [t["exit"] for t in res["trades"]] == [90.0, 110.0]
+    assert res["ambiguous_bars"] == 2 and res["intrabar_resolved"] == 2
+
+    # default behaviour is unchanged without a resolver
+    plain = Backtester().run_backtest("AAA", daily_bars(), signal_generator=gen)
+    assert [t["status"] for t in plain["trades"]] == ["TP", "TP"]
+    assert "intrabar_resolved" not in plain
+
+
+def test_missing_finer_data_keeps_tp_first(tmp_path):
+    write_fine(tmp_path, [("2025-01-04 09:00", 100, 111, 89, 100, 10)])  # still ambiguous
+    resolver = IntrabarResolver(DataProvider(str(tmp_path)), "AAA", "15m")
+    res = Backtester().run_backtest("AAA", daily_bars(), signal_generator=gen, intrabar=resolver)
+    assert [t["status"] for t in res["trades"]] == ["TP", "TP"]
+    assert res["ambiguous_bars"] == 2 and res["intrabar_resolved"] == 0
+    # answers are memoized per bar/level
+    resolver.resolve(pd.Timestamp("2025-01-02"), pd.Timestamp("2025-01-03"), 110.0, 90.0)
+    assert resolver.lookups == 2
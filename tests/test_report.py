@@ -0,0 +1,53 @@
+# tests/test_report.py
+import json
+import numpy as np
+import pandas as pd
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.report import load_report, load_reports, load_summaries, save_report
+
+
+def test_npz_report_roundtrip(tmp_path, make_random_walk):
+    df = make_random_walk()
+    df.index = df.index.tz_localize("Asia/Jakarta")
+    result = Backtester().run_backtest("AAA", df, signal_params={"tp_atr": 4.0, "sl_atr": 3.0})
+    assert isinstance(result["trade_log"]["entry"], np.ndarray)
+
+    save_report(result, str(tmp_path / "report_AAA.json"))
+    summary = json.loads((tmp_path / "report_AAA.json").read_text())
+    assert "trades" not in summary and "equity_curve" not in summary
+    assert summary["trade_count"] == result["total_trades"]
+
+    loaded = load_report(str(tmp_path / "report_AAA.json"))
+    log = loaded["trade_log"]
+    assert log["entry_time"].equals(result["trade_log"]["entry_time"])
+    np.testing.assert_array_equal(log["result"], result["trade_log"]["result"])
+    np.testing.assert_array_equal(log["status"], result["trade_log"]["status"])
+    np.testing.assert_array_equal(loaded["equity_curve"], result["equity_curve"])
+
+
+def test_summary_is_strict_json(tmp_path):
+    # no losing trade -> pf is inf, which must not leak into the JSON as Infinity
+    result = {"ticker": "BBB", "total_trades": 0, "winrate": 0, "pf": float("inf"), "max_dd": 0,
+              "equity_curve": [], "trades": []}
+    save_report(result, str(tmp_path / "report_BBB.json"))
+    text = (tmp_path / "report_BBB.json").read_text()
+    assert "Infinity" not in text
+    assert json.loads(text)["pf"] is None
+
+    save_report(result, str(tmp_path / "full_BBB.json"), fmt="json")
+    assert json.loads((tmp_path / "full_BBB.json").read_text())["pf"] is None
+
+
+def test_load_reports_concatenates_tickers(tmp_path, make_random_walk):
+    bt = Backtester()
+    counts = {}
+    for seed, ticker in enumerate(["AAA", "BBB", "CCC"]):
+        res = bt.run_backtest(ticker, make_random_walk(seed=seed), signal_params={"tp_atr": 4.0, "sl_atr": 3.0})
+        counts[ticker] = res["total_trades"]
+        bt.save_report(res, str(tmp_path / f"report_{ticker}.json"))
+
+    trades = load_reports(str(tmp_path))
+    assert trades.groupby("ticker").size().to_dict() == {t: c for t, c in counts.items() if c}
+    summaries = load_summaries(str(tmp_path))
+    assert sorted(summaries["ticker"]) == ["AAA", "BBB", "CCC"]
+    assert set(pd.unique(trades["status"])) <= {"TP", "SL", "END"}
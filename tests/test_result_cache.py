@@ -0,0 +1,66 @@
+# tests/test_result_cache.py
+import os
+import time
+import numpy as np
+import pandas as pd
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.result_cache import ResultCache
+
+
+def strip(result):
+    return {k: v for k, v in result.items() if k != "trade_log"}
+
+
+def test_cached_result_matches_and_skips_simulation(tmp_path, monkeypatch, make_random_walk):
+    df = make_random_walk(400, seed=4)
+    params = {"tp_atr": 4.0, "sl_atr": 3.0}
+    bt = Backtester(cache=ResultCache(str(tmp_path)))
+    first = bt.run_backtest("AAA", df, signal_params=params)
+    assert bt.cache.misses == 1
+
+    def boom(*a, **k):
+        raise AssertionError("simulated again")
+    monkeypatch.setattr(Backtester, "_simulate_trades", boom)
+    again = bt.run_backtest("AAA", df.copy(), signal_params=dict(params))
+    assert bt.cache.hits == 1
+    assert strip(again) == strip(first)
+    assert again["trade_log"]["entry_time"].equals(first["trade_log"]["entry_time"])
+
+
+def test_cache_misses_on_changed_inputs(tmp_path, make_random_walk):
+    df = make_random_walk(300, seed=5)
+    bt = Backtester(cache=ResultCache(str(tmp_path)))
+    bt.run_backtest("AAA", df)
+    bt.run_backtest("AAA", df, signal_params={"tp_atr": 3.0})
+    changed = df.copy()
+    changed.iloc[-1, changed.columns.get_loc("Close")] *= 1.01
+    bt.run_backtest("AAA", changed)
+    Backtester(strategy_version="v2", cache=bt.cache).run_backtest("AAA", df)
+    bt.run_backtest("AAA", df, use_cache=False)
+    assert bt.cache.hits == 0 and bt.cache.misses == 4
+
+
+def test_infinite_pf_round_trips(tmp_path):
+    idx = pd.date_range("2025-01-01", periods=60, freq="D")
+    up = pd.Series(np.arange(60, dtype=float) + 100, index=idx)
+    df = pd.DataFrame({"Open": up, "High": up + 5, "Low": up - 0.5, "Close": up, "Volume": 1000}, index=idx)
+    bt = Backtester(cache=ResultCache(str(tmp_path)))
+    first = bt.run_backtest("UP", df)
+    assert first["pf"] == float("inf")
+    assert bt.run_backtest("UP", df)["pf"] == float("inf")
+
+
+def test_lru_eviction_by_size(tmp_path, make_random_walk):
+    cache = ResultCache(str(tmp_path), max_bytes=10**9)
+    bt = Backtester(cache=cache)
+    for seed in range(3):
+        bt.run_backtest("T", make_random_walk(300, seed=seed))
+        time.sleep(0.01)
+    entries = sorted(tmp_path.glob("*/*.npz"), key=os.path.getmtime)
+    assert len(entries) == 3
+    # touch the oldest entry via a hit, then shrink the budget to two entries
+    bt.run_backtest("T", make_random_walk(300, seed=0))
+    cache.max_bytes = cache.size() - 1
+    assert cache.evict() == 1
+    remaining = set(tmp_path.glob("*/*.npz"))
+    assert entries[1] not in remaining and entries[0] in remaining
@@ -43,3 +43,70 @@ def test_invalid_inputs():
         compute_tp_sl(0.0, atr=1.0, params={"mode":"atr"})
     with pytest.raises(ValueError):
         compute_position_size(0.0, 100.0, 90.0)
+
+def test_array_versions_match_scalar():
+    import numpy as np
+    from bot_analisa.risk.risk import compute_tp_sl_array, compute_position_size_array, ERR_OK
+
+    rng = np.random.default_rng(7)
+    entries = rng.uniform(50, 10000, 500)
+    atrs = rng.uniform(0.5, 300, 500)
+    params = {"tp_atr_mul": 2.0, "sl_atr_mul": 1.5}
+    tp, sl, err = compute_tp_sl_array(entries, atrs, params)
+    assert (err == ERR_OK).all()
+    qty, qerr = compute_position_size_array(1e8, entries, sl, risk_per_trade=0.01, lot_size=100)
+    assert (qerr == ERR_OK).all()
+    for i in range(len(entries)):
+        s_tp, s_sl = compute_tp_sl(float(entries[i]), atr=float(atrs[i]), params=params)
+        assert tp[i] == pytest.approx(s_tp, abs=1e-8)
+        assert sl[i] == pytest.approx(s_sl, abs=1e-8)
+        assert qty[i] == compute_position_size(1e8, float(entries[i]), s_sl, risk_per_trade=0.01, lot_size=100)
+
+def test_array_versions_flag_invalid_rows():
+    import numpy as np
+    from bot_analisa.risk.risk import (compute_tp_sl_array, compute_position_size_array,
+                                       ERR_OK, ERR_ENTRY, ERR_ATR, ERR_SL)
+
+    tp, sl, err = compute_tp_sl_array([100.0, 0.0, 100.0], [2.0, 2.0, -1.0], {"mode": "atr"})
+    assert list(err) == [ERR_OK, ERR_ENTRY, ERR_ATR]
+    assert np.isnan(tp[1]) and np.isnan(sl[2])
+    # price floor on SL
+    _, sl_floor, _ = compute_tp_sl_array([10.0], [20.0], {"mode": "atr"})
+    assert sl_floor[0] == 0.0
+
+    qty, err = compute_position_size_array(10000.0, [100.0, 100.0, 100.0], [95.0, -1.0, 101.0], lot_size=1)
+    assert list(qty) == [20, 0, 0]
+    assert list(err) == [ERR_OK, ERR_SL, ERR_OK]
+
+def test_tick_snapping_idx_bands():
+    import numpy as np
+    from bot_analisa.risk.ticks import tick_size, snap_to_tick, snap_tp_sl
+
+    assert list(tick_size([150, 200, 499, 500, 1999, 2000, 4990, 5000, 9000])) == [1, 2, 2, 5, 5, 10, 10, 25, 25]
+    assert list(snap_to_tick([201.0, 1234.0, 7010.0], "down")) == [200.0, 1230.0, 7000.0]
+    assert list(snap_to_tick([201.0, 1231.0, 7010.0], "up")) == [202.0, 1235.0, 7025.0]
+    # rounding up across a band boundary lands on the boundary, which is valid in both bands
+    assert snap_to_tick([499.5], "up")[0] == 500.0
+    tp, sl = snap_tp_sl(np.array([1044.7]), np.array([961.2]))
+    assert tp[0] == 1040.0 and sl[0] == 965.0
+
+def test_compute_tp_sl_tick_snap_and_default_lot():
+    tp, sl = compute_tp_sl(1000.0, atr=22.3, params={"mode": "atr", "tick_snap": True})
+    assert (tp, sl) == (1040.0, 970.0)
+    # default lot size is one IDX lot (100 shares): floor(100/5)=20 shares -> 0 lots
+    assert compute_position_size(10000.0, entry_price=100.0, sl_price=95.0) == 0
+    assert compute_position_size(100000.0, entry_price=100.0, sl_price=95.0) == 200
+
+def test_tick_snap_never_collapses_onto_entry():
+    from bot_analisa.risk.risk import compute_tp_sl_array
+    from bot_analisa.risk.ticks import snap_tp_sl
+
+    # small ATR on a low price: raw 100.6/99.55 would snap to 100/100
+    assert compute_tp_sl(100.0, atr=0.3, params={"tick_snap": True}) == (101.0, 99.0)
+    assert compute_tp_sl(1000.0, atr=1.0, params={"tick_snap": True}) == (1005.0, 995.0)
+    assert compute_tp_sl(52.0, atr=0.2, params={"tick_snap": True}) == (53.0, 51.0)
+    tp, sl, _ = compute_tp_sl_array([100.0, 1000.0], atr=[0.3, 22.3], params={"mode": "atr", "tick_snap": True})
+    assert list(tp) == [101.0, 1040.0] and list(sl) == [99.0, 970.0]
+    # one tick below a band boundary uses the lower band's tick
+    tp, sl = snap_tp_sl([500.5], [499.9], entry=[500.0])
+    assert tp[0] == 505.0 and sl[0] == 498.0
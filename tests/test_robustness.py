@@ -0,0 +1,46 @@
+# tests/test_robustness.py
+import time
+import numpy as np
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.kernels import trade_metrics
+from bot_analisa.backtest.robustness import path_metrics, resample_paths, robustness
+
+
+def test_path_metrics_match_trade_metrics():
+    rng = np.random.default_rng(3)
+    paths = rng.normal(0.1, 1.0, size=(50, 40))
+    m = path_metrics(paths)
+    for i in (0, 17, 49):
+        ref = trade_metrics(paths[i])
+        assert np.isclose(m["pf"][i], ref["pf"])
+        assert np.isclose(m["max_dd"][i], ref["max_dd"])
+    np.testing.assert_allclose(m["expectancy"], paths.mean(axis=1))
+
+
+def test_shuffle_keeps_pf_and_varies_drawdown():
+    pnl = np.array([5.0, -3.0, 2.0, -1.0, 4.0, -6.0, 1.0, 3.0])
+    paths = resample_paths(pnl, 200, method="shuffle", rng=np.random.default_rng(0))
+    assert np.allclose(np.sort(paths, axis=1), np.sort(pnl))
+    stats = robustness(pnl, 2000, method="shuffle")
+    assert stats["pf_lo"] == stats["pf_hi"]
+    assert stats["max_dd_lo"] < stats["max_dd_hi"]
+
+
+def test_bootstrap_interval_and_speed():
+    pnl = np.random.default_rng(1).normal(0.2, 1.0, size=300)
+    t0 = time.perf_counter()
+    stats = robustness(pnl, 10_000, seed=0)
+    assert time.perf_counter() - t0 < 1.0
+    realised = trade_metrics(pnl)
+    assert stats["pf_lo"] < realised["pf"] < stats["pf_hi"]
+    assert stats["expectancy_lo"] < pnl.mean() < stats["expectancy_hi"]
+    assert stats == robustness(pnl, 10_000, seed=0)
+
+
+def test_tune_params_ranks_by_lower_bound(make_random_walk):
+    df = make_random_walk(600, seed=2)
+    grid = {"tp_atr": [2.0, 4.0], "sl_atr": [1.0, 3.0]}
+    res = Backtester().tune_params("SYN", df, grid, robust_resamples=500)
+    assert {"pf_lo", "pf_hi", "max_dd_hi", "expectancy_lo"} <= set(res.columns)
+    traded = res[res["total_trades"] > 1]
+    assert (traded["pf_lo"] <= traded["pf_hi"]).all()
@@ -0,0 +1,44 @@
+# tests/test_search.py
+import pandas as pd
+from bot_analisa.backtest.backtester import Backtester
+
+GRID = {"ema_fast": [5, 9, 12], "ema_slow": [21, 30], "tp_atr": [1.0, 2.0, 3.0]}
+
+
+def test_random_and_bayes_respect_budget(make_random_walk):
+    df = make_random_walk(600, seed=2)
+    bt = Backtester()
+    rnd = bt.tune_params("S", df, GRID, search="random", budget=5, seed=1)
+    assert len(rnd) == 5
+    assert len(rnd.drop_duplicates(subset=list(GRID))) == 5
+    bayes = bt.tune_params("S", df, GRID, search="bayes", budget=8, seed=1)
+    assert len(bayes) == 8
+    assert len(bayes.drop_duplicates(subset=list(GRID))) == 8
+
+
+def test_successive_halving_promotes_best_configs(make_random_walk):
+    df = make_random_walk(600, seed=2)
+    res = Backtester().tune_params("S", df, GRID, search="halving")
+    first = res[res["rung"] == 0]
+    last = res[res["rung"] == res["rung"].max()]
+    assert len(first) == 18
+    assert len(last) < len(first)
+    assert (last["bars"] == len(df)).all()
+
+
+def test_time_budget_and_pruning(make_random_walk):
+    df = make_random_walk(600, seed=2)
+    bt = Backtester()
+    assert bt.tune_params("S", df, GRID, time_budget=0).empty
+    res = bt.tune_params("S", df, GRID, prune_below=1e9)
+    assert len(res) == 18 and res["pruned"].all()
+    # probe-window numbers never sit in the full-run columns
+    assert res[["total_trades", "pf", "max_dd"]].isna().all().all()
+    assert res["probe_total_trades"].notna().all() and (res["probe_bars"] == len(df) // 4).all()
+
+    mixed = bt.tune_params("S", df, GRID, prune_below=0.2)
+    kept = mixed[~mixed["pruned"]]
+    assert 0 < len(kept) < 18
+    full = bt.tune_params("S", df, GRID).set_index(list(GRID))
+    kept = kept.set_index(list(GRID))
+    pd.testing.assert_series_equal(kept["pf"], full.loc[kept.index, "pf"], check_dtype=False)
@@ -0,0 +1,90 @@
+# tests/test_shard_merge.py
+from bot_analisa.cli.generate_signals import build_signal_id, parse_shard, select_shard, shard_db_name
+from bot_analisa.cli.merge_signals import merge_shards
+from bot_analisa.signals.storage import SignalStorage
+
+
+def test_shards_partition_tickers():
+    tickers = [f"T{i}.JK" for i in range(50)]
+    parts = [select_shard(tickers, i, 4) for i in range(4)]
+    # every ticker lands in exactly one shard, and the assignment is stable
+    assert sorted(t for part in parts for t in part) == sorted(tickers)
+    assert parts == [select_shard(tickers, i, 4) for i in range(4)]
+    assert parse_shard("1/4") == (1, 4)
+
+
+def _signal(ticker, ts):
+    return {
+        "id": build_signal_id(ticker, ts, "v1", "BUY"),
+        "ticker": ticker, "timestamp": ts, "entry_price": 100.0, "tp": 110.0, "sl": 95.0,
+        "signal": "BUY", "status": "OPEN", "strategy_version": "v1",
+    }
+
+
+def test_merge_shards_dedups_by_signal_id(tmp_path):
+    folder = str(tmp_path)
+    s0 = SignalStorage(folder=folder, db_name=shard_db_name(0, 2))
+    s1 = SignalStorage(folder=folder, db_name=shard_db_name(1, 2))
+    s0.save_signal_dict(_signal("AAA.JK", "2025-01-02 00:00:00+00:00"))
+    s1.save_signal_dict(_signal("BBB.JK", "2025-01-02 00:00:00+00:00"))
+    # same signal present in both shards (e.g. re-run after re-sharding)
+    s1.save_signal_dict(_signal("AAA.JK", "2025-01-02 00:00:00+00:00"))
+
+    res = merge_shards(folder)
+    assert res["shard_files"] == 2
+    assert res["inserted_rows"] == 2
+    assert res["ignored_rows"] == 1
+
+    again = merge_shards(folder)
+    assert again["inserted_rows"] == 0
+    assert len(SignalStorage(folder=folder).list_signals()) == 2
+
+
+class _StaticProvider:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def fetch_and_save(self, ticker, period="1y", interval="1d", force=False):
+        return None
+
+    def get_historical(self, ticker, period="1y", interval="1d"):
+        return self.frame.copy()
+
+
+def test_merge_keeps_ticker_state_of_removed_shards(tmp_path):
+    from bot_analisa.cli.generate_signals import run_generation
+    from bot_analisa.data.synthetic import synthetic_ohlcv
+
+    folder = str(tmp_path)
+    provider = _StaticProvider(synthetic_ohlcv(120, seed=2, freq="D").reset_index())
+    shard = SignalStorage(folder=folder, db_name=shard_db_name(0, 1))
+    assert run_generation(provider, shard, ["AAA.JK"])["recomputed"] == 1
+    shard.close()
+
+    res = merge_shards(folder, remove=True)
+    assert res["ticker_states"] == 1
+    assert not (tmp_path / shard_db_name(0, 1)).exists()
+
+    # next sharded run starts from an empty shard db but finds the state in signals.db
+    canonical = SignalStorage(folder=folder)
+    fresh = SignalStorage(folder=folder, db_name=shard_db_name(0, 1))
+    again = run_generation(provider, fresh, ["AAA.JK"], state_fallback=canonical)
+    assert again["skipped"] == 1
+
+
+def test_merge_rows_keeps_epoch_ns_columns(tmp_path):
+    shard = SignalStorage(folder=str(tmp_path), db_name=shard_db_name(0, 1))
+    shard.save_signal_dict({**_signal("AAA.JK", "2025-01-02T09:00:00+07:00"), "updated_at": "2025-01-03T00:00:00Z"})
+    exported = shard.export_rows()
+    assert exported[0]["timestamp_ns"] == 1735783200 * 10**9
+
+    merge_shards(str(tmp_path))
+    canonical = SignalStorage(folder=str(tmp_path))
+    assert canonical.export_rows()[0]["timestamp_ns"] == exported[0]["timestamp_ns"]
+    assert canonical.export_rows()[0]["updated_at_ns"] == exported[0]["updated_at_ns"]
+    assert len(canonical.list_signals(since="2025-01-02", until="2025-01-03")) == 1
+
+    # rows without the ns columns get them derived from the text timestamps
+    counts = canonical.merge_rows([{**_signal("BBB.JK", "2025-01-05"), "status_info": "", "reason": "", "updated_at": ""}])
+    assert counts == {"inserted": 1, "ignored": 0}
+    assert len(canonical.list_signals(since="2025-01-05")) == 1
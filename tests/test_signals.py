@@ -52,3 +52,105 @@ def test_add_and_update_signal(tmp_path):
     assert ok
     df2 = storage.list_signals("TEST.JK")
     assert df2.iloc[-1]["status"] == "TP"
+
+
+def test_save_signals_many_counts_and_migration(tmp_path):
+    from bot_analisa.cli.migrate_signals import migrate_folder
+
+    storage = SignalStorage(folder=str(tmp_path))
+    rows = [{"id": f"s{i}", "ticker": "AAA", "entry": 100 + i, "tp": 110, "sl": 95,
+             "timestamp": f"2025-01-0{i + 1}"} for i in range(5)]
+    bad = [{"ticker": "AAA", "entry": "x", "tp": 1, "sl": 1}, {"ticker": "AAA", "tp": 1, "sl": 1}]
+    assert storage.save_signals_many(rows + bad, batch_size=2) == {"inserted": 5, "ignored": 0, "invalid": 2}
+    assert storage.save_signals_many(rows[:3]) == {"inserted": 0, "ignored": 3, "invalid": 0}
+    assert storage.list_signals("AAA")["id"].tolist() == [f"s{i}" for i in range(5)]
+
+    pd.DataFrame([{"ticker": "BBB", "entry_price": 50, "tp": 55, "sl": 45, "timestamp": "2025-01-01"},
+                  {"ticker": "BBB", "entry_price": 51, "tp": 56, "sl": 46, "timestamp": "2025-01-02"}]
+                 ).to_csv(tmp_path / "BBB.csv", index=False)
+    res = migrate_folder(str(tmp_path))
+    assert res["imported_rows"] == 2 and res["inserted_rows"] == 2
+    assert (storage.list_signals("BBB")["id"] != "None").all()
+
+
+def _child_insert(folder):
+    SignalStorage(folder=folder).save_signal_dict(
+        {"id": "child", "ticker": "CCC", "entry": 10, "tp": 11, "sl": 9, "timestamp": "2025-01-01"})
+
+
+def test_transaction_groups_writes_and_connections_are_reused(tmp_path):
+    import multiprocessing
+    import threading
+    import pytest
+
+    storage = SignalStorage(folder=str(tmp_path))
+    conn = storage._connect()
+    assert storage._connect() is conn
+
+    with storage.transaction():
+        storage.save_signal_dict({"id": "a", "ticker": "AAA", "entry": 10, "tp": 11, "sl": 9})
+        storage.update_signal_status("AAA", "a", "TP", "x")
+        assert conn.in_transaction
+    assert not conn.in_transaction
+    assert storage.list_signals("AAA")["status"].tolist() == ["TP"]
+
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.save_signal_dict({"id": "b", "ticker": "AAA", "entry": 10, "tp": 11, "sl": 9})
+            raise RuntimeError("boom")
+    assert storage.list_signals("AAA")["id"].tolist() == ["a"]
+
+    # other threads and processes get their own connection to the same WAL db
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(storage._connect() is not conn and len(storage.list_signals("AAA"))))
+    t.start()
+    t.join()
+    assert seen == [1]
+    proc = multiprocessing.get_context("spawn").Process(target=_child_insert, args=(str(tmp_path),))
+    proc.start()
+    proc.join()
+    assert proc.exitcode == 0
+    assert storage.list_signals("CCC")["id"].tolist() == ["child"]
+
+    storage.close()
+    assert len(storage.list_signals("AAA")) == 1
+
+
+def test_epoch_ns_migration_and_time_range_queries(tmp_path):
+    import sqlite3
+    import pytest
+
+    # db written by the text-only schema
+    legacy = sqlite3.connect(tmp_path / "signals.db")
+    legacy.execute("""CREATE TABLE signals (id TEXT PRIMARY KEY, ticker TEXT NOT NULL, timestamp TEXT NOT NULL,
+        entry_price REAL NOT NULL, tp REAL NOT NULL, sl REAL NOT NULL, signal TEXT NOT NULL, status TEXT NOT NULL,
+        status_info TEXT, strategy_version TEXT, reason TEXT, updated_at TEXT)""")
+    rows = [
+        ("late", "2025-01-01 18:00:00", "v1"),               # naive -> UTC
+        ("early", "2025-01-02T00:00:00+07:00", "v1"),        # 2025-01-01 17:00 UTC, sorts after "late" as text
+        ("old", "2024-11-01 00:00:00+00:00", "v2"),
+        ("junk", "not a time", "v1"),
+    ]
+    legacy.executemany("INSERT INTO signals VALUES (?, 'AAA', ?, 1, 2, 0.5, 'BUY', 'OPEN', '', ?, '', '')",
+                       [(i, ts, v) for i, ts, v in rows])
+    legacy.commit()
+    legacy.close()
+
+    storage = SignalStorage(folder=str(tmp_path))
+    conn = storage._connect()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+    ns = dict(conn.execute("SELECT id, timestamp_ns FROM signals").fetchall())
+    assert ns["early"] == pd.Timestamp("2025-01-01 17:00", tz="UTC").value and ns["junk"] is None
+
+    assert storage.list_signals(since="2025-01-01")["id"].tolist() == ["early", "late"]
+    assert storage.list_signals(since="2025-01-01", until="2025-01-01 17:30")["id"].tolist() == ["early"]
+    assert storage.list_signals(strategy_version="v2")["id"].tolist() == ["old"]
+    with pytest.raises(ValueError):
+        storage.list_signals(since="yesterday-ish")
+
+    # new rows and status updates carry the numeric columns too
+    storage.save_signal_dict({"id": "new", "ticker": "AAA", "entry": 1, "tp": 2, "sl": 0.5,
+                              "timestamp": pd.Timestamp("2025-02-01", tz="Asia/Jakarta")})
+    storage.update_statuses_many([("new", "TP", "")])
+    row = conn.execute("SELECT timestamp_ns, updated_at_ns FROM signals WHERE id = 'new'").fetchone()
+    assert row[0] == pd.Timestamp("2025-01-31 17:00", tz="UTC").value and row[1] is not None
@@ -31,3 +31,13 @@ def test_strategy_buy_signal():
     assert s["signal"] == "BUY"
     assert "tp" in s and "sl" in s
     assert s["entry"] > 0
+
+def test_strategy_snap_ticks():
+    from bot_analisa.risk.ticks import snap_to_tick
+    df = make_synthetic() * 10  # prices 1000..1200 -> tick 5
+    signals = generate_signals(df, {"snap_ticks": True})
+    assert signals
+    for s in signals:
+        assert s["tp"] == snap_to_tick([s["tp"]])[0]
+        assert s["sl"] == snap_to_tick([s["sl"]])[0]
+        assert s["sl"] < s["entry"] < s["tp"]
@@ -0,0 +1,74 @@
+# tests/test_streaming.py
+import numpy as np
+import pandas as pd
+import pytest
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.indicators.indicators import atr, ema, sma
+from bot_analisa.indicators.streaming import StreamingATR, StreamingEMA, StreamingSMA
+
+
+def make_csv(path, n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = (1000 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))).round(0)
+    df = pd.DataFrame({
+        "Datetime": pd.date_range("2024-01-01", periods=n, freq="min"),
+        "Open": close,
+        "High": close + rng.uniform(0, 5, n).round(0),
+        "Low": close - rng.uniform(0, 5, n).round(0),
+        "Close": close,
+        "Volume": 1,
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+@pytest.mark.parametrize("chunk", [1, 13, 500])
+def test_streaming_indicators_are_bit_identical(chunk):
+    rng = np.random.default_rng(1)
+    close = pd.Series(1000 * np.exp(np.cumsum(rng.normal(0, 0.02, 800))))
+    close.iloc[[3, 4, 200]] = np.nan
+    df = pd.DataFrame({"High": close * 1.01, "Low": close * 0.99, "Close": close})
+    s, e, a = StreamingSMA(50), StreamingEMA(21), StreamingATR(14)
+    got_s, got_e, got_a = [], [], []
+    for start in range(0, len(df), chunk):
+        block = df.iloc[start:start + chunk]
+        got_s.append(s.update(block["Close"]))
+        got_e.append(e.update(block["Close"]))
+        got_a.append(a.update(block["High"], block["Low"], block["Close"]))
+    np.testing.assert_array_equal(np.concatenate(got_s), sma(df["Close"], 50).to_numpy())
+    np.testing.assert_array_equal(np.concatenate(got_e), ema(df["Close"], 21).to_numpy())
+    np.testing.assert_array_equal(np.concatenate(got_a), atr(df, 14).to_numpy())
+
+
+@pytest.mark.parametrize("params", [None, {"tp_atr": 4.0, "sl_atr": 3.0, "permissive_fallback": False},
+                                    {"tp_atr": 0.3, "sl_atr": 0.3, "snap_ticks": True}])
+def test_chunked_backtest_matches_in_memory(tmp_path, params):
+    path = str(tmp_path / "X_1m.csv")
+    make_csv(path)
+    bt = Backtester()
+    ref = bt.run_backtest("X", bt.load_csv(path), signal_params=params)
+    assert ref["total_trades"] > 0
+    for chunk in (97, 1000):
+        got = bt.run_backtest_csv("X", path, signal_params=params, chunk_size=chunk)
+        for key in ("total_trades", "winrate", "pf", "max_dd", "equity_curve", "trades"):
+            assert got[key] == ref[key]
+
+
+def test_chunked_backtest_rejects_unsorted_csv(tmp_path):
+    path = str(tmp_path / "X.csv")
+    df = make_csv(path, n=200)
+    df.iloc[::-1].to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        Backtester().run_backtest_csv("X", path, chunk_size=50)
+
+
+def test_trade_blocks_are_yielded_per_chunk_in_signal_order(tmp_path):
+    from bot_analisa.backtest.streaming import iter_trade_blocks, stream_trades
+    path = str(tmp_path / "X_1m.csv")
+    make_csv(path)
+    blocks = list(iter_trade_blocks(path, chunk_size=97))
+    assert len(blocks) > 10
+    entry_pos = [p for block in blocks for p in block["entry_pos"]]
+    assert entry_pos == sorted(entry_pos)
+    assert entry_pos == stream_trades(path, chunk_size=1000)["entry_pos"]
+
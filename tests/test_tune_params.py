@@ -25,3 +25,124 @@ def test_tune_params_basic(tmp_path):
     assert len(res) == 1
     # has pf/winrate or total_trades columns
     assert any(col in res.columns for col in ["winrate", "total_trades", "avg_winrate"])
+
+def test_tune_params_parallel_matches_serial():
+    df = make_synthetic_df()
+    df.index = df.index.tz_localize("UTC")
+    bt = Backtester()
+    grid = {"ema_fast": [5, 9], "ema_slow": [21, 30], "tp_atr": [1.0, 2.0]}
+    serial = bt.tune_params("SYN", df, grid)
+    parallel = bt.tune_params("SYN", df, grid, n_jobs=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+def test_tune_params_computes_each_indicator_once(monkeypatch):
+    import bot_analisa.backtest.backtester as backtester_mod
+    calls = []
+    real_atr = backtester_mod.atr
+    def counting_atr(df, period=14):
+        calls.append(period)
+        return real_atr(df, period=period)
+    monkeypatch.setattr(backtester_mod, "atr", counting_atr)
+
+    df = make_synthetic_df()
+    grid = {"atr_period": [10, 14], "tp_atr": [1.0, 2.0, 3.0], "sl_atr": [1.0, 1.5]}
+    res = Backtester().tune_params("SYN", df, grid)
+    assert len(res) == 12
+    assert sorted(calls) == [10, 14]
+    # rows stay in grid order
+    assert res[["atr_period", "tp_atr", "sl_atr"]].iloc[1].tolist() == [10, 1.0, 1.5]
+
+def test_tune_params_store_resumes(tmp_path, monkeypatch):
+    from bot_analisa.backtest.tuning_store import TuningStore
+    store = TuningStore(str(tmp_path / "tuning.db"))
+    df = make_synthetic_df()
+    bt = Backtester()
+    grid = {"ema_fast": [5, 9], "tp_atr": [1.0, 2.0]}
+    first = bt.tune_params("SYN", df, {"ema_fast": [5], "tp_atr": [1.0, 2.0]}, store=store)
+    assert len(first) == 2
+
+    evaluated = []
+    real = Backtester._evaluate_params
+    def counting(self, ticker, df, params, *args, **kwargs):
+        evaluated.append(dict(params))
+        return real(self, ticker, df, params, *args, **kwargs)
+    monkeypatch.setattr(Backtester, "_evaluate_params", counting)
+
+    resumed = bt.tune_params("SYN", df, grid, store=store)
+    # only the two combos missing from the first run are evaluated
+    assert evaluated == [{"ema_fast": 9, "tp_atr": 1.0}, {"ema_fast": 9, "tp_atr": 2.0}]
+    pd.testing.assert_frame_equal(resumed, Backtester().tune_params("SYN", df, grid))
+
+    # new data -> different fingerprint -> nothing reused
+    evaluated.clear()
+    bt.tune_params("SYN", df.iloc[:-1], grid, store=store)
+    assert len(evaluated) == 4
+
+    board = store.leaderboard(metric="pf", ticker="SYN")
+    assert len(board) == 8
+    assert {"ticker", "code_version", "pf", "ema_fast"} <= set(board.columns)
+
+def test_shared_frame_is_read_only_and_keeps_dtypes():
+    import pytest
+    from bot_analisa.backtest.parallel import attach_frame, share_frame, shareable
+
+    df = make_synthetic_df()
+    shm, spec = share_frame(df)
+    try:
+        view_shm, view = attach_frame(spec)
+        pd.testing.assert_frame_equal(view, df, check_freq=False)
+        with pytest.raises(ValueError):
+            view["Close"].to_numpy()[0] = 0.0
+        view_shm.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    labelled = df.assign(sector="bank")
+    assert not shareable(labelled) and not shareable(df.reset_index())
+    with pytest.raises(ValueError):
+        share_frame(labelled)
+
+def test_tune_params_parallel_reuses_one_pool(monkeypatch):
+    import bot_analisa.backtest.backtester as backtester_mod
+    created = []
+    real = backtester_mod.SharedPool
+    def counting(*args, **kwargs):
+        created.append(1)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(backtester_mod, "SharedPool", counting)
+
+    df = make_synthetic_df()
+    bt = Backtester()
+    grid = {"ema_fast": [3, 5, 9], "ema_slow": [21, 30], "tp_atr": [1.0, 2.0]}
+    serial = bt.tune_params("SYN", df, grid, search="halving")
+    parallel = bt.tune_params("SYN", df, grid, search="halving", n_jobs=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert len(created) == 1
+
+    # a non-numeric column the generator could read: stays serial instead of dropping it
+    created.clear()
+    labelled = df.assign(sector="bank")
+    pd.testing.assert_frame_equal(bt.tune_params("SYN", labelled, grid, n_jobs=2), bt.tune_params("SYN", labelled, grid))
+    assert created == []
+
+def test_tuning_store_round_trips_rows_exactly(tmp_path):
+    import json
+    import numpy as np
+    import pytest
+    from bot_analisa.backtest.tuning_store import TuningStore
+
+    store = TuningStore(str(tmp_path / "tuning.db"))
+    row = {"ema_fast": np.int64(5), "total_trades": 3, "pf": float("inf"), "max_dd": np.float64(1.5),
+           "winrate": np.nan, "pruned": None}
+    store.save("SYN", "fp", "h1", "v", {"ema_fast": 5}, row)
+    raw = store._connect().execute("SELECT result FROM tuning_results").fetchone()[0]
+    json.loads(raw, parse_constant=lambda c: pytest.fail(f"non-standard JSON constant {c}"))
+
+    back = store.load("SYN", "fp", "v", ["h1"])["h1"]
+    assert back["pf"] == float("inf") and np.isnan(back["winrate"])
+    assert type(back["ema_fast"]) is int and type(back["max_dd"]) is float and back["pruned"] is None
+    # one connection per store, not one per call
+    assert store._connect() is store._connect()
+    with pytest.raises(TypeError):
+        store.save("SYN", "fp", "h2", "v", {}, {"when": pd.Timestamp("2025-01-01")})
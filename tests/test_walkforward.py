@@ -0,0 +1,45 @@
+# tests/test_walkforward.py
+import pandas as pd
+from bot_analisa.backtest.backtester import Backtester
+from bot_analisa.backtest.walkforward import fold_ranges
+
+
+def test_fold_ranges_anchored_rolling_and_bars():
+    idx = pd.date_range("2023-01-01", periods=100, freq="D")
+    anchored = fold_ranges(idx, 20, unit="days")
+    assert anchored[0] == (0, 20, 20, 40)
+    assert all(f[0] == 0 for f in anchored)
+    rolling = fold_ranges(idx, 20, unit="days", mode="rolling", train_window=10)
+    assert rolling[1] == (30, 40, 40, 60)
+    bars = fold_ranges(idx, 25, unit="bars")
+    assert bars == [(0, 25, 25, 50), (0, 50, 50, 75), (0, 75, 75, 100)]
+
+
+def test_walk_forward_assigns_full_series_trades_to_folds(make_random_walk):
+    df = make_random_walk(300, seed=1)
+    bt = Backtester()
+    params = {"tp_atr": 1.5}
+    folds = bt.walk_forward("WF", df, params, window=50, unit="bars", mode="rolling")
+    full = bt.run_backtest("WF", df, signal_params=params)
+    entries = pd.to_datetime([t["entry_time"] for t in full["trades"]])
+    for _, f in folds.iterrows():
+        in_val = [t for t, e in zip(full["trades"], entries) if f["val_start"] <= e <= f["val_end"]]
+        assert f["val_trades"] == len(in_val)
+        if in_val:
+            wins = sum(1 for t in in_val if t["result"] > 0)
+            assert f["val_winrate"] == wins / len(in_val)
+
+    res = bt.tune_params("WF", df, {"tp_atr": [1.5, 2.0]}, walk_forward_bars=50, walk_mode="rolling")
+    assert res.loc[0, "total_val_trades"] == folds["val_trades"].sum()
+
+
+def test_walk_forward_rows_apply_exit_keys(make_random_walk):
+    df = make_random_walk(300, seed=1)
+    bt = Backtester()
+    grid = {"max_bars": [None, 3], "trail_atr": [None, 1.0]}
+    res = bt.tune_params("WF", df, grid, walk_forward_bars=100)
+    # each exit policy resolves different exits, so the fold metrics must differ
+    assert len(res[["avg_pf", "avg_winrate"]].round(6).drop_duplicates()) > 1
+    plain = bt.walk_forward("WF", df, {}, window=100, unit="bars")
+    timed = bt.walk_forward("WF", df, {"max_bars": 3}, window=100, unit="bars")
+    assert not plain[["val_winrate", "val_pf"]].equals(timed[["val_winrate", "val_pf"]])
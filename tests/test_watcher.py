@@ -43,3 +43,79 @@ def test_simulate_backfill_hits(tmp_path):
     # ensure the storage shows the updated status
     df = storage.list_signals("ABC")
     assert any(df["status"] == "TP")
+
+
+def test_watch_once_flushes_all_transitions_once(tmp_path):
+    from bot_analisa.signals.watcher import watch_once
+
+    storage = SignalStorage(folder=str(tmp_path / "signals"))
+    storage.save_signals_many([
+        {"id": "a1", "ticker": "AAA", "entry": 100.0, "tp": 105.0, "sl": 95.0},
+        {"id": "a2", "ticker": "AAA", "entry": 100.0, "tp": 120.0, "sl": 90.0},
+        {"id": "b1", "ticker": "BBB", "entry": 50.0, "tp": 55.0, "sl": 45.0},
+    ])
+    calls = []
+    original = storage.update_statuses_many
+    storage.update_statuses_many = lambda transitions: calls.append(list(transitions)) or original(calls[-1])
+
+    res = watch_once(FakeProvider({"AAA": 106.0, "BBB": 44.0}), storage)
+    assert res == {"AAA": ["a1"], "BBB": ["b1"]}
+    assert len(calls) == 1 and len(calls[0]) == 2
+    status = dict(zip(storage.list_signals()["id"], storage.list_signals()["status"]))
+    assert status == {"a1": "TP", "a2": "OPEN", "b1": "SL"}
+
+
+def test_update_statuses_many_only_closes_open_rows(tmp_path):
+    storage = SignalStorage(folder=str(tmp_path / "signals"))
+    storage.save_signal_dict({"id": "x", "ticker": "AAA", "entry": 100.0, "tp": 105.0, "sl": 95.0})
+    other = SignalStorage(folder=str(tmp_path / "signals"))
+
+    assert storage.update_statuses_many([("x", "TP", "first")]) == ["x"]
+    # a second watcher acting on a stale view does not overwrite the close
+    assert other.update_statuses_many([("x", "SL", "second"), ("missing", "TP", "")]) == []
+    row = storage.list_signals("AAA").iloc[0]
+    assert (row["status"], row["status_info"]) == ("TP", "first")
+
+
+def test_open_signal_cache_reloads_only_on_outside_changes(tmp_path):
+    from bot_analisa.signals.watcher import OpenSignalCache, watch_once
+
+    folder = str(tmp_path / "signals")
+    storage = SignalStorage(folder=folder)
+    storage.save_signals_many([
+        {"id": "a1", "ticker": "AAA", "entry": 100.0, "tp": 105.0, "sl": 95.0},
+        {"id": "a2", "ticker": "AAA", "entry": 100.0, "tp": 120.0, "sl": 90.0},
+    ])
+    cache = OpenSignalCache(storage)
+    provider = FakeProvider({"AAA": 100.0, "BBB": 100.0})
+
+    assert watch_once(provider, storage, cache=cache) == {}
+    assert watch_once(provider, storage, cache=cache) == {}
+    assert cache.reloads == 1
+
+    # our own close is patched into the cache without a reload
+    provider.price_map["AAA"] = 106.0
+    assert watch_once(provider, storage, cache=cache) == {"AAA": ["a1"]}
+    assert cache.reloads == 1 and cache.get("AAA")["id"].tolist() == ["a2"]
+
+    # another process (here: another connection) adds a signal -> reload picks it up
+    SignalStorage(folder=folder).save_signal_dict({"id": "b1", "ticker": "BBB", "entry": 50.0, "tp": 55.0, "sl": 45.0})
+    provider.price_map["BBB"] = 56.0
+    assert watch_once(provider, storage, cache=cache) == {"BBB": ["b1"]}
+    assert cache.reloads == 2
+
+
+def test_watch_once_keeps_other_tickers_when_one_price_fails(tmp_path):
+    from bot_analisa.signals.watcher import watch_once
+
+    storage = SignalStorage(folder=str(tmp_path / "signals"))
+    storage.save_signals_many([
+        {"id": "a1", "ticker": "AAA", "entry": 100.0, "tp": 105.0, "sl": 95.0},
+        {"id": "b1", "ticker": "BBB", "entry": 50.0, "tp": 55.0, "sl": 45.0},
+    ])
+
+    # no price for AAA: get_last_price raises KeyError
+    res = watch_once(FakeProvider({"BBB": 44.0}), storage)
+    assert res == {"BBB": ["b1"]}
+    status = dict(zip(storage.list_signals()["id"], storage.list_signals()["status"]))
+    assert status == {"a1": "OPEN", "b1": "SL"}